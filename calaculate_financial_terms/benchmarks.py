@@ -0,0 +1,217 @@
+"""
+Micro-benchmarks for the financial modules and the end-to-end pipeline.
+
+Times calculate_emi, amortization_yearly, tax_savings, sip_future_value,
+calculate_flip_thresholds and the full load -> analyze -> write pipeline on
+synthetic datasets resampled from the real listings CSV, and writes the
+results as JSON. With --compare, every timing is checked against a stored
+baseline and the run exits with status 1 if anything got slower than the
+allowed threshold.
+
+    python benchmarks.py
+    python benchmarks.py --sizes 1000 10000 --repeat 5 --output /tmp/bench.json
+    python benchmarks.py --compare output/benchmarks_baseline.json --threshold 0.25
+
+The scalar entry points (amortization_yearly, calculate_flip_thresholds) are
+called once per property; on large sizes they are timed on the first
+--scalar-calls properties only. Compare per-row timings, not totals.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_final_buy_rent_csv import (
+    BASE_DIR, INPUT_PATH, DOWN_PAYMENT_RATE, LOAN_YEARS, TAX_SLAB,
+    load_listings, analyze_listings, calculate_flip_thresholds,
+)
+from modules.engine import flip_thresholds
+from modules.loan import average_interest_rate, amortization_schedule, amortization_yearly, calculate_emi
+from modules.rent import sip_future_value
+from modules.tax import tax_savings
+
+RESULTS_PATH = BASE_DIR / "output" / "benchmarks.json"
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+def synthetic_listings(source, rows, seed=0, jitter=0.10):
+    """
+    rows listings resampled from the real CSV, with price, area and rent
+    scaled by the same random factor (up to +/- jitter) so rows stay
+    plausible but are not exact duplicates.
+    """
+    rng = np.random.default_rng(seed)
+    df = source.iloc[rng.integers(0, len(source), size=rows)].reset_index(drop=True)
+    factor = 1 + rng.uniform(-jitter, jitter, size=rows)
+    for col in ("price_inr", "area_sqft", "estimated_monthly_rent"):
+        df[col] = (pd.to_numeric(df[col], errors="coerce") * factor).round()
+    return df
+
+
+def time_call(fn, repeat, min_time=0.05):
+    """
+    Seconds per call for each of repeat runs. Fast calls are looped (like
+    timeit's autorange) until one run takes at least min_time, so sub-
+    millisecond primitives are not dominated by timer noise.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - start) / number)
+    return timings
+
+
+def benchmark_cases(df, avg_rate, scalar_calls, workdir):
+    """(name, rows processed, callable) for every benchmark on one dataset."""
+    valid = ((df["price_inr"] > 0) & (df["estimated_monthly_rent"] > 0)).to_numpy()
+    price = df.loc[valid, "price_inr"].to_numpy(dtype=float)
+    rent = df.loc[valid, "estimated_monthly_rent"].to_numpy(dtype=float)
+    down_payment = price * DOWN_PAYMENT_RATE
+    loan_amount = price - down_payment
+
+    schedule = amortization_schedule(loan_amount, avg_rate, LOAN_YEARS)
+    surplus = np.maximum(schedule.emi - rent, 0)
+    is_buy = np.ones(len(price), dtype=bool)
+
+    sample = slice(0, min(scalar_calls, len(price)))
+    n_sample = len(price[sample])
+
+    def scalar_amortization():
+        for loan in loan_amount[sample]:
+            amortization_yearly(loan, avg_rate)
+
+    def scalar_flips():
+        for args in zip(price[sample], rent[sample], down_payment[sample], loan_amount[sample]):
+            calculate_flip_thresholds(*args, avg_rate, "BUY")
+
+    raw_csv = workdir / f"listings_{len(df)}.csv"
+    out_csv = workdir / f"analysis_{len(df)}.csv"
+    df.to_csv(raw_csv, index=False)
+
+    def pipeline():
+        analyze_listings(load_listings(raw_csv), avg_rate).to_csv(out_csv, index=False)
+
+    return [
+        ("calculate_emi", len(price), lambda: calculate_emi(loan_amount, avg_rate, LOAN_YEARS)),
+        ("amortization_schedule", len(price), lambda: amortization_schedule(loan_amount, avg_rate, LOAN_YEARS)),
+        ("amortization_yearly", n_sample, scalar_amortization),
+        ("tax_savings", len(price), lambda: tax_savings(schedule.interest, schedule.principal, TAX_SLAB)),
+        ("sip_future_value", len(price), lambda: sip_future_value(surplus, 0.10, LOAN_YEARS)),
+        ("flip_thresholds", len(price), lambda: flip_thresholds(
+            price, rent, down_payment, loan_amount, avg_rate, is_buy, loan_years=LOAN_YEARS)),
+        ("calculate_flip_thresholds", n_sample, scalar_flips),
+        ("pipeline", len(df), pipeline),
+    ]
+
+
+def run_benchmarks(sizes, repeat, scalar_calls, only=None):
+    source = load_listings(INPUT_PATH)
+    avg_rate = average_interest_rate(BASE_DIR / "banks.csv")
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            df = synthetic_listings(source, size)
+            for name, rows, fn in benchmark_cases(df, avg_rate, scalar_calls, Path(tmp)):
+                if only and name not in only:
+                    continue
+                timings = time_call(fn, repeat)
+                best = min(timings)
+                results[f"{name}@{size}"] = {
+                    "benchmark": name,
+                    "size": size,
+                    "rows": rows,
+                    "best_s": best,
+                    "median_s": statistics.median(timings),
+                    "per_row_us": best / max(rows, 1) * 1e6,
+                }
+                print(f"  {name:<26} {size:>8,} rows  best {best * 1000:10.3f} ms  "
+                      f"({best / max(rows, 1) * 1e6:9.3f} us/row)")
+    return results
+
+
+def environment():
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def compare_results(results, baseline, threshold):
+    """Benchmarks whose per-row time grew by more than threshold (a fraction) over the baseline."""
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            print(f"  {key:<36} new (no baseline)")
+            continue
+        change = current["per_row_us"] / previous["per_row_us"] - 1
+        flag = "❌ REGRESSION" if change > threshold else ("✅ faster" if change < -threshold else "")
+        print(f"  {key:<36} {previous['per_row_us']:9.3f} -> {current['per_row_us']:9.3f} us/row "
+              f"({change:+7.1%}) {flag}")
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="Dataset sizes in rows")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark; the best is reported")
+    parser.add_argument("--scalar-calls", type=int, default=1000,
+                        help="Cap on per-property calls for the scalar entry points")
+    parser.add_argument("--only", nargs="+", default=None, help="Run only these benchmarks")
+    parser.add_argument("--output", type=Path, default=RESULTS_PATH, help="JSON file to write results to")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to check for regressions")
+    parser.add_argument("--threshold", type=float, default=0.20,
+                        help="Allowed slowdown per benchmark before it counts as a regression (0.20 = 20%%)")
+    args = parser.parse_args()
+
+    # Read the baseline before anything is written: --compare may point at the --output file
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+
+    print(f"⏱️  Benchmarking sizes {args.sizes} (best of {args.repeat})...")
+    results = run_benchmarks(args.sizes, args.repeat, args.scalar_calls, args.only)
+
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"environment": environment(), "repeat": args.repeat, "results": results}, f, indent=2)
+    print(f"💾 Results written to {args.output}")
+
+    if baseline is not None:
+        print(f"🔍 Comparing against {args.compare} (threshold {args.threshold:.0%})...")
+        regressions = compare_results(results, baseline, args.threshold)
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No regressions")
+
+if __name__ == "__main__":
+    main()
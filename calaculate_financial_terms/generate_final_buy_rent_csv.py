@@ -1,11 +1,27 @@
-import pandas as pd
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from modules.loan import average_interest_rate, amortization_yearly, calculate_emi
+import numpy as np
+import pandas as pd
+
+from modules.loan import average_interest_rate, amortization_yearly
 from modules.tax import tax_savings
 from modules.buy import buying_wealth
 from modules.rent import lumpsum_growth, sip_future_value
 from modules.compare import compare
+from modules.engine import analyze_frame, flip_thresholds
+from modules.analysis_table import (
+    INTEGER_COLUMNS, ParquetTableWriter, parquet_available, parquet_path, write_analysis_table,
+)
+from modules.manifest import (
+    Manifest, manifest_path, row_hashes, assumptions_fingerprint,
+    load_manifest, save_manifest, match_rows,
+)
 
 # ===================== CONSTANTS =====================
 DOWN_PAYMENT_RATE = 0.25
@@ -15,222 +31,387 @@ APPRECIATION = 0.06
 INVEST_RETURN = 0.10
 
 BASE_DIR = Path(__file__).resolve().parent
+INPUT_PATH = BASE_DIR / "merged_real_estate_data_RAG_final.csv"
+OUTPUT_PATH = BASE_DIR / "output" / "buy_vs_rent_FINAL_ANALYSIS.csv"
 
 
 def calculate_flip_thresholds(price, rent, down_payment, loan_amount, avg_rate, current_decision):
     """
     Calculate sensitivity thresholds - what would flip the decision.
     Returns dict with flip thresholds for interest rate, rent, and holding period.
+    Single-property wrapper around the array solver in modules.engine.
     """
-    thresholds = {
-        "interest_rate_flip": None,
-        "rent_flip": None,
-        "holding_period_flip": None,
+    flips = flip_thresholds(
+        [price], [rent], [down_payment], [loan_amount], avg_rate,
+        ["BUY" in current_decision],
+        loan_years=LOAN_YEARS, appreciation=APPRECIATION, invest_return=INVEST_RETURN
+    )
+
+    def scalar(values, cast):
+        return None if np.isnan(values[0]) else cast(values[0])
+
+    return {
+        "interest_rate_flip": scalar(flips["interest_rate_flip"], float),
+        "rent_flip": scalar(flips["rent_flip"], int),
+        "holding_period_flip": scalar(flips["holding_period_flip"], int),
         "current_interest_rate": round(avg_rate, 2)
     }
-    
-    # Test interest rates from 5% to 15% in 0.5% steps
-    for test_rate in [r/10 for r in range(50, 151, 5)]:  # 5.0% to 15.0%
-        try:
-            schedule, test_emi = amortization_yearly(loan_amount, test_rate)
-            test_tax_saved = sum(
+
+
+def normalize_listings(df):
+    """Normalize column names and add the canonical price_inr, area_sqft and estimated_monthly_rent columns."""
+    # normalize column names
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+
+    # detect likely column names (flexible for different CSVs)
+    price_col = next((c for c in df.columns if "price_inr" in c or ("price" in c and "inr" in c)), None)
+    if price_col is None:
+        price_col = next((c for c in df.columns if "price" in c), None)
+
+    area_col = next((c for c in df.columns if "area" in c), None)
+
+    rent_col = next((c for c in df.columns if "rent" in c), None)
+
+    # canonical numeric columns
+    df["price_inr"] = pd.to_numeric(df[price_col], errors="coerce") if price_col else pd.NA
+    df["area_sqft"] = pd.to_numeric(df[area_col], errors="coerce") if area_col else pd.NA
+    df["estimated_monthly_rent"] = pd.to_numeric(df[rent_col], errors="coerce") if rent_col else pd.NA
+
+    return df
+
+
+def load_listings(csv_path):
+    """Load a listings CSV and normalize it."""
+    return normalize_listings(pd.read_csv(csv_path))
+
+
+def analyze_listings(df, avg_rate):
+    """Run the columnar engine with the pipeline's assumptions."""
+    return analyze_frame(
+        df, avg_rate,
+        down_payment_rate=DOWN_PAYMENT_RATE,
+        loan_years=LOAN_YEARS,
+        tax_slab=TAX_SLAB,
+        appreciation=APPRECIATION,
+        invest_return=INVEST_RETURN,
+    )
+
+
+def analyze_rows(df, avg_rate):
+    """
+    Reference row-by-row implementation of the analysis.
+    Kept for benchmarking and for checking the columnar engine against.
+    """
+    results = []
+
+    for _, row in df.iterrows():
+
+        price = row["price_inr"]
+        area = row["area_sqft"]
+        rent = row["estimated_monthly_rent"]
+
+        out = {
+            "title": row["title"],
+            "city": row["city"],
+            "location": row["location"],
+            "bedrooms": row["bedrooms"],
+            "price_inr": price,
+            "area_sqft": area,
+            "estimated_monthly_rent": rent
+        }
+
+        # ---------- PRICE METRICS ----------
+        if price > 0 and area > 0:
+            price_lakhs = price / 100000
+            out["price_lakhs"] = round(price_lakhs, 2)
+            out["price_lakhs_psf"] = round(price_lakhs / area, 4)
+        else:
+            out["price_lakhs"] = None
+            out["price_lakhs_psf"] = None
+
+        # ---------- BUY VS RENT ----------
+        if price > 0 and rent > 0:
+
+            down_payment = price * DOWN_PAYMENT_RATE
+            loan_amount = price - down_payment
+
+            schedule, EMI = amortization_yearly(loan_amount, avg_rate)
+
+            total_tax_saved = sum(
                 tax_savings(y["interest"], y["principal"], TAX_SLAB)
                 for y in schedule
             )
-            test_final_property = buying_wealth(price, APPRECIATION)
-            test_fd = lumpsum_growth(down_payment, INVEST_RETURN)
-            test_monthly_saving = max(test_emi - rent, 0)
-            test_sip = sip_future_value(test_monthly_saving, INVEST_RETURN)
-            test_rent_wealth = test_fd + test_sip
-            
-            test_decision, _ = compare(test_final_property, test_rent_wealth)
-            
-            # Check if decision flipped
-            if "BUY" in current_decision and "RENT" in test_decision:
-                thresholds["interest_rate_flip"] = test_rate
-                break
-            elif "RENT" in current_decision and "BUY" in test_decision:
-                thresholds["interest_rate_flip"] = test_rate
-                break
-        except:
-            continue
-    
-    # Test rent levels (50% to 200% of current rent)
-    for rent_mult in [m/100 for m in range(50, 201, 10)]:
-        test_rent = rent * rent_mult
-        try:
-            schedule, EMI = amortization_yearly(loan_amount, avg_rate)
-            test_final_property = buying_wealth(price, APPRECIATION)
-            test_fd = lumpsum_growth(down_payment, INVEST_RETURN)
-            test_monthly_saving = max(EMI - test_rent, 0)
-            test_sip = sip_future_value(test_monthly_saving, INVEST_RETURN)
-            test_rent_wealth = test_fd + test_sip
-            
-            test_decision, _ = compare(test_final_property, test_rent_wealth)
-            
-            if "BUY" in current_decision and "RENT" in test_decision:
-                thresholds["rent_flip"] = round(test_rent)
-                break
-            elif "RENT" in current_decision and "BUY" in test_decision:
-                thresholds["rent_flip"] = round(test_rent)
-                break
-        except:
-            continue
-    
-    # Test holding periods (5, 10, 15, 20, 25, 30 years)
-    for test_years in [5, 7, 10, 12, 15, 18, 20, 25, 30]:
-        try:
-            test_final_property = buying_wealth(price, APPRECIATION, test_years)
-            test_fd = lumpsum_growth(down_payment, INVEST_RETURN, test_years)
-            
-            # For shorter periods, adjust loan tenure
-            loan_tenure = min(test_years, LOAN_YEARS)
-            schedule, EMI = amortization_yearly(loan_amount, avg_rate, loan_tenure)
-            
-            test_monthly_saving = max(EMI - rent, 0)
-            test_sip = sip_future_value(test_monthly_saving, INVEST_RETURN, test_years)
-            test_rent_wealth = test_fd + test_sip
-            
-            test_decision, _ = compare(test_final_property, test_rent_wealth)
-            
-            if "BUY" in current_decision and "RENT" in test_decision:
-                thresholds["holding_period_flip"] = test_years
-                break
-            elif "RENT" in current_decision and "BUY" in test_decision:
-                thresholds["holding_period_flip"] = test_years
-                break
-        except:
-            continue
-    
-    return thresholds
-
-
-# ===================== LOAD DATA =====================
-df = pd.read_csv(BASE_DIR / "merged_real_estate_data_RAG_final.csv")
-
-# normalize column names
-df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-# detect likely column names (flexible for different CSVs)
-price_col = next((c for c in df.columns if "price_inr" in c or ("price" in c and "inr" in c)), None)
-if price_col is None:
-    price_col = next((c for c in df.columns if "price" in c), None)
-
-area_col = next((c for c in df.columns if "area" in c), None)
-
-rent_col = next((c for c in df.columns if "rent" in c), None)
-
-# canonical numeric columns
-df["price_inr"] = pd.to_numeric(df[price_col], errors="coerce") if price_col else pd.NA
-df["area_sqft"] = pd.to_numeric(df[area_col], errors="coerce") if area_col else pd.NA
-df["estimated_monthly_rent"] = pd.to_numeric(df[rent_col], errors="coerce") if rent_col else pd.NA
-
-avg_rate = average_interest_rate(BASE_DIR / "banks.csv")
-
-results = []
-
-# ===================== PROCESS =====================
-for _, row in df.iterrows():
-
-    price = row["price_inr"]
-    area = row["area_sqft"]
-    rent = row["estimated_monthly_rent"]
-
-    out = {
-        "title": row["title"],
-        "city": row["city"],
-        "location": row["location"],
-        "bedrooms": row["bedrooms"],
-        "price_inr": price,
-        "area_sqft": area,
-        "estimated_monthly_rent": rent
-    }
 
-    # ---------- PRICE METRICS ----------
-    if price > 0 and area > 0:
-        price_lakhs = price / 100000
-        out["price_lakhs"] = round(price_lakhs, 2)
-        out["price_lakhs_psf"] = round(price_lakhs / area, 4)
-    else:
-        out["price_lakhs"] = None
-        out["price_lakhs_psf"] = None
+            total_emi_paid = EMI * 12 * LOAN_YEARS
+            effective_emi = (total_emi_paid - total_tax_saved) / (12 * LOAN_YEARS)
+
+            final_property_value = buying_wealth(price, APPRECIATION)
 
-    # ---------- BUY VS RENT ----------
-    if price > 0 and rent > 0:
+            fd_value = lumpsum_growth(down_payment, INVEST_RETURN)
+            monthly_saving = max(EMI - rent, 0)
+            sip_value = sip_future_value(monthly_saving, INVEST_RETURN)
 
-        down_payment = price * DOWN_PAYMENT_RATE
-        loan_amount = price - down_payment
+            final_renting_wealth = fd_value + sip_value
+
+            decision, diff = compare(final_property_value, final_renting_wealth)
+        
+            # Calculate flip thresholds (sensitivity analysis)
+            flip_thresholds = calculate_flip_thresholds(
+                price, rent, down_payment, loan_amount, avg_rate, decision
+            )
+
+            out.update({
+                "down_payment": round(down_payment),
+                "loan_amount": round(loan_amount),
+                "monthly_emi": round(EMI),
+                "effective_emi": round(effective_emi),
+                "total_tax_saved": round(total_tax_saved),
+                "final_property_value": round(final_property_value),
+                "final_renting_wealth": round(final_renting_wealth),
+                "decision": decision,
+                "wealth_difference": round(diff),
+                # Flip thresholds for sensitivity
+                "current_interest_rate": flip_thresholds["current_interest_rate"],
+                "interest_rate_flip": flip_thresholds["interest_rate_flip"],
+                "rent_flip": flip_thresholds["rent_flip"],
+                "holding_period_flip": flip_thresholds["holding_period_flip"]
+            })
+        else:
+            out.update({
+                "down_payment": None,
+                "loan_amount": None,
+                "monthly_emi": None,
+                "effective_emi": None,
+                "total_tax_saved": None,
+                "final_property_value": None,
+                "final_renting_wealth": None,
+                "decision": None,
+                "wealth_difference": None,
+                "current_interest_rate": None,
+                "interest_rate_flip": None,
+                "rent_flip": None,
+                "holding_period_flip": None
+            })
+
+        results.append(out)
+
+    return pd.DataFrame(results)
+
+
+def with_output_schema(df, listings):
+    """
+    Give a result table the dtypes a full run over listings writes it with:
+    numeric input columns as read from listings, and whole-rupee / whole-year
+    results as int64 when no row is missing a value and float64 otherwise,
+    the way analyze_frame (and the row loop before it) types them. A no-op on
+    analyze_listings(listings); merged incremental results need it because
+    reused rows come back from the previous CSV with that file's dtypes.
+    """
+    for col in listings.columns.intersection(df.columns):
+        if listings[col].dtype.kind in "iuf":
+            df[col] = df[col].astype(listings[col].dtype)
+    for col in INTEGER_COLUMNS:
+        df[col] = df[col].astype("int64" if df[col].notna().all() else "float64")
+    return df
+
+
+def pipeline_fingerprint(avg_rate):
+    """Fingerprint of every assumption the output depends on."""
+    return assumptions_fingerprint(
+        down_payment_rate=DOWN_PAYMENT_RATE,
+        loan_years=LOAN_YEARS,
+        tax_slab=TAX_SLAB,
+        appreciation=APPRECIATION,
+        invest_return=INVEST_RETURN,
+        avg_rate=avg_rate,
+    )
+
+
+def analyze_incremental(df, hashes, previous, previous_output, avg_rate):
+    """
+    Reuse rows of previous_output whose input hash is unchanged and analyze
+    only the new or changed rows. Returns the merged frame in input order.
+    """
+    positions, removed = match_rows(hashes, previous.row_hashes)
+    reused = positions >= 0
 
-        schedule, EMI = amortization_yearly(loan_amount, avg_rate)
+    fresh = analyze_listings(df[~reused].reset_index(drop=True), avg_rate)
+    kept = previous_output.iloc[positions[reused]]
 
-        total_tax_saved = sum(
-            tax_savings(y["interest"], y["principal"], TAX_SLAB)
-            for y in schedule
-        )
+    merged = pd.concat([kept.reset_index(drop=True), fresh], ignore_index=True)
+    order = np.argsort(np.concatenate([np.flatnonzero(reused), np.flatnonzero(~reused)]), kind="stable")
+    merged = merged.iloc[order].reset_index(drop=True)
 
-        total_emi_paid = EMI * 12 * LOAN_YEARS
-        effective_emi = (total_emi_paid - total_tax_saved) / (12 * LOAN_YEARS)
+    print(f"♻️  Incremental: {int(reused.sum())} rows reused, {len(fresh)} new or changed, {removed} removed")
+    return merged
 
-        final_property_value = buying_wealth(price, APPRECIATION)
 
-        fd_value = lumpsum_growth(down_payment, INVEST_RETURN)
-        monthly_saving = max(EMI - rent, 0)
-        sip_value = sip_future_value(monthly_saving, INVEST_RETURN)
+def analyze_chunk(chunk, avg_rate):
+    """Worker entry point for chunked mode: normalize and analyze one chunk of raw rows."""
+    chunk = normalize_listings(chunk)
+    return analyze_listings(chunk, avg_rate), row_hashes(chunk)
 
-        final_renting_wealth = fd_value + sip_value
 
-        decision, diff = compare(final_property_value, final_renting_wealth)
-        
-        # Calculate flip thresholds (sensitivity analysis)
-        flip_thresholds = calculate_flip_thresholds(
-            price, rent, down_payment, loan_amount, avg_rate, decision
-        )
-
-        out.update({
-            "down_payment": round(down_payment),
-            "loan_amount": round(loan_amount),
-            "monthly_emi": round(EMI),
-            "effective_emi": round(effective_emi),
-            "total_tax_saved": round(total_tax_saved),
-            "final_property_value": round(final_property_value),
-            "final_renting_wealth": round(final_renting_wealth),
-            "decision": decision,
-            "wealth_difference": round(diff),
-            # Flip thresholds for sensitivity
-            "current_interest_rate": flip_thresholds["current_interest_rate"],
-            "interest_rate_flip": flip_thresholds["interest_rate_flip"],
-            "rent_flip": flip_thresholds["rent_flip"],
-            "holding_period_flip": flip_thresholds["holding_period_flip"]
-        })
+def csv_dtypes(input_path, chunksize):
+    """
+    The dtypes pandas infers for input_path read in one go, found by
+    streaming it in chunks: numeric columns widen to the type that holds
+    every chunk (an integer column with a gap anywhere is float64), and a
+    column that reads as numbers in some chunks and text in others is object.
+    Passed to the chunked reader so each chunk is parsed like the whole file.
+    """
+    dtypes, mixed = {}, set()
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        for col, dtype in chunk.dtypes.items():
+            seen = dtypes.setdefault(col, dtype)
+            if seen == dtype:
+                continue
+            if seen.kind in "iuf" and dtype.kind in "iuf":
+                dtypes[col] = np.result_type(seen, dtype)
+            else:
+                dtypes[col] = np.dtype(object)
+                mixed.add(col)
+    return {col: dtype for col, dtype in dtypes.items() if col in mixed or dtype.kind in "iuf"}
+
+
+def rewrite_as_float(output_path, columns, chunksize):
+    """
+    Rewrite the given columns of a finished CSV as floats (54933 -> 54933.0)
+    and leave every other field as written. A full run writes an integer
+    result column as float64 once any row is missing a value, which chunked
+    mode only knows after the last chunk.
+    """
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    reader = pd.read_csv(output_path, chunksize=chunksize, dtype=str, keep_default_na=False)
+    with open(tmp_path, "w", newline="", encoding="utf-8") as out:
+        for i, chunk in enumerate(reader):
+            for col in columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce").astype("float64")
+            chunk.to_csv(out, header=i == 0, index=False)
+    tmp_path.replace(output_path)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its (finished) workers, in MB."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None, None
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    return own, children
+
+
+def run_chunked(input_path, output_path, avg_rate, chunksize, workers):
+    """
+    Stream input_path in chunks of chunksize rows, analyze the chunks on a
+    pool of worker processes and append results to output_path as they
+    complete. At most 2 * workers chunks are in flight, so memory stays
+    bounded regardless of input size, and chunks are written in input order.
+    The input is read with the dtypes of a full read and integer result
+    columns with gaps are rewritten as floats at the end, so the CSV matches
+    a full run byte for byte. The Parquet copy is written alongside when
+    pyarrow is installed. Returns the row hashes for the incremental manifest.
+    """
+    start = time.perf_counter()
+    rows = 0
+    header = True
+    pending = deque()
+    hashes = []
+    gaps = set()
+    parquet = ParquetTableWriter(parquet_path(output_path)) if parquet_available() else None
+
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(output_path, "w", newline="", encoding="utf-8") as out:
+
+        def write_ready(max_pending):
+            nonlocal rows, header
+            while len(pending) > max_pending:
+                result, chunk_hashes = pending.popleft().result()
+                hashes.append(chunk_hashes)
+                gaps.update(col for col in INTEGER_COLUMNS if result[col].isna().any())
+                result.to_csv(out, header=header, index=False)
+                if parquet:
+                    parquet.write(result)
+                header = False
+                rows += len(result)
+
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype=csv_dtypes(input_path, chunksize)):
+            pending.append(pool.submit(analyze_chunk, chunk, avg_rate))
+            write_ready(2 * workers - 1)
+        write_ready(0)
+
+    if gaps:
+        rewrite_as_float(output_path, [col for col in INTEGER_COLUMNS if col in gaps], chunksize)
+
+    if parquet:
+        parquet.close()
+
+    elapsed = time.perf_counter() - start
+    own_rss, worker_rss = peak_rss_mb()
+
+    print(f"✅ SUCCESS: {rows} rows in {elapsed:.2f}s ({rows / elapsed:,.0f} rows/s) "
+          f"using {workers} workers, chunks of {chunksize}")
+    if own_rss is not None:
+        print(f"📈 Peak RSS: main {own_rss:.0f} MB, largest worker {worker_rss:.0f} MB")
+    return np.concatenate(hashes) if hashes else np.array([], dtype=np.uint64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the buy-vs-rent analysis CSV.")
+    parser.add_argument("--input", type=Path, default=INPUT_PATH, help="Listings CSV")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Analysis CSV to write")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="Stream the input in chunks of this many rows over a process pool")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for chunked mode (default: all cores)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only recompute rows that are new or changed since the last run")
+    args = parser.parse_args()
+    if args.incremental and args.chunksize:
+        parser.error("--incremental cannot be combined with --chunksize")
+
+    avg_rate = average_interest_rate(BASE_DIR / "banks.csv")
+    fingerprint = pipeline_fingerprint(avg_rate)
+    manifest_file = manifest_path(args.output)
+    args.output.parent.mkdir(exist_ok=True)
+
+    if args.chunksize:
+        hashes = run_chunked(args.input, args.output, avg_rate, args.chunksize, args.workers)
+        save_manifest(manifest_file, Manifest(assumptions=fingerprint, row_hashes=hashes))
+        return
+
+    df = load_listings(args.input)
+    hashes = row_hashes(df)
+
+    # ===================== PROCESS =====================
+    previous = load_manifest(manifest_file) if args.incremental else None
+    previous_output = pd.read_csv(args.output) if previous and args.output.exists() else None
+
+    if previous is None or previous_output is None:
+        final_df = analyze_listings(df, avg_rate)
+    elif previous.assumptions != fingerprint or len(previous_output) != len(previous.row_hashes):
+        print("🔁 Assumptions changed since the last run, recomputing every row...")
+        final_df = analyze_listings(df, avg_rate)
     else:
-        out.update({
-            "down_payment": None,
-            "loan_amount": None,
-            "monthly_emi": None,
-            "effective_emi": None,
-            "total_tax_saved": None,
-            "final_property_value": None,
-            "final_renting_wealth": None,
-            "decision": None,
-            "wealth_difference": None,
-            "current_interest_rate": None,
-            "interest_rate_flip": None,
-            "rent_flip": None,
-            "holding_period_flip": None
-        })
-
-    results.append(out)
-
-# ===================== SAVE =====================
-final_df = pd.DataFrame(results)
-
-output_dir = BASE_DIR / "output"
-output_dir.mkdir(exist_ok=True)
-
-# Try to save, use alternate name if file is locked
-try:
-    final_df.to_csv(output_dir / "buy_vs_rent_FINAL_ANALYSIS.csv", index=False)
-    print(f"✅ SUCCESS: input rows = {len(df)}, output rows = {len(final_df)}")
-except PermissionError:
-    final_df.to_csv(output_dir / "buy_vs_rent_FINAL_ANALYSIS_v2.csv", index=False)
-    print(f"✅ SUCCESS: Saved as v2 (original file locked). input rows = {len(df)}, output rows = {len(final_df)}")
+        final_df = analyze_incremental(df, hashes, previous, previous_output, avg_rate)
+    # One schema for every mode, so full and incremental runs write the same bytes
+    final_df = with_output_schema(final_df, df)
+
+    # ===================== SAVE =====================
+    # Try to save, use alternate name if file is locked
+    try:
+        final_df.to_csv(args.output, index=False)
+        if parquet_available():
+            write_analysis_table(final_df, parquet_path(args.output))
+        save_manifest(manifest_file, Manifest(assumptions=fingerprint, row_hashes=hashes))
+        print(f"✅ SUCCESS: input rows = {len(df)}, output rows = {len(final_df)}")
+    except PermissionError:
+        final_df.to_csv(args.output.with_name(args.output.stem + "_v2.csv"), index=False)
+        print(f"✅ SUCCESS: Saved as v2 (original file locked). input rows = {len(df)}, output rows = {len(final_df)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Probabilistic buy-vs-rent analysis.
+
+Evaluates every listing against thousands of (appreciation, investment
+return, interest rate) scenarios centred on the pipeline's assumptions and
+writes P(BUY better) plus wealth-difference percentiles per property.
+
+    python generate_scenarios_csv.py
+    python generate_scenarios_csv.py --scenarios 20000 --seed 7 --memory-mb 512
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from generate_final_buy_rent_csv import (
+    BASE_DIR, INPUT_PATH, DOWN_PAYMENT_RATE, LOAN_YEARS, APPRECIATION, INVEST_RETURN,
+    load_listings,
+)
+from modules.loan import average_interest_rate
+from modules.scenarios import draw_scenarios, simulate
+
+OUTPUT_PATH = BASE_DIR / "output" / "buy_vs_rent_SCENARIOS.csv"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", type=Path, default=INPUT_PATH, help="Listings CSV")
+    parser.add_argument("--output", type=Path, default=OUTPUT_PATH, help="Scenario CSV to write")
+    parser.add_argument("--scenarios", type=int, default=5000, help="Number of scenarios to draw")
+    parser.add_argument("--seed", type=int, default=42, help="RNG seed")
+    parser.add_argument("--memory-mb", type=float, default=256, help="Memory ceiling for one batch of properties")
+    parser.add_argument("--appreciation-sd", type=float, default=0.02)
+    parser.add_argument("--return-sd", type=float, default=0.03)
+    parser.add_argument("--rate-sd", type=float, default=1.0, help="Std. dev. of the loan rate in % points")
+    args = parser.parse_args()
+
+    df = load_listings(args.input)
+    avg_rate = average_interest_rate(BASE_DIR / "banks.csv")
+
+    scenarios = draw_scenarios(
+        args.scenarios, args.seed,
+        appreciation=(APPRECIATION, args.appreciation_sd),
+        invest_return=(INVEST_RETURN, args.return_sd),
+        interest_rate=(avg_rate, args.rate_sd),
+    )
+
+    with np.errstate(invalid="ignore"):
+        valid = ((df["price_inr"] > 0) & (df["estimated_monthly_rent"] > 0)).to_numpy()
+
+    start = time.perf_counter()
+    stats = simulate(
+        df.loc[valid, "price_inr"].to_numpy(dtype=float),
+        df.loc[valid, "estimated_monthly_rent"].to_numpy(dtype=float),
+        scenarios,
+        memory_limit_mb=args.memory_mb,
+        down_payment_rate=DOWN_PAYMENT_RATE,
+        loan_years=LOAN_YEARS,
+    )
+    elapsed = time.perf_counter() - start
+
+    out = df[["title", "city", "location", "bedrooms", "price_inr", "estimated_monthly_rent"]].copy()
+    for col, values in stats.items():
+        full = np.full(len(df), np.nan)
+        full[valid] = values
+        out[col] = full.round(4) if col == "p_buy_better" else full.round()
+
+    args.output.parent.mkdir(exist_ok=True)
+    out.to_csv(args.output, index=False)
+
+    evaluations = int(valid.sum()) * len(scenarios)
+    print(f"✅ SUCCESS: {int(valid.sum())} properties x {len(scenarios)} scenarios "
+          f"in {elapsed:.2f}s ({evaluations / elapsed:,.0f} evaluations/s) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Typed storage for the buy-vs-rent analysis table.
+
+The pipeline writes the table as CSV and, when pyarrow is installed, as a
+Parquet file next to it. read_analysis_table() returns the same dtypes from
+either file: categories for the low-cardinality text columns, nullable
+integers for whole-rupee / whole-year results and floats for the rest.
+With Parquet, column projection and filters are pushed down to the reader so
+only the requested columns and matching row groups are decoded.
+
+The DataFrame index is the row's position in the full table (source_row).
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+CATEGORY_COLUMNS = ["city", "location", "decision"]
+
+INTEGER_COLUMNS = [
+    "down_payment", "loan_amount", "monthly_emi", "effective_emi",
+    "total_tax_saved", "final_property_value", "final_renting_wealth",
+    "wealth_difference", "rent_flip", "holding_period_flip",
+]
+
+FLOAT_COLUMNS = [
+    "price_inr", "area_sqft", "estimated_monthly_rent",
+    "price_lakhs", "price_lakhs_psf", "current_interest_rate", "interest_rate_flip",
+]
+
+INDEX_NAME = "source_row"
+ROW_GROUP_SIZE = 100_000
+
+_OPERATORS = {
+    "==": lambda s, v: s == v,
+    "!=": lambda s, v: s != v,
+    "<": lambda s, v: s < v,
+    "<=": lambda s, v: s <= v,
+    ">": lambda s, v: s > v,
+    ">=": lambda s, v: s >= v,
+    "in": lambda s, v: s.isin(v),
+    "not in": lambda s, v: ~s.isin(v),
+}
+
+
+def parquet_available():
+    return pq is not None
+
+
+def parquet_path(csv_path):
+    return Path(csv_path).with_suffix(".parquet")
+
+
+def apply_schema(df):
+    """Cast the known analysis columns present in df to their storage dtypes."""
+    for col in df.columns.intersection(CATEGORY_COLUMNS):
+        df[col] = df[col].astype("category")
+    for col in df.columns.intersection(INTEGER_COLUMNS + ["bedrooms"]):
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+    for col in df.columns.intersection(FLOAT_COLUMNS):
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
+
+def _normalize_filters(filters):
+    """Accept {"city": "Mumbai", "bedrooms": [2, 3]} or [("price_lakhs", "<=", 80), ...]."""
+    if not filters:
+        return None
+    if isinstance(filters, dict):
+        return [(col, "in" if isinstance(value, (list, tuple, set)) else "==",
+                 list(value) if isinstance(value, (list, tuple, set)) else value)
+                for col, value in filters.items()]
+    return list(filters)
+
+
+def _arrow_schema(df):
+    """Arrow schema with plain strings for category columns, so chunks with different categories can share one file."""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    fields = [
+        pa.field(f.name, pa.string()) if f.name in CATEGORY_COLUMNS else f
+        for f in table.schema
+    ]
+    return pa.schema(fields, metadata=table.schema.metadata)
+
+
+def write_analysis_table(df, path, row_group_size=ROW_GROUP_SIZE):
+    """Write the whole table as Parquet (row order is kept and stored as source_row)."""
+    df = apply_schema(df.copy())
+    df.index.name = INDEX_NAME
+    df.to_parquet(path, engine="pyarrow", index=True, row_group_size=row_group_size)
+
+
+class ParquetTableWriter:
+    """Append DataFrame chunks to one Parquet file, numbering rows continuously."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._writer = None
+        self._schema = None
+
+    def write(self, df):
+        df = apply_schema(df.copy())
+        df.index = pd.RangeIndex(self.rows, self.rows + len(df), name=INDEX_NAME)
+        for col in df.columns.intersection(CATEGORY_COLUMNS):
+            df[col] = df[col].astype(object)
+
+        if self._writer is None:
+            self._schema = _arrow_schema(df)
+            self._writer = pq.ParquetWriter(self.path, self._schema)
+        self._writer.write_table(pa.Table.from_pandas(df, schema=self._schema, preserve_index=True))
+        self.rows += len(df)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+def _is_current(parquet_file, csv_file):
+    # A CSV written after the Parquet file (e.g. by a run without pyarrow) wins
+    if not parquet_file.exists():
+        return False
+    return not csv_file.exists() or parquet_file.stat().st_mtime >= csv_file.stat().st_mtime
+
+
+def available_columns(path):
+    """Column names stored in the table that read_analysis_table(path) would load."""
+    parquet_file = parquet_path(path)
+    csv_file = Path(path).with_suffix(".csv")
+    if parquet_available() and _is_current(parquet_file, csv_file):
+        return [name for name in pq.read_schema(parquet_file).names if name != INDEX_NAME]
+    return list(pd.read_csv(csv_file, nrows=0).columns)
+
+
+def read_analysis_table(path, columns=None, filters=None):
+    """
+    Load the analysis table with typed columns.
+
+    path may point at the CSV or the Parquet file; the Parquet sibling is used
+    when pyarrow is installed and it is at least as new as the CSV. columns limits the columns
+    returned and filters keeps only matching rows, given either as a dict of
+    column -> value (or list of values) or as (column, op, value) tuples with
+    op one of ==, !=, <, <=, >, >=, in, not in.
+    """
+    filters = _normalize_filters(filters)
+    columns = list(columns) if columns is not None else None
+    parquet_file = parquet_path(path)
+    csv_file = Path(path).with_suffix(".csv")
+
+    if parquet_available() and _is_current(parquet_file, csv_file):
+        df = pd.read_parquet(parquet_file, engine="pyarrow", columns=columns, filters=filters)
+        df.index.name = INDEX_NAME
+        return apply_schema(df)
+
+    # CSV fallback: read only the needed columns, then filter in memory
+    usecols = None
+    if columns is not None:
+        usecols = set(columns) | {col for col, _, _ in filters or []}
+    df = apply_schema(pd.read_csv(csv_file, usecols=usecols))
+    df.index.name = INDEX_NAME
+
+    if filters:
+        mask = pd.Series(True, index=df.index)
+        for col, op, value in filters:
+            mask &= _OPERATORS[op](df[col], value)
+        df = df[mask]
+    return df[columns] if columns is not None else df
@@ -1,2 +1,3 @@
 def buying_wealth(property_price, appreciation_rate, years=20):
+    # Plain arithmetic, so it broadcasts over NumPy arrays as well as scalars
     return property_price * ((1 + appreciation_rate) ** years)
@@ -1,5 +1,21 @@
+import numpy as np
+
+BUY_DECISION = "BUYING is financially better"
+RENT_DECISION = "RENTING is financially better"
+
 def compare(buy_wealth, rent_wealth):
-    if buy_wealth > rent_wealth:
-        return "BUYING is financially better", buy_wealth - rent_wealth
-    else:
-        return "RENTING is financially better", rent_wealth - buy_wealth
+    """
+    Scalars: returns (decision text, wealth difference) as before.
+    Arrays: returns (buy_better boolean array, wealth difference array).
+    Ties go to renting.
+    """
+    buy_better = np.greater(buy_wealth, rent_wealth)
+    diff = np.where(buy_better, np.subtract(buy_wealth, rent_wealth), np.subtract(rent_wealth, buy_wealth))
+
+    if np.ndim(buy_better) == 0:
+        return (BUY_DECISION if buy_better else RENT_DECISION), diff.item()
+    return buy_better, diff
+
+def decision_labels(buy_better):
+    # Map a boolean array from compare() to the decision text used in the output CSV
+    return np.where(buy_better, BUY_DECISION, RENT_DECISION).astype(object)
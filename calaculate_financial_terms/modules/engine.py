@@ -0,0 +1,243 @@
+"""
+Columnar buy-vs-rent engine.
+
+Computes every column of the buy-vs-rent analysis over a whole DataFrame at
+once with NumPy array operations. Loops only run over solver iterations,
+never over properties.
+"""
+
+import numpy as np
+import pandas as pd
+
+from modules.loan import amortization_schedule, calculate_emi
+from modules.tax import tax_savings
+from modules.buy import buying_wealth
+from modules.rent import lumpsum_growth, sip_future_value
+from modules.compare import compare, decision_labels
+
+# Search ranges for the flip thresholds
+FLIP_RATE_RANGE = (5.0, 15.0)  # % per year
+FLIP_RENT_RANGE = (0.5, 2.0)  # multiples of the current rent
+FLIP_HOLDING_RANGE = (5, 30)  # whole years
+FLIP_RATE_TOLERANCE = 0.001  # % points
+
+def _rounded(values, mask):
+    """
+    Round to whole rupees. Mirrors how a column of Python ints and Nones is
+    typed by pandas: int64 when every row has a value, float64 otherwise.
+    """
+    out = np.full(len(mask), np.nan)
+    out[mask] = np.rint(values[mask])
+    if mask.all():
+        return out.astype(np.int64)
+    return out
+
+
+def _round_decimal(values, ndigits):
+    """
+    np.round, except that values sitting next to a rounding tie go through
+    Python's round(), which rounds the exact binary value (20.405 -> 20.41).
+    """
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    idx = np.flatnonzero(near_tie)
+    rounded[idx] = [round(float(v), ndigits) for v in values[idx]]
+    return rounded
+
+
+def _tax_saved_total(loan_amount, annual_rate, tax_slab, tenure_years):
+    """Total tax saved over the loan, from one (loans x years) amortization schedule."""
+    schedule = amortization_schedule(loan_amount, annual_rate, tenure_years)
+
+    return tax_savings(schedule.interest, schedule.principal, tax_slab).sum(axis=-1), schedule.emi
+
+
+def _renting_wealth(down_payment, emi, rent, invest_return, years):
+    """Down payment invested as a lump sum plus the EMI-minus-rent surplus as a SIP."""
+    fd_value = lumpsum_growth(down_payment, invest_return, years)
+    monthly_saving = np.maximum(emi - rent, 0)
+    sip_value = sip_future_value(monthly_saving, invest_return, years)
+
+    return fd_value + sip_value
+
+
+def _buys_at_rate(price, rent, down_payment, loan_amount, annual_rate,
+                  loan_years, appreciation, invest_return):
+    final_property = buying_wealth(price, appreciation, loan_years)
+    emi = calculate_emi(loan_amount, annual_rate, loan_years)
+    return final_property > _renting_wealth(down_payment, emi, rent, invest_return, loan_years)
+
+
+def _rate_flip(price, rent, down_payment, loan_amount, loan_years, appreciation, invest_return):
+    """
+    Bisection on the loan rate. Buy-minus-rent wealth only falls as the rate
+    rises (a bigger EMI means a bigger SIP for the renter), so BUY holds below
+    the root and RENT above it. Returns the root to FLIP_RATE_TOLERANCE, or NaN
+    when the decision is the same across FLIP_RATE_RANGE.
+    """
+    if len(price) == 0:
+        return np.empty(0)
+
+    args = (price, rent, down_payment, loan_amount)
+    lo = np.full(len(price), FLIP_RATE_RANGE[0])
+    hi = np.full(len(price), FLIP_RATE_RANGE[1])
+
+    bracketed = (_buys_at_rate(*args, lo, loan_years, appreciation, invest_return)
+                 & ~_buys_at_rate(*args, hi, loan_years, appreciation, invest_return))
+
+    iterations = int(np.ceil(np.log2((FLIP_RATE_RANGE[1] - FLIP_RATE_RANGE[0]) / FLIP_RATE_TOLERANCE)))
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        buys = _buys_at_rate(*args, mid, loan_years, appreciation, invest_return)
+        lo = np.where(buys, mid, lo)
+        hi = np.where(buys, hi, mid)
+
+    return np.where(bracketed, np.round(hi, 2), np.nan)
+
+
+def _rent_flip(price, rent, down_payment, loan_amount, avg_rate, loan_years, appreciation, invest_return):
+    """
+    Closed-form rent threshold. Renting wealth is the lump sum plus
+    max(EMI - rent, 0) * SIP factor, so BUY wins exactly when
+    rent > EMI - (property value - lump sum) / SIP factor.
+    """
+    final_property = buying_wealth(price, appreciation, loan_years)
+    fd_value = lumpsum_growth(down_payment, invest_return, loan_years)
+    emi = calculate_emi(loan_amount, avg_rate, loan_years)
+    sip_factor = sip_future_value(1.0, invest_return, loan_years)
+
+    threshold = emi - (final_property - fd_value) / sip_factor
+
+    # Below zero no rent is low enough to flip; outside the range it is not a plausible rent
+    in_range = ((final_property > fd_value) & (threshold > 0)
+                & (threshold >= rent * FLIP_RENT_RANGE[0]) & (threshold <= rent * FLIP_RENT_RANGE[1]))
+
+    return np.where(in_range, np.rint(threshold), np.nan)
+
+
+def _holding_period_flip(price, rent, down_payment, loan_amount, avg_rate, is_buy,
+                         loan_years, appreciation, invest_return):
+    """
+    Evaluate every whole holding period in FLIP_HOLDING_RANGE as one
+    (properties x years) matrix and return the shortest one whose decision
+    differs, or NaN if none does. The loan tenure is capped at the holding period.
+    """
+    years = np.arange(FLIP_HOLDING_RANGE[0], FLIP_HOLDING_RANGE[1] + 1)
+
+    test_property = buying_wealth(price[:, None], appreciation, years)
+    emi = calculate_emi(loan_amount[:, None], avg_rate, np.minimum(years, loan_years))
+    renting = _renting_wealth(down_payment[:, None], emi, rent[:, None], invest_return, years)
+
+    flipped = (test_property > renting) != is_buy[:, None]
+    first = flipped.argmax(axis=1)
+
+    return np.where(flipped.any(axis=1), years[first], np.nan)
+
+
+def flip_thresholds(price, rent, down_payment, loan_amount, avg_rate, is_buy,
+                    loan_years=20, appreciation=0.06, invest_return=0.10):
+    """
+    Solve for the interest rate, rent and holding period at which the
+    buy-vs-rent decision flips, for all properties at once.
+
+    All inputs except avg_rate are 1-D arrays over properties. Returns a dict
+    of float arrays, NaN where the decision does not flip inside the search range.
+    """
+    price, rent, down_payment, loan_amount = (
+        np.asarray(a, dtype=float) for a in (price, rent, down_payment, loan_amount)
+    )
+    is_buy = np.asarray(is_buy, dtype=bool)
+
+    return {
+        "interest_rate_flip": _rate_flip(price, rent, down_payment, loan_amount,
+                                         loan_years, appreciation, invest_return),
+        "rent_flip": _rent_flip(price, rent, down_payment, loan_amount, avg_rate,
+                                loan_years, appreciation, invest_return),
+        "holding_period_flip": _holding_period_flip(price, rent, down_payment, loan_amount, avg_rate,
+                                                    is_buy, loan_years, appreciation, invest_return),
+    }
+
+
+def analyze_frame(df, avg_rate, down_payment_rate=0.25, loan_years=20, tax_slab=0.30,
+                  appreciation=0.06, invest_return=0.10):
+    """
+    Build the buy-vs-rent analysis table for a normalized listings DataFrame.
+
+    Expects the canonical price_inr, area_sqft and estimated_monthly_rent
+    columns. Rows without a positive price and rent keep empty result columns.
+    """
+    n = len(df)
+    price = df["price_inr"].to_numpy(dtype=float, na_value=np.nan)
+    area = df["area_sqft"].to_numpy(dtype=float, na_value=np.nan)
+    rent = df["estimated_monthly_rent"].to_numpy(dtype=float, na_value=np.nan)
+
+    # Columns are collected in a dict and turned into a DataFrame once at the
+    # end; inserting them one by one costs more than the maths for small inputs
+    out = {
+        "title": df["title"].to_numpy(),
+        "city": df["city"].to_numpy(),
+        "location": df["location"].to_numpy(),
+        "bedrooms": df["bedrooms"].to_numpy(),
+        "price_inr": df["price_inr"].to_numpy(),
+        "area_sqft": df["area_sqft"].to_numpy(),
+        "estimated_monthly_rent": df["estimated_monthly_rent"].to_numpy(),
+    }
+
+    # ---------- PRICE METRICS ----------
+    with np.errstate(invalid="ignore"):
+        has_area = (price > 0) & (area > 0)
+        valid = (price > 0) & (rent > 0)
+
+    price_lakhs = price / 100000
+    out["price_lakhs"] = np.where(has_area, _round_decimal(price_lakhs, 2), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out["price_lakhs_psf"] = np.where(has_area, _round_decimal(price_lakhs / area, 4), np.nan)
+
+    # ---------- BUY VS RENT ----------
+    p, r = price[valid], rent[valid]
+
+    down_payment = p * down_payment_rate
+    loan_amount = p - down_payment
+
+    total_tax_saved, emi = _tax_saved_total(loan_amount, avg_rate, tax_slab, loan_years)
+
+    total_emi_paid = emi * 12 * loan_years
+    effective_emi = (total_emi_paid - total_tax_saved) / (12 * loan_years)
+
+    final_property_value = buying_wealth(p, appreciation, loan_years)
+    final_renting_wealth = _renting_wealth(down_payment, emi, r, invest_return, loan_years)
+
+    is_buy, diff = compare(final_property_value, final_renting_wealth)
+
+    flips = flip_thresholds(p, r, down_payment, loan_amount, avg_rate, is_buy,
+                            loan_years, appreciation, invest_return)
+
+    def spread(values):
+        full = np.full(n, np.nan)
+        full[valid] = values
+        return full
+
+    out["down_payment"] = _rounded(spread(down_payment), valid)
+    out["loan_amount"] = _rounded(spread(loan_amount), valid)
+    out["monthly_emi"] = _rounded(spread(emi), valid)
+    out["effective_emi"] = _rounded(spread(effective_emi), valid)
+    out["total_tax_saved"] = _rounded(spread(total_tax_saved), valid)
+    out["final_property_value"] = _rounded(spread(final_property_value), valid)
+    out["final_renting_wealth"] = _rounded(spread(final_renting_wealth), valid)
+
+    decision = np.full(n, None, dtype=object)
+    decision[valid] = decision_labels(is_buy)
+    out["decision"] = decision
+
+    out["wealth_difference"] = _rounded(spread(diff), valid)
+
+    # Flip thresholds for sensitivity
+    out["current_interest_rate"] = np.where(valid, round(avg_rate, 2), np.nan)
+    out["interest_rate_flip"] = spread(flips["interest_rate_flip"])
+    rent_flip = spread(flips["rent_flip"])
+    out["rent_flip"] = _rounded(rent_flip, ~np.isnan(rent_flip))
+    holding_flip = spread(flips["holding_period_flip"])
+    out["holding_period_flip"] = _rounded(holding_flip, ~np.isnan(holding_flip))
+
+    return pd.DataFrame(out)
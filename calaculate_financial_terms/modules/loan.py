@@ -1,5 +1,7 @@
 import pandas as pd
+import numpy as np
 import math
+from dataclasses import dataclass
 
 def average_interest_rate(csv_path):
     df = pd.read_csv(csv_path)
@@ -11,30 +13,72 @@ def calculate_emi(principal, annual_rate, tenure_years=20):
     emi = principal * (R * (1 + R)**N) / ((1 + R)**N - 1)
     return emi
 
-def amortization_yearly(principal, annual_rate, tenure_years=20):
+
+@dataclass
+class AmortizationSchedule:
+    """Yearly loan schedule. Arrays are shaped (*loans, years); emi is shaped (*loans)."""
+    interest: np.ndarray
+    principal: np.ndarray
+    balance: np.ndarray
+    emi: np.ndarray
+
+
+def amortization_schedule(principal, annual_rate, tenure_years=20):
+    """
+    Closed-form yearly amortization.
+
+    principal, annual_rate and tenure_years broadcast against each other, so
+    vectors of loans give a (loans x years) schedule from one call. The
+    outstanding balance after k months is P(1+R)^k - EMI((1+R)^k - 1)/R, and
+    each year's principal is the drop in balance over its 12 months. Years
+    past a loan's tenure are zero.
+    """
+    principal, annual_rate, tenure_years = np.broadcast_arrays(
+        np.asarray(principal, dtype=float),
+        np.asarray(annual_rate, dtype=float),
+        np.asarray(tenure_years, dtype=int),
+    )
     R = annual_rate / (12 * 100)
-    EMI = calculate_emi(principal, annual_rate, tenure_years)
+    N = tenure_years * 12
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        emi = np.where(R == 0, principal / N, calculate_emi(principal, annual_rate, tenure_years))
 
-    balance = principal
-    yearly = []
+        # Balance at every year boundary, month 0 through the longest tenure
+        months = 12 * np.arange(int(tenure_years.max(initial=0)) + 1)
+        growth = (1 + R[..., None]) ** months
+        balance = np.where(
+            R[..., None] == 0,
+            principal[..., None] - emi[..., None] * months,
+            principal[..., None] * growth - emi[..., None] * (growth - 1) / R[..., None],
+        )
+    balance = np.where(months <= N[..., None], balance, 0.0)
 
-    for year in range(1, tenure_years + 1):
-        interest_year = 0
-        principal_year = 0
+    principal_paid = balance[..., :-1] - balance[..., 1:]
+    interest_paid = 12 * emi[..., None] - principal_paid
 
-        for _ in range(12):
-            interest = balance * R
-            principal_paid = EMI - interest
-            balance -= principal_paid
+    active = months[1:] <= N[..., None]
+    return AmortizationSchedule(
+        interest=np.where(active, interest_paid, 0.0),
+        principal=np.where(active, principal_paid, 0.0),
+        balance=np.maximum(balance[..., 1:], 0),
+        emi=emi,
+    )
 
-            interest_year += interest
-            principal_year += principal_paid
 
-        yearly.append({
+def amortization_yearly(principal, annual_rate, tenure_years=20):
+    schedule = amortization_schedule(principal, annual_rate, tenure_years)
+
+    yearly = [
+        {
             "year": year,
-            "interest": interest_year,
-            "principal": principal_year,
-            "balance": max(balance, 0)
-        })
+            "interest": float(interest),
+            "principal": float(principal_paid),
+            "balance": float(balance)
+        }
+        for year, (interest, principal_paid, balance) in enumerate(
+            zip(schedule.interest, schedule.principal, schedule.balance), start=1
+        )
+    ]
 
-    return yearly, EMI
+    return yearly, float(schedule.emi)
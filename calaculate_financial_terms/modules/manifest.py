@@ -0,0 +1,84 @@
+"""
+Manifest for incremental re-analysis.
+
+Stores one 64-bit content hash per input row plus a fingerprint of the
+assumptions the output was computed with, next to the analysis CSV. A later
+run can then reuse every output row whose input hash is unchanged, and only
+has to recompute everything when the assumptions fingerprint differs.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Bump when the engine's output for the same inputs, or the row hash, changes
+MANIFEST_VERSION = 2
+
+
+@dataclass
+class Manifest:
+    assumptions: str
+    row_hashes: np.ndarray
+
+
+def manifest_path(output_path):
+    return output_path.with_name(output_path.stem + "_manifest.npz")
+
+
+def row_hashes(df):
+    """
+    Content hash of every row (all columns, index ignored) as a uint64 array.
+
+    Values are hashed in a canonical form, so a row hashes the same whatever
+    dtypes pandas inferred for the file or chunk it came from: numbers as
+    float64 (60955 and 60955.0 are one value), anything else as Python
+    objects, and a missing value the same way in every column type.
+    """
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        canonical = values.astype("float64") if values.dtype.kind in "iuf" else values.astype(object)
+        hashes = pd.util.hash_pandas_object(canonical, index=False).to_numpy()
+        columns[col] = np.where(values.isna().to_numpy(), 0, hashes)
+    return pd.util.hash_pandas_object(pd.DataFrame(columns, index=df.index), index=False).to_numpy()
+
+
+def assumptions_fingerprint(**assumptions):
+    payload = json.dumps({"version": MANIFEST_VERSION, **assumptions}, sort_keys=True, default=float)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path):
+    if not path.exists():
+        return None
+    with np.load(path) as data:
+        return Manifest(assumptions=str(data["assumptions"]), row_hashes=data["row_hashes"])
+
+
+def save_manifest(path, manifest):
+    # Write to a temp file first so an interrupted run never leaves a half-written manifest
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, assumptions=np.array(manifest.assumptions), row_hashes=manifest.row_hashes)
+    tmp_path.replace(path)
+
+
+def match_rows(new_hashes, old_hashes):
+    """
+    For every new row, the position of an identical row in the previous run,
+    or -1 if it is new or changed. Also returns how many previous rows no
+    longer appear in the input.
+    """
+    if len(old_hashes) == 0:
+        return np.full(len(new_hashes), -1), 0
+
+    unique_old, first_pos = np.unique(old_hashes, return_index=True)
+    slot = np.minimum(np.searchsorted(unique_old, new_hashes), len(unique_old) - 1)
+    found = unique_old[slot] == new_hashes
+    positions = np.where(found, first_pos[slot], -1)
+
+    removed = int((~np.isin(old_hashes, new_hashes)).sum())
+    return positions, removed
@@ -1,19 +1,32 @@
+import numpy as np
+
+# All functions broadcast over NumPy arrays; scalar inputs give scalar results.
+
 def total_rent_paid(start_rent, escalation_rate, years=20):
-    total = 0
-    rent = start_rent
+    # Geometric series of 12 * rent * (1 + g)^t for t = 0 .. years - 1
+    start_rent, escalation_rate, years = np.broadcast_arrays(
+        np.asarray(start_rent, dtype=float),
+        np.asarray(escalation_rate, dtype=float),
+        np.asarray(years),
+    )
 
-    for _ in range(years):
-        total += rent * 12
-        rent *= (1 + escalation_rate)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = ((1 + escalation_rate) ** years - 1) / escalation_rate
+    growth = np.where(escalation_rate == 0, years, growth)
 
-    return total
+    return (start_rent * 12 * growth)[()]
 
 def lumpsum_growth(amount, annual_return, years=20):
     return amount * ((1 + annual_return) ** years)
 
 def sip_future_value(monthly_sip, annual_return, years=20):
-    months = years * 12
-    r = annual_return / 12
-    if r == 0:
-        return monthly_sip * months
-    return monthly_sip * (((1 + r)**months - 1) / r)
+    months = np.multiply(years, 12)
+    r = np.divide(annual_return, 12)
+    if np.ndim(r) == 0:
+        if r == 0:
+            return monthly_sip * months
+        return monthly_sip * (((1 + r)**months - 1) / r)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = ((1 + r)**months - 1) / r
+    return monthly_sip * np.where(r == 0, months, factor)
@@ -0,0 +1,98 @@
+"""
+Monte Carlo scenario engine.
+
+Instead of a single appreciation / investment return / loan rate, draw many
+scenarios of the three and evaluate every property against all of them as
+(properties x scenarios) arrays. Properties are processed in batches sized
+so the working arrays stay under a memory ceiling.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from modules.loan import calculate_emi
+from modules.buy import buying_wealth
+from modules.rent import lumpsum_growth, sip_future_value
+
+# float64 arrays of shape (batch, scenarios) alive at once while evaluating a batch
+_ARRAYS_PER_BATCH = 8
+
+
+@dataclass
+class Scenarios:
+    """One value per scenario for each uncertain assumption (rates as fractions, loan rate in %)."""
+    appreciation: np.ndarray
+    invest_return: np.ndarray
+    interest_rate: np.ndarray
+
+    def __len__(self):
+        return len(self.appreciation)
+
+
+def draw_scenarios(n, seed, appreciation=(0.06, 0.02), invest_return=(0.10, 0.03),
+                   interest_rate=(7.0, 1.0), min_interest_rate=0.5):
+    """
+    Draw n scenarios from independent normal distributions, each given as
+    (mean, standard deviation). Loan rates are floored at min_interest_rate.
+    """
+    rng = np.random.default_rng(seed)
+    return Scenarios(
+        appreciation=rng.normal(*appreciation, size=n),
+        invest_return=rng.normal(*invest_return, size=n),
+        interest_rate=np.maximum(rng.normal(*interest_rate, size=n), min_interest_rate),
+    )
+
+
+def batch_size(n_scenarios, memory_limit_mb):
+    """Largest number of properties whose working arrays fit in memory_limit_mb."""
+    bytes_per_property = n_scenarios * 8 * _ARRAYS_PER_BATCH
+    return max(1, int(memory_limit_mb * 1024 * 1024 // bytes_per_property))
+
+
+def wealth_difference(price, rent, scenarios, down_payment_rate=0.25, loan_years=20):
+    """
+    Buy-minus-rent wealth for every property in every scenario, shaped
+    (properties, scenarios). Positive means buying ends up ahead.
+    """
+    price = np.asarray(price, dtype=float)[:, None]
+    rent = np.asarray(rent, dtype=float)[:, None]
+
+    down_payment = price * down_payment_rate
+    loan_amount = price - down_payment
+
+    # EMI is linear in the principal, so compute it once per scenario rate
+    emi = loan_amount * calculate_emi(1.0, scenarios.interest_rate, loan_years)
+
+    final_property = buying_wealth(price, scenarios.appreciation, loan_years)
+    renting = (lumpsum_growth(down_payment, scenarios.invest_return, loan_years)
+               + np.maximum(emi - rent, 0) * sip_future_value(1.0, scenarios.invest_return, loan_years))
+
+    return final_property - renting
+
+
+def simulate(price, rent, scenarios, percentiles=(5, 50, 95), memory_limit_mb=256,
+             down_payment_rate=0.25, loan_years=20):
+    """
+    Probability that buying beats renting and percentiles of the wealth
+    difference for each property. Returns a dict of 1-D arrays:
+    p_buy_better and wealth_difference_p<q> for every q in percentiles.
+    """
+    price = np.asarray(price, dtype=float)
+    rent = np.asarray(rent, dtype=float)
+    n = len(price)
+
+    result = {"p_buy_better": np.empty(n)}
+    for q in percentiles:
+        result[f"wealth_difference_p{q}"] = np.empty(n)
+
+    step = batch_size(len(scenarios), memory_limit_mb)
+    for start in range(0, n, step):
+        batch = slice(start, start + step)
+        diff = wealth_difference(price[batch], rent[batch], scenarios, down_payment_rate, loan_years)
+
+        result["p_buy_better"][batch] = (diff > 0).mean(axis=1)
+        for q, values in zip(percentiles, np.percentile(diff, percentiles, axis=1)):
+            result[f"wealth_difference_p{q}"][batch] = values
+
+    return result
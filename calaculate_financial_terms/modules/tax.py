@@ -1,6 +1,13 @@
+import numpy as np
+
+# Annual deduction caps: Section 24(b) on home-loan interest, Section 80C on principal
+INTEREST_DEDUCTION_LIMIT = 200000
+PRINCIPAL_DEDUCTION_LIMIT = 150000
+
 def tax_savings(yearly_interest, yearly_principal, tax_slab):
-    interest_deduction = min(yearly_interest, 200000)
-    principal_deduction = min(yearly_principal, 150000)
+    # Works on scalars or on arrays of any shape (e.g. a loans x years schedule)
+    interest_deduction = np.minimum(yearly_interest, INTEREST_DEDUCTION_LIMIT)
+    principal_deduction = np.minimum(yearly_principal, PRINCIPAL_DEDUCTION_LIMIT)
 
     total_deduction = interest_deduction + principal_deduction
     savings = total_deduction * tax_slab
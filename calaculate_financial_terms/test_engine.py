@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+from modules.buy import buying_wealth
+from modules.engine import FLIP_HOLDING_RANGE, FLIP_RATE_RANGE, FLIP_RENT_RANGE, analyze_frame, flip_thresholds
+from modules.loan import calculate_emi
+from modules.rent import lumpsum_growth, sip_future_value
+
+AVG_RATE = 8.5
+LOAN_YEARS = 20
+DOWN_PAYMENT_RATE = 0.25
+
+# (price, monthly rent): listings from the merged dataset that buy or rent, plus
+# a mistyped price no rate, rent or holding period in range can flip
+PROPERTIES = [
+    (14432789, 60955),
+    (32982317, 129609),
+    (11917183, 54874),
+    (10750890, 37264),
+    (6525313, 24595),
+    (1080.3, 24456),
+]
+
+
+def buys(price, rent, rate=AVG_RATE, years=LOAN_YEARS):
+    """The pipeline's decision for one property, evaluated directly: does buying end up wealthier?"""
+    down_payment = price * DOWN_PAYMENT_RATE
+    emi = calculate_emi(price - down_payment, rate, min(years, LOAN_YEARS))
+    renting = lumpsum_growth(down_payment, 0.10, years) + sip_future_value(max(emi - rent, 0), 0.10, years)
+    return buying_wealth(price, 0.06, years) > renting
+
+
+def solve(properties=PROPERTIES):
+    price, rent = (np.array(column, dtype=float) for column in zip(*properties))
+    down_payment = price * DOWN_PAYMENT_RATE
+    is_buy = [buys(p, r) for p, r in properties]
+    return flip_thresholds(price, rent, down_payment, price - down_payment, AVG_RATE, is_buy,
+                           loan_years=LOAN_YEARS)
+
+
+def test_flip_thresholds_empty():
+    print("🧪 Solving flip thresholds for no properties...")
+    flips = flip_thresholds([], [], [], [], AVG_RATE, [])
+    for name, values in flips.items():
+        assert values.shape == (0,), name
+    print("✅ Empty input gives empty threshold arrays")
+
+
+def test_analyze_frame_empty():
+    print("🧪 Analyzing an empty listings frame...")
+    df = pd.DataFrame({
+        col: pd.Series(dtype=float)
+        for col in ["title", "city", "location", "bedrooms", "price_inr", "area_sqft", "estimated_monthly_rent"]
+    })
+    result = analyze_frame(df, AVG_RATE)
+    assert len(result) == 0
+    assert "holding_period_flip" in result.columns
+    print(f"✅ Empty input gives an empty table with {len(result.columns)} columns")
+
+
+def test_rate_flip():
+    print("🧪 Checking the decision flips at the interest rate threshold...")
+    flips = solve()["interest_rate_flip"]
+    for (price, rent), rate in zip(PROPERTIES, flips):
+        if np.isnan(rate):
+            # Only BUY-at-low / RENT-at-high is bracketed
+            assert not (buys(price, rent, FLIP_RATE_RANGE[0]) and not buys(price, rent, FLIP_RATE_RANGE[1]))
+            continue
+        # Reported to 2 decimals, so check one step either side
+        assert buys(price, rent, rate - 0.01), (price, rent, rate)
+        assert not buys(price, rent, rate + 0.01), (price, rent, rate)
+    print(f"✅ {int(np.isfinite(flips).sum())} of {len(flips)} properties flip at the reported rate")
+
+
+def test_rent_flip():
+    print("🧪 Checking the decision flips at the rent threshold...")
+    flips = solve()["rent_flip"]
+    for (price, rent), threshold in zip(PROPERTIES, flips):
+        if np.isnan(threshold):
+            low, high = rent * FLIP_RENT_RANGE[0], rent * FLIP_RENT_RANGE[1]
+            assert buys(price, low) == buys(price, high), (price, rent)
+            continue
+        # Buying wins once rent is above the threshold
+        assert not buys(price, threshold - 1), (price, rent, threshold)
+        assert buys(price, threshold + 1), (price, rent, threshold)
+    print(f"✅ {int(np.isfinite(flips).sum())} of {len(flips)} properties flip at the reported rent")
+
+
+def test_holding_period_flip():
+    print("🧪 Checking holding period flips against every year in the range...")
+    flips = solve()["holding_period_flip"]
+    for (price, rent), years in zip(PROPERTIES, flips):
+        current = buys(price, rent)
+        expected = next(
+            (y for y in range(FLIP_HOLDING_RANGE[0], FLIP_HOLDING_RANGE[1] + 1)
+             if buys(price, rent, years=y) != current),
+            None,
+        )
+        if expected is None:
+            assert np.isnan(years), (price, rent, years)
+        else:
+            assert years == expected, (price, rent, years, expected)
+    print(f"✅ {len(flips)} holding period flips match the brute-force scan")
+
+
+def test_no_flip_is_nan():
+    print("🧪 Checking a property that never flips...")
+    flips = solve([PROPERTIES[-1]])
+    for name, values in flips.items():
+        assert np.isnan(values[0]), name
+    print("✅ Every threshold is NaN")
+
+
+if __name__ == "__main__":
+    test_flip_thresholds_empty()
+    test_analyze_frame_empty()
+    test_rate_flip()
+    test_rent_flip()
+    test_holding_period_flip()
+    test_no_flip_is_nan()
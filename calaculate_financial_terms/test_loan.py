@@ -0,0 +1,75 @@
+import numpy as np
+from modules.loan import AmortizationSchedule, amortization_schedule, amortization_yearly, calculate_emi
+
+
+def monthly_loop(principal, annual_rate, tenure_years):
+    """The month-by-month loop amortization_schedule replaced, for one loan."""
+    R = annual_rate / (12 * 100)
+    emi = principal / (tenure_years * 12) if R == 0 else calculate_emi(principal, annual_rate, tenure_years)
+
+    balance = principal
+    interest, principal_paid, balances = [], [], []
+    for _ in range(tenure_years):
+        interest_year = principal_year = 0
+        for _ in range(12):
+            month_interest = balance * R
+            balance -= emi - month_interest
+            interest_year += month_interest
+            principal_year += emi - month_interest
+        interest.append(interest_year)
+        principal_paid.append(principal_year)
+        balances.append(max(balance, 0))
+
+    return np.array(interest), np.array(principal_paid), np.array(balances), emi
+
+
+def assert_matches_loop(schedule, principal, annual_rate, tenure_years, years):
+    interest, principal_paid, balance, emi = monthly_loop(principal, annual_rate, tenure_years)
+    # Years past the tenure are zero
+    pad = years - tenure_years
+    interest, principal_paid, balance = (np.pad(a, (0, pad)) for a in (interest, principal_paid, balance))
+
+    assert np.isclose(schedule.emi, emi, rtol=1e-12)
+    assert np.allclose(schedule.interest, interest, rtol=1e-9, atol=1e-4)
+    assert np.allclose(schedule.principal, principal_paid, rtol=1e-9, atol=1e-4)
+    assert np.allclose(schedule.balance, balance, rtol=1e-9, atol=1e-4)
+
+
+def test_scalar_schedule():
+    print("🧪 Comparing a single-loan schedule against the monthly loop...")
+    for principal, rate, tenure in [(7_500_000, 8.5, 20), (2_000_000, 11.25, 15), (1_000_000, 0, 10)]:
+        schedule = amortization_schedule(principal, rate, tenure)
+        assert schedule.interest.shape == (tenure,) and np.ndim(schedule.emi) == 0
+        assert_matches_loop(schedule, principal, rate, tenure, tenure)
+
+    # amortization_yearly keeps its old list-of-dicts shape
+    yearly, emi = amortization_yearly(7_500_000, 8.5)
+    interest, _, balance, loop_emi = monthly_loop(7_500_000, 8.5, 20)
+    assert len(yearly) == 20 and isinstance(emi, float) and np.isclose(emi, loop_emi)
+    assert [y["year"] for y in yearly] == list(range(1, 21))
+    assert np.allclose([y["interest"] for y in yearly], interest)
+    assert np.allclose([y["balance"] for y in yearly], balance, atol=1e-4)
+    print("✅ Scalar schedules (including a 0% loan) match the monthly loop")
+
+
+def test_array_schedule():
+    print("🧪 Comparing a broadcast schedule against the monthly loop per loan...")
+    principal = np.array([7_500_000, 2_000_000, 1_000_000, 45_000_000])
+    rate = np.array([8.5, 11.25, 0, 7.1])
+    tenure = np.array([20, 15, 10, 30])
+
+    schedule = amortization_schedule(principal, rate, tenure)
+    assert schedule.interest.shape == (4, 30) and schedule.emi.shape == (4,)
+    for i in range(len(principal)):
+        loan = AmortizationSchedule(schedule.interest[i], schedule.principal[i], schedule.balance[i], schedule.emi[i])
+        assert_matches_loop(loan, principal[i], rate[i], tenure[i], 30)
+
+    # One rate against many loans broadcasts too
+    schedule = amortization_schedule(principal[:, None], 8.5)
+    assert schedule.interest.shape == (4, 1, 20)
+    print(f"✅ {len(principal)} loans with mixed rates and tenures match the monthly loop")
+
+
+if __name__ == "__main__":
+    test_scalar_schedule()
+    test_array_schedule()
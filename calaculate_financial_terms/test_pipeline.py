@@ -0,0 +1,95 @@
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from generate_final_buy_rent_csv import normalize_listings, analyze_rows
+from modules.loan import average_interest_rate
+
+BASE_DIR = Path(__file__).resolve().parent
+SCRIPT = BASE_DIR / "generate_final_buy_rent_csv.py"
+INPUT_PATH = BASE_DIR / "merged_real_estate_data_RAG_final.csv"
+
+
+def run_pipeline(output, *args):
+    subprocess.run([sys.executable, str(SCRIPT), "--output", str(output), *args],
+                   cwd=BASE_DIR, check=True, capture_output=True)
+    return output.read_bytes()
+
+
+def incremental_counts(output, *args):
+    """Run incrementally and return the (reused, new or changed, removed) row counts it reports."""
+    result = subprocess.run([sys.executable, str(SCRIPT), "--output", str(output), "--incremental", *args],
+                            cwd=BASE_DIR, check=True, capture_output=True, text=True)
+    counts = re.search(r"(\d+) rows reused, (\d+) new or changed, (\d+) removed", result.stdout)
+    return tuple(int(n) for n in counts.groups())
+
+
+def test_full_run_matches_row_loop():
+    print("🧪 Comparing a full run against the row-by-row reference...")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        listings = pd.read_csv(INPUT_PATH).head(600)
+        listings.to_csv(tmp / "listings.csv", index=False)
+        full = run_pipeline(tmp / "full.csv", "--input", str(tmp / "listings.csv"))
+    reference = analyze_rows(normalize_listings(listings), average_interest_rate(BASE_DIR / "banks.csv"))
+    assert full.decode("utf-8") == reference.to_csv(index=False), "full run differs from the row loop"
+    print(f"✅ Full run output is byte-identical to the row loop ({len(full):,} bytes)")
+
+
+def test_chunked_matches_full_run():
+    print("🧪 Comparing chunked output against a full run...")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        full = run_pipeline(tmp / "full.csv")
+        # An odd chunk size, so chunks infer different dtypes for the input columns
+        chunked = run_pipeline(tmp / "chunked.csv", "--chunksize", "397", "--workers", "2")
+    assert chunked == full, "chunked output differs from the full run"
+    print(f"✅ Chunked output is byte-identical ({len(full):,} bytes)")
+
+
+def test_incremental_matches_full_run():
+    print("🧪 Comparing incremental output against a full run...")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        run_pipeline(tmp / "incremental.csv")
+
+        # Change some rents, drop a few rows and add one, then re-run both ways
+        listings = pd.read_csv(INPUT_PATH)
+        listings.loc[::50, "estimated_monthly_rent"] += 1000
+        listings = pd.concat([listings.drop(index=range(5, 15)), listings.iloc[[0]]], ignore_index=True)
+        changed_input = tmp / "listings.csv"
+        listings.to_csv(changed_input, index=False)
+
+        incremental = run_pipeline(tmp / "incremental.csv", "--input", str(changed_input), "--incremental")
+        full = run_pipeline(tmp / "full.csv", "--input", str(changed_input))
+    assert incremental == full, "incremental output differs from the full run"
+    print(f"✅ Incremental output is byte-identical ({len(full):,} bytes)")
+
+
+def test_incremental_after_chunked_run():
+    print("🧪 Re-running incrementally after a chunked run...")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        listings = pd.read_csv(INPUT_PATH)
+        rows = len(listings)
+        run_pipeline(tmp / "analysis.csv", "--chunksize", "397", "--workers", "2")
+        # Same input: chunks were typed differently from the whole file, but no row changed
+        assert incremental_counts(tmp / "analysis.csv") == (rows, 0, 0)
+
+        # A missing rent turns the int column into float64 for the whole file; only that row changed
+        listings.loc[7, "estimated_monthly_rent"] = None
+        changed_input = tmp / "listings.csv"
+        listings.to_csv(changed_input, index=False)
+        assert incremental_counts(tmp / "analysis.csv", "--input", str(changed_input)) == (rows - 1, 1, 1)
+    print(f"✅ All {rows} unchanged rows reused; one blanked rent recomputes one row")
+
+
+if __name__ == "__main__":
+    test_full_run_matches_row_loop()
+    test_chunked_matches_full_run()
+    test_incremental_matches_full_run()
+    test_incremental_after_chunked_run()
@@ -0,0 +1,117 @@
+import itertools
+
+import numpy as np
+from modules.buy import buying_wealth
+from modules.compare import BUY_DECISION, RENT_DECISION, compare, decision_labels
+from modules.rent import lumpsum_growth, sip_future_value, total_rent_paid
+from modules.tax import tax_savings
+
+
+# The scalar implementations the broadcasting primitives replaced
+
+def scalar_tax_savings(yearly_interest, yearly_principal, tax_slab):
+    return (min(yearly_interest, 200000) + min(yearly_principal, 150000)) * tax_slab
+
+
+def scalar_total_rent_paid(start_rent, escalation_rate, years=20):
+    total = 0
+    rent = start_rent
+    for _ in range(years):
+        total += rent * 12
+        rent *= (1 + escalation_rate)
+    return total
+
+
+def scalar_lumpsum_growth(amount, annual_return, years=20):
+    return amount * ((1 + annual_return) ** years)
+
+
+def scalar_sip_future_value(monthly_sip, annual_return, years=20):
+    months = years * 12
+    r = annual_return / 12
+    if r == 0:
+        return monthly_sip * months
+    return monthly_sip * (((1 + r)**months - 1) / r)
+
+
+def scalar_buying_wealth(property_price, appreciation_rate, years=20):
+    return property_price * ((1 + appreciation_rate) ** years)
+
+
+def scalar_compare(buy_wealth, rent_wealth):
+    if buy_wealth > rent_wealth:
+        return "BUYING is financially better", buy_wealth - rent_wealth
+    else:
+        return "RENTING is financially better", rent_wealth - buy_wealth
+
+
+# (primitive, scalar reference, argument values to combine)
+CASES = [
+    (tax_savings, scalar_tax_savings, ([85_000, 250_000.5], [120_000, 310_000.0], [0.3, 0.2])),
+    (total_rent_paid, scalar_total_rent_paid, ([25_000, 61_250.5], [0.05, 0.0], [2, 20])),
+    (lumpsum_growth, scalar_lumpsum_growth, ([2_500_000, 812_345.5], [0.10, 0.0], [5, 20])),
+    (sip_future_value, scalar_sip_future_value, ([12_000, 0, 4_567.25], [0.10, 0.0], [5, 20])),
+    (buying_wealth, scalar_buying_wealth, ([14_432_789, 6_525_313.0], [0.06, 0.0], [5, 20])),
+]
+
+
+def assert_same_scalar(new, old, context):
+    # NumPy scalars count as the Python type they stand for (np.float64 is a float)
+    assert np.isclose(new, old, rtol=1e-12, atol=0), (context, new, old)
+    assert isinstance(new, (type(old), np.floating if isinstance(old, float) else np.integer)), \
+        (context, type(new), type(old))
+    assert np.ndim(new) == 0, context
+
+
+def test_scalar_calls():
+    print("🧪 Comparing scalar calls against the original scalar code...")
+    checked = 0
+    for fn, reference, values in CASES:
+        for args in itertools.product(*values):
+            assert_same_scalar(fn(*args), reference(*args), (fn.__name__, args))
+            checked += 1
+
+    # The old loop only returned an int for one year of a whole-rupee rent, before any
+    # escalation was applied; the closed form gives the same amount as a float
+    assert scalar_total_rent_paid(25_000, 0.05, 1) == 300_000
+    assert_same_scalar(total_rent_paid(25_000, 0.05, 1), 300_000.0, ("total_rent_paid", 1))
+
+    for buy, rent in [(4_000_000, 3_500_000.5), (1_000, 2_000), (5.0, 5.0)]:
+        decision, diff = compare(buy, rent)
+        old_decision, old_diff = scalar_compare(buy, rent)
+        assert decision == old_decision, (buy, rent)
+        assert diff == old_diff and type(diff) is type(old_diff), (buy, rent, diff, old_diff)
+        checked += 1
+    print(f"✅ {checked} scalar calls give the same values and types")
+
+
+def test_array_calls():
+    print("🧪 Comparing array calls against the scalar results element-wise...")
+    for fn, reference, values in CASES:
+        grid = [np.array(column) for column in zip(*itertools.product(*values))]
+        result = fn(*grid)
+        expected = [reference(*args) for args in zip(*(column.tolist() for column in grid))]
+        assert result.shape == grid[0].shape, fn.__name__
+        assert np.allclose(result, expected, rtol=1e-12, atol=0), fn.__name__
+
+    # Arrays broadcast against scalars and against each other, e.g. a (loans x years) grid
+    years = np.arange(1, 21)
+    grid = lumpsum_growth(np.array([[1_000_000], [2_500_000]]), 0.10, years)
+    assert grid.shape == (2, 20)
+    assert np.isclose(grid[1, -1], scalar_lumpsum_growth(2_500_000, 0.10, 20))
+
+    buy = np.array([4_000_000, 1_000, 5.0])
+    rent = np.array([3_500_000.5, 2_000, 5.0])
+    buy_better, diff = compare(buy, rent)
+    assert buy_better.dtype == bool
+    for i, (b, r) in enumerate(zip(buy.tolist(), rent.tolist())):
+        old_decision, old_diff = scalar_compare(b, r)
+        assert decision_labels(buy_better)[i] == old_decision
+        assert diff[i] == old_diff
+    assert decision_labels(buy_better).tolist() == [BUY_DECISION, RENT_DECISION, RENT_DECISION]
+    print(f"✅ {len(CASES) + 1} primitives match their scalar results element-wise")
+
+
+if __name__ == "__main__":
+    test_scalar_calls()
+    test_array_calls()
@@ -0,0 +1,97 @@
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from modules.compare import BUY_DECISION
+from modules.engine import analyze_frame
+from modules.loan import average_interest_rate
+from modules.scenarios import draw_scenarios, simulate, wealth_difference
+
+BASE_DIR = Path(__file__).resolve().parent
+INPUT_PATH = BASE_DIR / "merged_real_estate_data_RAG_final.csv"
+AVG_RATE = average_interest_rate(BASE_DIR / "banks.csv")
+SEED = 7
+
+PRICES = np.array([14432789, 32982317, 10750890, 6525313, 1080.3])
+RENTS = np.array([60955, 129609, 37264, 24595, 24456])
+
+
+def test_shapes():
+    print("🧪 Checking scenario and result shapes...")
+    scenarios = draw_scenarios(500, SEED)
+    again = draw_scenarios(500, SEED)
+    for name in ("appreciation", "invest_return", "interest_rate"):
+        assert getattr(scenarios, name).shape == (500,), name
+        assert np.array_equal(getattr(scenarios, name), getattr(again, name)), name
+    assert scenarios.interest_rate.min() >= 0.5
+
+    assert wealth_difference(PRICES, RENTS, scenarios).shape == (len(PRICES), 500)
+
+    result = simulate(PRICES, RENTS, scenarios, percentiles=(5, 50, 95))
+    assert list(result) == ["p_buy_better", "wealth_difference_p5", "wealth_difference_p50", "wealth_difference_p95"]
+    for name, values in result.items():
+        assert values.shape == (len(PRICES),), name
+    assert ((result["p_buy_better"] >= 0) & (result["p_buy_better"] <= 1)).all()
+    assert (result["wealth_difference_p5"] <= result["wealth_difference_p50"]).all()
+    assert (result["wealth_difference_p50"] <= result["wealth_difference_p95"]).all()
+
+    # Batching to a tiny memory ceiling (one property at a time) gives the same numbers
+    batched = simulate(PRICES, RENTS, scenarios, percentiles=(5, 50, 95), memory_limit_mb=0.001)
+    for name, values in result.items():
+        assert np.array_equal(batched[name], values), name
+    print(f"✅ {len(PRICES)} properties x {len(scenarios)} scenarios give {len(result)} columns of the right shape")
+
+
+def test_zero_variance_matches_engine():
+    print("🧪 Checking zero-variance scenarios against the deterministic engine...")
+    df = pd.read_csv(INPUT_PATH)
+    valid = ((df["price_inr"] > 0) & (df["estimated_monthly_rent"] > 0)).to_numpy()
+    price = df.loc[valid, "price_inr"].to_numpy(dtype=float)
+    rent = df.loc[valid, "estimated_monthly_rent"].to_numpy(dtype=float)
+
+    # Every scenario is the pipeline's point assumptions
+    scenarios = draw_scenarios(4, SEED, appreciation=(0.06, 0), invest_return=(0.10, 0),
+                               interest_rate=(AVG_RATE, 0))
+    result = simulate(price, rent, scenarios)
+    expected = analyze_frame(df[valid], AVG_RATE)
+
+    is_buy = (expected["decision"] == BUY_DECISION).to_numpy()
+    assert np.array_equal(result["p_buy_better"], is_buy.astype(float))
+
+    # The spread collapses to the engine's wealth difference, signed towards buying
+    signed = np.where(is_buy, 1, -1) * expected["wealth_difference"].to_numpy(dtype=float)
+    for name in ("wealth_difference_p5", "wealth_difference_p50", "wealth_difference_p95"):
+        assert np.allclose(result[name], signed, rtol=0, atol=1), name
+    print(f"✅ {len(price)} decisions and wealth differences match analyze_frame")
+
+
+def test_scenarios_csv():
+    print("🧪 Checking the columns of the scenario CSV...")
+    with tempfile.TemporaryDirectory() as tmp:
+        listings, output = Path(tmp) / "listings.csv", Path(tmp) / "scenarios.csv"
+        df = pd.read_csv(INPUT_PATH).head(50)
+        df.loc[3, "price_inr"] = None
+        df.to_csv(listings, index=False)
+        subprocess.run([sys.executable, str(BASE_DIR / "generate_scenarios_csv.py"), "--input", str(listings),
+                        "--output", str(output), "--scenarios", "200", "--seed", str(SEED)],
+                       cwd=BASE_DIR, check=True, capture_output=True)
+        out = pd.read_csv(output)
+
+    assert list(out.columns) == [
+        "title", "city", "location", "bedrooms", "price_inr", "estimated_monthly_rent",
+        "p_buy_better", "wealth_difference_p5", "wealth_difference_p50", "wealth_difference_p95",
+    ]
+    assert len(out) == 50
+    # A listing without a price gets no scenario results
+    assert out.loc[3, ["p_buy_better", "wealth_difference_p50"]].isna().all()
+    assert out.drop(index=3)["p_buy_better"].notna().all()
+    print(f"✅ {len(out)} rows with {len(out.columns)} columns")
+
+
+if __name__ == "__main__":
+    test_shapes()
+    test_zero_variance_matches_engine()
+    test_scenarios_csv()
@@ -16,6 +16,7 @@ function App() {
   const [error, setError] = useState(null);
   const [lastQuery, setLastQuery] = useState("");
   const [currentPage, setCurrentPage] = useState(1);
+  const [cursor, setCursor] = useState(null);
   const [selectedFilters, setSelectedFilters] = useState({ city: null, type: null, intent: null });
   const [explanationModal, setExplanationModal] = useState({ open: false, loading: false, data: null, error: null, type: "why" });
   const [activeTab, setActiveTab] = useState("ai");
@@ -66,6 +67,7 @@ function App() {
       setIntent(backendIntent || null);
       setLastQuery(builtQuery);
       setCurrentPage(1);
+      setCursor(res.data.cursor || null);
       const assistantMsg = {
         role: "assistant",
         content: answer,
@@ -121,10 +123,11 @@ function App() {
     setQuery("");
     setLoading(true);
     try {
-      const res = await axios.post(API_URL, { query: queryToSend, page: pageToSend });
+      const res = await axios.post(API_URL, { query: queryToSend, page: pageToSend, cursor: pageToSend > 1 ? cursor : null });
       const { answer, intent: backendIntent, total_results, page: resPage, has_more, show_filters, filters, properties } = res.data;
       setIntent(backendIntent || null);
       setCurrentPage(resPage || 1);
+      setCursor(res.data.cursor || null);
       const assistantMsg = {
         role: "assistant",
         content: answer || "No answer returned from the RAG system.",
@@ -0,0 +1,57 @@
+"""
+Benchmark the column-wise document builder against the row-by-row loop.
+
+Builds ingest documents and metadata from the analysis table (tiled up to
+--rows), checks both builders produce identical output and reports the
+speedup.
+
+    python benchmark_documents.py
+    python benchmark_documents.py --rows 200000 --repeat 3
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from ingest import DATA_PATH, INGEST_COLUMNS, build_documents, build_documents_rows, document_batches
+from modules.analysis_table import INDEX_NAME, available_columns, read_analysis_table
+
+
+def best_of(fn, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000, help="Tile the table up to this many rows")
+    parser.add_argument("--repeat", type=int, default=1, help="Take the best of N runs")
+    args = parser.parse_args()
+
+    stored = set(available_columns(DATA_PATH))
+    df = read_analysis_table(DATA_PATH, columns=[c for c in INGEST_COLUMNS if c in stored])
+    tiles = -(-args.rows // len(df))
+    df = pd.concat([df] * tiles, ignore_index=True).head(args.rows)
+    df.index.name = INDEX_NAME
+
+    print(f"📊 Building documents for {len(df)} rows (best of {args.repeat})...")
+
+    row_time, row_out = best_of(lambda: build_documents_rows(df), args.repeat)
+    col_time, col_out = best_of(lambda: build_documents(df), args.repeat)
+    batch_time, _ = best_of(lambda: sum(len(ids) for _, _, ids in document_batches(df, 1000)), args.repeat)
+
+    print(f"  row loop        : {row_time:8.3f}s  ({len(df) / row_time:,.0f} rows/s)")
+    print(f"  column-wise     : {col_time:8.3f}s  ({len(df) / col_time:,.0f} rows/s)")
+    print(f"  batches of 1000 : {batch_time:8.3f}s  ({len(df) / batch_time:,.0f} rows/s)")
+    print(f"  speedup         : {row_time / col_time:8.1f}x")
+    print(f"  identical output: {'✅ yes' if row_out == col_out else '❌ no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark the sparse embedding path against the old dense-list one.
+
+Measures, for the ingest corpus (optionally tiled to --rows documents):
+- embedding every document in ingest batches: time and peak traced memory,
+  including Chroma's own normalisation of what the function returns
+- embedding a single query: median and p99 latency through the
+  EmbeddingFunction wrapper Chroma calls on every search
+
+Uses the trained vectorizer, so run ingest.py first.
+
+    python benchmark_embeddings.py
+    python benchmark_embeddings.py --rows 100000 --queries 5000
+"""
+
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+from chromadb.api.types import normalize_embeddings
+
+from ingest import BATCH_SIZE, DATA_PATH, INGEST_COLUMNS, VECTORIZER_PATH, build_documents
+from modules.analysis_table import available_columns, read_analysis_table
+from tfidf_embedding import TfidfEmbeddingFunction
+
+QUERY = "2 BHK apartment in andheri west Mumbai under 80 lakhs"
+
+
+class DenseListEmbeddingFunction(TfidfEmbeddingFunction):
+    """The previous __call__: dense float32 array converted to nested Python lists."""
+
+    def __call__(self, input):
+        return self.vectorizer.transform(input).astype(np.float32).toarray().tolist()
+
+
+def embed_per_batch(ef, documents):
+    # Old ingest: one __call__ per batch, Chroma then normalises the lists to arrays
+    for i in range(0, len(documents), BATCH_SIZE):
+        normalize_embeddings(ef(documents[i : i + BATCH_SIZE]))
+
+
+def embed_sparse(ef, documents):
+    matrix = ef.transform(documents)
+    for batch in ef.batches(matrix, BATCH_SIZE):
+        normalize_embeddings(batch)
+
+
+def measure(fn):
+    """Wall time of fn, then its peak traced memory in MB on a second, traced run."""
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def query_latency(ef, n):
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        ef([QUERY])
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1e6, np.percentile(timings, 99) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=None, help="Tile the corpus up to this many documents")
+    parser.add_argument("--queries", type=int, default=2000, help="Single-query embeddings to time")
+    args = parser.parse_args()
+
+    stored = set(available_columns(DATA_PATH))
+    df = read_analysis_table(DATA_PATH, columns=[c for c in INGEST_COLUMNS if c in stored])
+    if args.rows:
+        tiles = -(-args.rows // len(df))
+        df = pd.concat([df] * tiles, ignore_index=True).head(args.rows)
+    documents, _, _ = build_documents(df)
+
+    old = DenseListEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    new = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+
+    print(f"📊 Embedding {len(documents)} documents in batches of {BATCH_SIZE}...")
+    old_time, old_peak = measure(lambda: embed_per_batch(old, documents))
+    new_time, new_peak = measure(lambda: embed_sparse(new, documents))
+    print(f"  dense lists : {old_time:7.3f}s  peak {old_peak:8.1f} MB")
+    print(f"  sparse CSR  : {new_time:7.3f}s  peak {new_peak:8.1f} MB")
+
+    print(f"🔎 Embedding one query {args.queries} times...")
+    old_p50, old_p99 = query_latency(old, args.queries)
+    new_p50, new_p99 = query_latency(new, args.queries)
+    print(f"  dense lists : p50 {old_p50:7.0f} us  p99 {old_p99:7.0f} us")
+    print(f"  sparse CSR  : p50 {new_p50:7.0f} us  p99 {new_p99:7.0f} us")
+
+    sample = documents[:1000]
+    same = (np.allclose(np.asarray(old(sample)), new(sample), atol=1e-6)
+            and np.allclose(np.asarray(old(sample)), new.transform(sample).toarray(), atol=1e-6))
+    print(f"  identical embeddings: {'✅ yes' if same else '❌ no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Load-test the market endpoints with and without HTTP caching.
+
+Serves the API with uvicorn on a local port and has a pool of client
+threads request /market_filters and a set of /market_snapshot filter
+combinations like MarketSnapshot.jsx sends, in three modes:
+
+- plain:      every request fetched in full, uncompressed
+- gzip:       every request fetched in full, gzip accepted
+- revalidate: gzip accepted and If-None-Match sent with the ETag of the
+              previous response, as a browser or proxy cache does
+
+Reports requests/sec, latency (median and p99) and bytes received per
+request for each mode. Needs GEMINI_API_KEY set (any value) and the
+ingested data, like the API itself.
+
+    python benchmark_http.py
+    python benchmark_http.py --clients 16 --requests 4000
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import uvicorn
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from rag_app.main import app  # noqa: E402
+
+PATHS = [
+    "/market_filters",
+    "/market_snapshot",
+    "/market_snapshot?bhk=2",
+    "/market_snapshot?bhk=2,3&min_price=50&max_price=200",
+    "/market_snapshot?min_area=900&max_area=1500",
+    "/market_snapshot?localities=powai,whitefield,koramangala",
+    "/market_snapshot?bhk=3&max_price=150&localities=bellandur,whitefield",
+]
+
+MODES = {
+    "plain": {"Accept-Encoding": "identity"},
+    "gzip": {"Accept-Encoding": "gzip"},
+    "revalidate": {"Accept-Encoding": "gzip"},
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def serve(port):
+    """Start uvicorn in a background thread and wait until it accepts requests."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, thread
+
+
+def client(base_url, mode, n, timings, received):
+    etags = {}
+    with httpx.Client(base_url=base_url, headers=MODES[mode]) as http:
+        for i in range(n):
+            path = PATHS[i % len(PATHS)]
+            headers = {"If-None-Match": etags[path]} if mode == "revalidate" and path in etags else {}
+            start = time.perf_counter()
+            with http.stream("GET", path, headers=headers) as response:
+                # Count bytes as they came over the wire, before decompression
+                size = sum(len(chunk) for chunk in response.iter_raw())
+            timings.append(time.perf_counter() - start)
+            received.append(size)
+            if "etag" in response.headers:
+                etags[path] = response.headers["etag"]
+
+
+def run(base_url, mode, clients, requests):
+    timings, received = [], []
+    threads = [
+        threading.Thread(target=client, args=(base_url, mode, requests // clients, timings, received))
+        for _ in range(clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    timings = np.array(timings) * 1000
+    return len(timings) / elapsed, np.percentile(timings, 50), np.percentile(timings, 99), np.mean(received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per mode")
+    args = parser.parse_args()
+
+    port = free_port()
+    server, thread = serve(port)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        # Warm up every path once before timing
+        run(base_url, "gzip", 1, len(PATHS))
+        print(f"🌐 {args.requests} requests per mode from {args.clients} clients over {len(PATHS)} market URLs...")
+        for mode in MODES:
+            rps, p50, p99, size = run(base_url, mode, args.clients, args.requests)
+            print(f"  {mode:10s}: {rps:8,.0f} req/s  p50 {p50:6.2f} ms  p99 {p99:6.2f} ms  {size:8,.0f} bytes/request")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Benchmark budget / locality pushdown for /ask retrieval.
+
+Builds selective queries from random listings ("2 BHK in powai Mumbai
+under 80 lakhs") and runs each through both backends twice: with the old
+city + bedrooms `where` clause, and with the budget ($lte on price_lakhs)
+and locality ($in on location) constraints pushed into the query as well.
+Reports per-query latency (median and p99) and how many of the top-k
+results break the user's constraints.
+
+Needs the collection and sparse_index.npz, so run ingest.py first.
+
+    python benchmark_pushdown.py
+    python benchmark_pushdown.py --queries 1000 --k 10
+"""
+
+import argparse
+import time
+
+import chromadb
+import numpy as np
+
+from ingest import CHROMA_DB_DIR, COLLECTION_NAME, SPARSE_INDEX_PATH, VECTORIZER_PATH
+from sparse_index import SparseIndex
+from tfidf_embedding import TfidfEmbeddingFunction
+
+
+def sample_queries(index, n, seed=0):
+    """(query text, old where clause, pushed-down where clause, budget, location) for random listings."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(index.count(), size=n, replace=n > index.count())
+    city, location, bedrooms, price = (index.columns[key] for key in ("city", "location", "bedrooms", "price_lakhs"))
+
+    queries = []
+    for row in rows.tolist():
+        budget = float(np.ceil(price[row] / 10) * 10)
+        text = f"{bedrooms[row]} BHK in {location[row]} {city[row]} under {budget:.0f} lakhs"
+        old = [{"city": {"$eq": str(city[row])}}, {"bedrooms": {"$eq": str(bedrooms[row])}}]
+        pushed = old + [{"location": {"$in": [str(location[row])]}}, {"price_lakhs": {"$lte": budget}}]
+        queries.append((text, {"$and": old}, {"$and": pushed}, budget, str(location[row])))
+    return queries
+
+
+def run(backend, queries, k, pushed):
+    """Per-query latencies in microseconds and the number of results outside the constraints."""
+    timings = []
+    violations = 0
+    for text, old, pushed_where, budget, location in queries:
+        start = time.perf_counter()
+        result = backend.query(query_texts=[text], n_results=k, where=pushed_where if pushed else old)
+        timings.append((time.perf_counter() - start) * 1e6)
+        violations += sum(
+            meta["price_lakhs"] > budget or meta["location"] != location for meta in result["metadatas"][0]
+        )
+    return np.array(timings), violations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500, help="Queries to run through each backend")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    collection = chromadb.PersistentClient(path=str(CHROMA_DB_DIR)).get_collection(
+        name=COLLECTION_NAME, embedding_function=ef
+    )
+    index = SparseIndex.load(SPARSE_INDEX_PATH, embedding_function=ef)
+    queries = sample_queries(index, args.queries)
+
+    print(f"🔎 {len(queries)} selective queries, top {args.k}, over {index.count()} documents...")
+    for name, backend in (("chroma", collection), ("sparse", index)):
+        # Warm up before timing
+        run(backend, queries[:10], args.k, pushed=False)
+        run(backend, queries[:10], args.k, pushed=True)
+        for label, pushed in (("city+bhk", False), ("pushdown", True)):
+            timings, violations = run(backend, queries, args.k, pushed)
+            print(f"  {name:6s} {label:8s}: p50 {np.percentile(timings, 50):8.0f} us  "
+                  f"p99 {np.percentile(timings, 99):8.0f} us  off-constraint results {violations}")
+
+
+if __name__ == "__main__":
+    main()
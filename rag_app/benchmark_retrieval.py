@@ -0,0 +1,97 @@
+"""
+Compare the in-process sparse index against the Chroma collection.
+
+Runs the same queries through both backends, half of them with a city +
+bedrooms `where` filter like /ask builds, and reports per-query latency
+(median and p99) and recall@k of Chroma's HNSW search against the exact
+sparse ranking. Both return squared L2 distances, so results tied with the
+exact k-th neighbour count as hits. Queries are generated from listings in
+the corpus.
+
+Needs the collection and sparse_index.npz, so run ingest.py first.
+
+    python benchmark_retrieval.py
+    python benchmark_retrieval.py --queries 1000 --k 20
+"""
+
+import argparse
+import time
+
+import chromadb
+import numpy as np
+
+from ingest import CHROMA_DB_DIR, COLLECTION_NAME, SPARSE_INDEX_PATH, VECTORIZER_PATH
+from sparse_index import SparseIndex
+from tfidf_embedding import TfidfEmbeddingFunction
+
+# float32 distances from the two backends agree to ~1e-6
+TIE_TOLERANCE = 1e-5
+
+
+def sample_queries(index, n, seed=0):
+    """(query text, where clause or None) pairs built from random listings."""
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(index.count(), size=n, replace=n > index.count())
+    city, location, bedrooms = (index.columns[key] for key in ("city", "location", "bedrooms"))
+
+    queries = []
+    for i, row in enumerate(rows.tolist()):
+        text = f"{bedrooms[row]} BHK in {location[row]} {city[row]}"
+        where = {"$and": [{"city": {"$eq": str(city[row])}}, {"bedrooms": {"$eq": str(bedrooms[row])}}]}
+        queries.append((text, where if i % 2 else None))
+    return queries
+
+
+def run(backend, queries, k):
+    """Per-query latencies in microseconds and the returned distance lists."""
+    timings = []
+    found = []
+    for text, where in queries:
+        start = time.perf_counter()
+        if where:
+            result = backend.query(query_texts=[text], n_results=k, where=where)
+        else:
+            result = backend.query(query_texts=[text], n_results=k)
+        timings.append((time.perf_counter() - start) * 1e6)
+        found.append(result["distances"][0])
+    return np.array(timings), found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=500, help="Queries to run through each backend")
+    parser.add_argument("--k", type=int, default=5, help="Results per query")
+    args = parser.parse_args()
+
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    collection = chromadb.PersistentClient(path=str(CHROMA_DB_DIR)).get_collection(
+        name=COLLECTION_NAME, embedding_function=ef
+    )
+    index = SparseIndex.load(SPARSE_INDEX_PATH, embedding_function=ef)
+    queries = sample_queries(index, args.queries)
+
+    print(f"🔎 {len(queries)} queries, top {args.k}, over {index.count()} documents...")
+    # Warm both backends up before timing
+    run(collection, queries[:10], args.k)
+    run(index, queries[:10], args.k)
+
+    chroma_times, chroma_distances = run(collection, queries, args.k)
+    sparse_times, sparse_distances = run(index, queries, args.k)
+
+    for name, timings in (("chroma", chroma_times), ("sparse", sparse_times)):
+        print(f"  {name:6s}: p50 {np.percentile(timings, 50):8.0f} us  p99 {np.percentile(timings, 99):8.0f} us")
+
+    # The sparse ranking is exact, so it is the reference for recall. Many listings share
+    # the same text, so a hit is any result as close as the exact k-th one, not a given id
+    recalls = [
+        min(sum(d <= s[-1] + TIE_TOLERANCE for d in c), len(s)) / len(s)
+        for c, s in zip(chroma_distances, sparse_distances) if s
+    ]
+    filtered = [r for r, (_, where) in zip(recalls, queries) if where]
+    print(f"  chroma recall@{args.k} vs exact: {np.mean(recalls):.3f} "
+          f"(unfiltered {np.mean([r for r, (_, w) in zip(recalls, queries) if not w]):.3f}, "
+          f"filtered {np.mean(filtered):.3f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark worker cold start with the vectorizer artifact against vectorizer.pkl.
+
+Starts fresh Python processes that do what an API worker does at import:
+import TfidfEmbeddingFunction, load the vectorizer and embed one query.
+Reports process wall time, the time spent loading the vectorizer, peak RSS
+and whether scikit-learn was imported, for each format.
+
+Needs both vectorizer.pkl and the artifact directory (convert one with
+vectorizer_artifact.py).
+
+    python benchmark_startup.py
+    python benchmark_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from ingest import VECTORIZER_PATH
+
+WORKER = """
+import json, sys, time
+start = time.perf_counter()
+from tfidf_embedding import TfidfEmbeddingFunction
+imported = time.perf_counter()
+ef = TfidfEmbeddingFunction(vectorizer_path=sys.argv[1])
+ef(["2 BHK apartment in andheri west Mumbai under 80 lakhs"])
+print(json.dumps({"load": time.perf_counter() - imported, "sklearn": "sklearn" in sys.modules}))
+"""
+
+
+def run_worker(vectorizer_path):
+    """(wall seconds, vectorizer load seconds, peak RSS MB, sklearn imported) of one fresh worker."""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", WORKER, str(vectorizer_path)],
+                            cwd=Path(__file__).resolve().parent, stdout=subprocess.PIPE)
+    output = proc.stdout.read()
+    _, status, usage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise RuntimeError(f"worker failed for {vectorizer_path}")
+    result = json.loads(output)
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+    return elapsed, result["load"], rss_mb, result["sklearn"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh workers started per format")
+    args = parser.parse_args()
+
+    formats = {"pickle": VECTORIZER_PATH.with_suffix(".pkl"), "artifact": VECTORIZER_PATH}
+    print(f"🚀 Starting {args.runs} workers per vectorizer format...")
+    for name, path in formats.items():
+        runs = [run_worker(path) for _ in range(args.runs)]
+        wall, load, rss = np.median([run[:3] for run in runs], axis=0)
+        sklearn = runs[0][3]
+        print(f"  {name:8s}: start {wall * 1000:7.0f} ms  vectorizer load {load * 1000:6.1f} ms  "
+              f"peak RSS {rss:6.1f} MB  sklearn imported: {'yes' if sklearn else 'no'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark the writer pool against the old serial ingest loop.
+
+Writes the ingest corpus (optionally tiled to --rows documents with fresh
+ids) into throwaway Chroma databases: once with the serial loop of fixed
+100-document collection.add calls, once through chroma_writer.write_batches,
+and reports docs/sec for each.
+
+    python benchmark_writes.py
+    python benchmark_writes.py --rows 20000 --writers 4
+"""
+
+import argparse
+import tempfile
+import time
+
+import chromadb
+
+from chroma_writer import WRITERS, write_batches
+from ingest import BATCH_SIZE, COLLECTION_NAME, VECTORIZER_PATH, load_documents
+from tfidf_embedding import TfidfEmbeddingFunction
+
+
+def tiled(documents, metadatas, ids, rows):
+    """The corpus repeated up to rows documents, with unique ids."""
+    if not rows:
+        return documents, metadatas, ids
+    out_docs, out_metas, out_ids = [], [], []
+    while len(out_ids) < rows:
+        offset = len(out_ids)
+        out_docs += documents
+        out_metas += metadatas
+        out_ids += [str(offset + i) for i in range(len(ids))]
+    return out_docs[:rows], out_metas[:rows], out_ids[:rows]
+
+
+def serial(collection, documents, metadatas, ids, ef):
+    """The previous ingest loop: one fixed-size add per batch, in order."""
+    for i, embeddings in zip(range(0, len(ids), BATCH_SIZE), ef.batches(ef.transform(documents), BATCH_SIZE)):
+        collection.add(documents=documents[i : i + BATCH_SIZE], embeddings=embeddings,
+                       metadatas=metadatas[i : i + BATCH_SIZE], ids=ids[i : i + BATCH_SIZE])
+
+
+def pooled(collection, documents, metadatas, ids, ef, writers):
+    matrix = ef.transform(documents)
+    write_batches(collection, documents, metadatas, ids, embed=lambda start, end: matrix[start:end].toarray(),
+                  method="add", batch_size=BATCH_SIZE, writers=writers)
+
+
+def timed(write, ef):
+    with tempfile.TemporaryDirectory() as path:
+        collection = chromadb.PersistentClient(path=path).create_collection(name=COLLECTION_NAME, embedding_function=ef)
+        start = time.perf_counter()
+        write(collection)
+        return time.perf_counter() - start, collection.count()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=None, help="Tile the corpus up to this many documents")
+    parser.add_argument("--writers", type=int, default=WRITERS, help="Writer threads for the pool")
+    args = parser.parse_args()
+
+    documents, metadatas, ids = tiled(*load_documents(), args.rows)
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+
+    print(f"📊 Writing {len(ids)} documents...")
+    serial_time, serial_count = timed(lambda c: serial(c, documents, metadatas, ids, ef), ef)
+    pool_time, pool_count = timed(lambda c: pooled(c, documents, metadatas, ids, ef, args.writers), ef)
+    print(f"  serial loop      : {len(ids) / serial_time:8,.0f} docs/s  ({serial_count} stored)")
+    print(f"  writer pool ({args.writers}x) : {len(ids) / pool_time:8,.0f} docs/s  ({pool_count} stored)")
+    print(f"  speedup          : {serial_time / pool_time:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+In-process caches for the API.
+
+TTLCache is a thread-safe, size-bounded LRU whose entries also expire a
+fixed time after they were stored. FastAPI runs the sync endpoints on a
+thread pool, hence the lock.
+
+SqliteCache is the same idea in a sqlite file, so several API workers
+(uvicorn --workers N) share what any one of them computed. TieredCache
+puts a TTLCache in front of it. Values in the sqlite tier are stored as
+JSON.
+
+Every cache counts its hits and misses; stats() reports them.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+def _stats(hits, misses, **extra):
+    lookups = hits + misses
+    return {"hits": hits, "misses": misses, "hit_rate": round(hits / lookups, 4) if lookups else None, **extra}
+
+
+class TTLCache:
+    def __init__(self, maxsize, ttl, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] <= self.clock():
+                del self._entries[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return _stats(self.hits, self.misses, size=len(self._entries), maxsize=self.maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SqliteCache:
+    """
+    A TTL cache in a sqlite file, bounded to maxsize rows. When full, the
+    least recently used rows are dropped. Safe to share between processes.
+    """
+
+    def __init__(self, path, maxsize, ttl):
+        self.path = str(path)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, used_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+
+    def _connect(self):
+        # One connection per thread; sqlite connections can't be shared across threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key, default=None):
+        now = time.time()
+        db = self._connect()
+        row = db.execute("SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, now)).fetchone()
+        if row is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        db.execute("UPDATE entries SET used_at = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        db = self._connect()
+        db.execute(
+            "INSERT OR REPLACE INTO entries (key, value, expires_at, used_at) VALUES (?, ?, ?, ?)",
+            (key, json.dumps(value), now + self.ttl, now),
+        )
+        db.execute(
+            "DELETE FROM entries WHERE expires_at <= ? OR key IN "
+            "(SELECT key FROM entries ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (now, self.maxsize),
+        )
+
+    def clear(self):
+        self._connect().execute("DELETE FROM entries")
+
+    def stats(self):
+        size = self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return _stats(self.hits, self.misses, size=size, maxsize=self.maxsize)
+
+
+class TieredCache:
+    """A TTLCache in front of an optional SqliteCache shared with other workers."""
+
+    def __init__(self, memory, disk=None):
+        self.memory = memory
+        self.disk = disk
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is _MISSING and self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        hits = self.memory.hits + (self.disk.hits if self.disk is not None else 0)
+        return _stats(
+            hits, self.memory.hits + self.memory.misses - hits,
+            memory=self.memory.stats(),
+            disk=self.disk.stats() if self.disk is not None else None,
+        )
@@ -0,0 +1,216 @@
+"""
+Parallel, back-pressured writes into a Chroma collection.
+
+write_batches() cuts the rows into batches, embeds them on a thread pool and
+hands them to writer threads through a bounded queue, so embedding runs
+ahead of the writes but never more than a few batches ahead. Each writer
+calls collection.upsert (or add) and:
+
+- adapts the batch size to the observed write latency (BatchSizer),
+- retries a failed batch with exponential backoff before giving up on it,
+- records every written batch in a Checkpoint, so an interrupted or
+  partly failed run can be resumed by writing only the missing rows.
+"""
+
+import hashlib
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from tqdm import tqdm
+
+WRITERS = 2
+EMBED_WORKERS = 2
+MIN_BATCH_SIZE = 50
+MAX_BATCH_SIZE = 5000  # Chroma's own limit is around 5461 per call
+TARGET_WRITE_SECONDS = 0.5
+MAX_RETRIES = 4
+RETRY_BACKOFF = 0.5  # seconds, doubled after every failed attempt
+
+
+class BatchSizer:
+    """
+    Batch size that follows the write latency: aims for TARGET_WRITE_SECONDS
+    per call, changing by at most a factor of 2 per observation.
+    """
+
+    def __init__(self, initial, minimum=MIN_BATCH_SIZE, maximum=MAX_BATCH_SIZE, target_seconds=TARGET_WRITE_SECONDS):
+        self.size = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.target_seconds = target_seconds
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, rows):
+        with self._lock:
+            ideal = rows * self.target_seconds / max(seconds, 1e-6)
+            size = min(max(ideal, self.size / 2), self.size * 2)
+            self.size = int(min(max(size, self.minimum), self.maximum))
+
+
+def update_run_fingerprint(digest, ids, metadatas):
+    """Feed rows into a run fingerprint digest, for runs that see their rows a chunk at a time."""
+    for doc_id, meta in zip(ids, metadatas):
+        digest.update(f"{doc_id}:{meta.get('content_hash', '')}\n".encode("utf-8"))
+    return digest
+
+
+def run_fingerprint(ids, metadatas):
+    """Identifies the rows of a run: ids and content hashes, in order."""
+    return update_run_fingerprint(hashlib.sha256(), ids, metadatas).hexdigest()
+
+
+class Checkpoint:
+    """
+    Row ranges [start, end) already written by a run, kept in a JSON file.
+    A file left by a run with a different fingerprint is ignored.
+    """
+
+    def __init__(self, path, fingerprint):
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self.ranges = []
+        self._lock = threading.Lock()
+        if self.path.exists():
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+            if saved.get("fingerprint") == fingerprint:
+                self.ranges = [tuple(r) for r in saved["ranges"]]
+
+    @property
+    def rows_done(self):
+        return sum(end - start for start, end in self.ranges)
+
+    def pending(self, total, first=0):
+        """Ranges of rows in [first, total) not written yet."""
+        gaps = []
+        position = first
+        for start, end in self.ranges:
+            if end <= position:
+                continue
+            if start > position:
+                gaps.append((position, min(start, total)))
+            position = max(position, end)
+            if position >= total:
+                break
+        if position < total:
+            gaps.append((position, total))
+        return gaps
+
+    def mark(self, start, end):
+        with self._lock:
+            merged = []
+            for r in sorted(self.ranges + [(start, end)]):
+                if merged and r[0] <= merged[-1][1]:
+                    merged[-1] = (merged[-1][0], max(merged[-1][1], r[1]))
+                else:
+                    merged.append(r)
+            self.ranges = merged
+
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            tmp_path.write_text(json.dumps({"fingerprint": self.fingerprint, "ranges": self.ranges}), encoding="utf-8")
+            tmp_path.replace(self.path)
+
+    def clear(self):
+        self.ranges = []
+        self.path.unlink(missing_ok=True)
+
+
+def write_batches(collection, documents, metadatas, ids, embed, checkpoint=None, method="upsert",
+                  batch_size=100, writers=WRITERS, embed_workers=EMBED_WORKERS, offset=0, progress=True):
+    """
+    Write rows into the collection with a pool of writer threads.
+
+    embed(start, end) returns the embeddings of rows start..end-1. Rows the
+    checkpoint already has are skipped. method is "upsert" (safe to repeat,
+    so retries and resumed runs can't duplicate rows) or "add". A run that
+    writes its rows in several calls passes the position of the first row
+    as offset; the checkpoint and the failed ranges count from the start of
+    the run. Returns the rows written, the failed (start, end, error) ranges
+    and the docs/sec.
+    """
+    start_time = time.perf_counter()
+    sizer = BatchSizer(batch_size)
+    ranges = (
+        [(start - offset, end - offset) for start, end in checkpoint.pending(offset + len(ids), offset)]
+        if checkpoint else [(0, len(ids))]
+    )
+    work = queue.Queue(maxsize=2 * writers)
+    write = getattr(collection, method)
+
+    written = 0
+    failed = []
+    produce_error = []
+    lock = threading.Lock()
+    progress = tqdm(total=sum(end - start for start, end in ranges), disable=not progress)
+
+    def produce():
+        try:
+            with ThreadPoolExecutor(max_workers=embed_workers) as pool:
+                for range_start, range_end in ranges:
+                    position = range_start
+                    while position < range_end:
+                        end = min(position + sizer.size, range_end)
+                        # Blocks while the writers are behind: back-pressure on embedding
+                        work.put((position, end, pool.submit(embed, position, end)))
+                        position = end
+        except Exception as e:
+            produce_error.append(e)
+        finally:
+            for _ in range(writers):
+                work.put(None)
+
+    def write_one(start, end, embeddings):
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                began = time.perf_counter()
+                write(documents=documents[start:end], embeddings=embeddings,
+                      metadatas=metadatas[start:end], ids=ids[start:end])
+                sizer.observe(time.perf_counter() - began, end - start)
+                return None
+            except Exception as e:
+                if attempt == MAX_RETRIES:
+                    return e
+                delay = RETRY_BACKOFF * 2 ** attempt
+                print(f"\n⚠️  Batch {offset + start}-{offset + end} failed ({e}), retrying in {delay:.1f}s...")
+                time.sleep(delay)
+
+    def consume():
+        # Whatever fails, keep taking batches until the sentinel: a writer that
+        # stopped early would leave produce() blocked on the full queue
+        nonlocal written
+        while (item := work.get()) is not None:
+            start, end, future = item
+            try:
+                error = write_one(start, end, future.result())
+                if error is None:
+                    if checkpoint:
+                        checkpoint.mark(offset + start, offset + end)
+                    with lock:
+                        progress.update(end - start)
+                        written += end - start
+            except Exception as e:  # embedding, checkpoint or progress update failed
+                error = e
+            if error is not None:
+                with lock:
+                    failed.append((offset + start, offset + end, str(error)))
+
+    threads = [threading.Thread(target=consume) for _ in range(writers)]
+    producer = threading.Thread(target=produce)
+    for thread in threads + [producer]:
+        thread.start()
+    for thread in threads + [producer]:
+        thread.join()
+    progress.close()
+
+    if produce_error:
+        raise produce_error[0]
+    elapsed = time.perf_counter() - start_time
+    return {
+        "written": written,
+        "failed": sorted(failed),
+        "docs_per_sec": written / elapsed if elapsed else 0.0,
+        "final_batch_size": sizer.size,
+    }
@@ -9,6 +9,12 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
 # Models
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-004")
 
+# Retrieval backend for /ask: "chroma" (the collection) or "sparse" (in-process TF-IDF index)
+RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "chroma")
+
+# Optional sqlite file for the /ask result cache, shared by every API worker (unset: in-memory only)
+QUERY_CACHE_PATH = os.getenv("QUERY_CACHE_PATH", "")
+
 # Switch to Gemini 2.5 Flash model (default)
 LLM_MODEL = os.getenv("LLM_MODEL", "gemini-2.5-flash")
 
@@ -0,0 +1,91 @@
+"""
+Corpus statistics for the API: document count, per-city and per-BHK
+counts, plus the localities and price / area ranges of the MARKET_CITIES
+that /market_filters offers.
+
+They only change when the data is re-ingested, so CorpusStats computes
+them with one metadata scan and keeps them until invalidate() is called
+(main.py does that when the index version changes). Request handlers read
+totals from here instead of touching the store.
+"""
+
+import threading
+from collections import Counter
+
+# Cities the market endpoints report on
+MARKET_CITIES = ["Bangalore", "Mumbai"]
+
+
+def _number(value):
+    """value as a float, or None when missing, zero or not numeric."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _bhk(value):
+    number = _number(value)
+    return int(number) if number is not None else None
+
+
+def _range(values):
+    return {"min": min(values), "max": max(values)} if values else None
+
+
+def compute_corpus_stats(metadatas):
+    cities = Counter()
+    bhk_by_city = {}
+    localities = {city: set() for city in MARKET_CITIES}
+    prices, areas = [], []
+
+    for meta in metadatas:
+        city = meta.get("city", "").capitalize()
+        cities[city] += 1
+        bedrooms = _bhk(meta.get("bedrooms"))
+        if bedrooms is not None:
+            bhk_by_city.setdefault(city, Counter())[bedrooms] += 1
+        if city not in localities:
+            continue
+        if meta.get("location"):
+            localities[city].add(meta["location"])
+        price = _number(meta.get("price_lakhs"))
+        if price is not None:
+            prices.append(price)
+        area = _number(meta.get("area_sqft"))
+        if area is not None:
+            areas.append(area)
+
+    bhk = sum(bhk_by_city.values(), Counter())
+    return {
+        "count": len(metadatas),
+        "cities": dict(cities.most_common()),
+        "bhk": {b: bhk[b] for b in sorted(bhk)},
+        "bhk_by_city": {city: {b: counts[b] for b in sorted(counts)} for city, counts in bhk_by_city.items()},
+        "localities": {city: sorted(locs) for city, locs in localities.items()},
+        "price_range": _range(prices),
+        "area_range": _range(areas),
+    }
+
+
+class CorpusStats:
+    """compute_corpus_stats over load_metadatas(), recomputed on first use after invalidate()."""
+
+    def __init__(self, load_metadatas):
+        self.load_metadatas = load_metadatas
+        self._stats = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        stats = self._stats
+        if stats is None:
+            with self._lock:
+                if self._stats is None:
+                    self._stats = compute_corpus_stats(self.load_metadatas())
+                stats = self._stats
+        return stats
+
+    def invalidate(self):
+        self._stats = None
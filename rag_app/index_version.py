@@ -0,0 +1,73 @@
+"""
+Version of the ingested index, shared between ingest runs and the API.
+
+Every ingest writes index_version.json with a version derived from the
+ids and content hashes it wrote, so re-ingesting identical data keeps the
+same version (unless rows failed to write, see ingest_version). API workers key their caches on IndexVersion.current(),
+which only re-reads the file when its modification time changes.
+"""
+
+import json
+import os
+import secrets
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+VERSION_PATH = Path(__file__).resolve().parent / "index_version.json"
+
+# Reported before anything has been ingested with versioning
+UNVERSIONED = "unversioned"
+
+# Modification time recorded while the file is missing, so the ingest that creates it counts as a change
+_MISSING_MTIME = 0
+
+
+def ingest_version(fingerprint, failed=()):
+    """
+    The version an ingest publishes: the fingerprint of the rows it set out
+    to write, plus a one-off suffix when some of them failed. The rows that
+    did land are served either way; the suffix makes the resumed run that
+    completes the same rows a change as well, so results ranked against the
+    partial data are dropped then.
+    """
+    if not failed:
+        return fingerprint
+    return f"{fingerprint}-partial-{secrets.token_hex(4)}"
+
+
+def write_index_version(version, rows, path=VERSION_PATH):
+    payload = {"version": version, "rows": rows, "updated_at": datetime.now(timezone.utc).isoformat()}
+    tmp_path = Path(path).with_name(Path(path).name + ".tmp")
+    tmp_path.write_text(json.dumps(payload), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+class IndexVersion:
+    """The current index version, reloaded from disk when an ingest rewrites it."""
+
+    def __init__(self, path=VERSION_PATH, on_change=None):
+        self.path = Path(path)
+        self.on_change = on_change  # Called with the new version when an ingest changes it
+        self._mtime = None
+        self._version = UNVERSIONED
+        self._lock = threading.Lock()
+
+    def current(self):
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            self._mtime = _MISSING_MTIME
+            return UNVERSIONED
+        if mtime != self._mtime:
+            with self._lock:
+                try:
+                    version = json.loads(self.path.read_text(encoding="utf-8"))["version"]
+                except (OSError, ValueError, KeyError):
+                    return self._version  # Being replaced right now; keep the previous version
+                # The first read is what the worker started with, not a change
+                changed = self._mtime is not None and version != self._version
+                self._mtime, self._version = mtime, version
+            if changed and self.on_change is not None:
+                self.on_change(version)
+        return self._version
@@ -1,45 +1,175 @@
+import argparse
+from contextlib import nullcontext
+import numpy as np
 import pandas as pd
 import chromadb
 from pathlib import Path
 import os
+import sys
 from tqdm import tqdm
+from ingest_metrics import IngestMetrics
+from chroma_writer import WRITERS, Checkpoint, run_fingerprint, write_batches
+from corpus_stats import MARKET_CITIES
+from index_version import ingest_version, write_index_version
+from market_cube import CUBE_PATH, MarketCube
+from property_store import PropertyStore
+from sparse_index import write_sparse_index
 from tfidf_embedding import TfidfEmbeddingFunction
 
 # Constants
 BASE_DIR = Path(__file__).resolve().parent.parent
-DATA_PATH = BASE_DIR / "calaculate_financial_terms" / "output" / "buy_vs_rent_FINAL_ANALYSIS.csv"
+FINANCE_DIR = BASE_DIR / "calaculate_financial_terms"
+DATA_PATH = FINANCE_DIR / "output" / "buy_vs_rent_FINAL_ANALYSIS.csv"
 CHROMA_DB_DIR = BASE_DIR / "rag_app" / "chroma_db"
-VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer.pkl"
+VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer"
+SPARSE_INDEX_PATH = BASE_DIR / "rag_app" / "sparse_index.npz"
+CHECKPOINT_PATH = BASE_DIR / "rag_app" / "ingest_checkpoint.json"
+REPORT_PATH = BASE_DIR / "rag_app" / "ingest_report.json"
 COLLECTION_NAME = "real_estate"
+BATCH_SIZE = 100
+GET_PAGE_SIZE = 5000
 
-def ingest_data():
+# Numeric metadata fields (after price_lakhs) and the columns they come from
+METADATA_FLOAT_COLUMNS = {
+    "price_inr": "price_inr",
+    "area_sqft": "area_sqft",
+    "monthly_rent": "estimated_monthly_rent",
+    "monthly_emi": "monthly_emi",
+    "effective_emi": "effective_emi",
+    "down_payment": "down_payment",
+    "loan_amount": "loan_amount",
+    "total_tax_saved": "total_tax_saved",
+    "final_property_value": "final_property_value",
+    "final_renting_wealth": "final_renting_wealth",
+    "wealth_difference": "wealth_difference",
+    "current_interest_rate": "current_interest_rate",
+    "interest_rate_flip": "interest_rate_flip",
+    "rent_flip": "rent_flip",
+    "holding_period_flip": "holding_period_flip",
+}
+
+# Columns the documents and metadata are built from
+INGEST_COLUMNS = [
+    "title", "city", "location", "bedrooms", "price_inr", "price_lakhs", "area_sqft",
+    "estimated_monthly_rent", "decision", "wealth_difference",
+    "monthly_emi", "effective_emi", "down_payment", "loan_amount", "total_tax_saved",
+    "final_property_value", "final_renting_wealth",
+    "current_interest_rate", "interest_rate_flip", "rent_flip", "holding_period_flip",
+]
+
+if str(FINANCE_DIR) not in sys.path:
+    sys.path.append(str(FINANCE_DIR))
+
+from modules.analysis_table import available_columns, read_analysis_table  # noqa: E402
+
+
+def as_text(val):
+    """Render a typed cell the way fillna("") on the raw CSV did: blank when missing."""
+    return "" if pd.isna(val) else str(val)
+
+
+def as_whole_text(val):
+    # Rent is typed as float but stored as whole rupees; keep "25000", not "25000.0"
+    if not pd.isna(val) and float(val).is_integer():
+        return str(int(val))
+    return as_text(val)
+
+
+def content_hashes(documents, numbers):
     """
-    Ingests the real-estate CSV data into a local ChromaDB using TF-IDF embeddings.
+    64-bit hash (as 16 hex digits) of each document's text and numeric
+    metadata, kept in its metadata to detect changes. The text metadata
+    fields all appear in the document itself. numbers maps each numeric
+    metadata field to its column of values.
     """
-    print(f"🚀 Starting ingestion from {DATA_PATH} using TF-IDF...")
-    
-    if not DATA_PATH.exists():
-        print(f"❌ Error: Data file not found at {DATA_PATH}")
-        return
+    text_hash = pd.util.hash_array(np.asarray(documents, dtype=object))
+    number_hash = pd.util.hash_pandas_object(pd.DataFrame(numbers), index=False).to_numpy()
+    digests = text_hash ^ (number_hash * np.uint64(0x9E3779B97F4A7C15))
+    return [f"{h:016x}" for h in digests.tolist()]
 
-    # Load Data
-    df = pd.read_csv(DATA_PATH)
-    df = df.fillna("")
-    
-    # Prepare Documents
-    print(f"📄 Processing {len(df)} records...")
+
+def text_column(series):
+    """as_text() for a whole column: str() of every value, "" where missing."""
+    values = series.astype(object).where(series.notna(), "").tolist()
+    return [v if type(v) is str else str(v) for v in values]
+
+
+def whole_text_column(series):
+    """as_whole_text() for a whole column."""
+    values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=float)
+    whole = np.isfinite(values) & (values == np.floor(values))
+    text = np.array(text_column(series), dtype=object)
+    text[whole] = [str(v) for v in values[whole].astype(np.int64).tolist()]
+    return text.tolist()
+
+
+def float_column(df, col):
+    """safe_float() for a whole column: float64, 0.0 where missing or not numeric (or no such column)."""
+    if col not in df.columns:
+        return np.zeros(len(df))
+    return pd.to_numeric(df[col], errors="coerce").fillna(0.0).to_numpy(dtype=float)
+
+
+def build_documents(df):
+    """
+    Documents, metadatas and ids for every row of the analysis table.
+    Built column by column: each column is converted once and the per-row
+    work is only string formatting and dict assembly.
+    """
+    title, city, location, bedrooms = (text_column(df[c]) for c in ("title", "city", "location", "bedrooms"))
+    area, price, decision, wealth = (
+        text_column(df[c]) for c in ("area_sqft", "price_lakhs", "decision", "wealth_difference")
+    )
+    rent = whole_text_column(df["estimated_monthly_rent"])
+
+    documents = [
+        f"Property: {t}. Location: {c}, {l}. Details: {b} BHK, {a} sqft. Price: ₹{p} Lakhs. "
+        f"Rent: ₹{r}/month. Buy vs Rent Decision: {d} (Wealth Diff: ₹{w})."
+        for t, c, l, b, a, p, r, d, w in zip(title, city, location, bedrooms, area, price, rent, decision, wealth)
+    ]
+
+    numbers = {"price_lakhs": float_column(df, "price_lakhs"), "source_row": df.index.to_numpy()}
+    for key, col in METADATA_FLOAT_COLUMNS.items():
+        numbers[key] = float_column(df, col)
+
+    columns = {
+        "title": title,
+        "city": city,
+        "location": location,
+        "bedrooms": bedrooms,
+        "decision": decision,
+        **{key: values.tolist() for key, values in numbers.items()},
+        "content_hash": content_hashes(documents, numbers),
+    }
+    keys = list(columns)
+    metadatas = [dict(zip(keys, values)) for values in zip(*columns.values())]
+
+    return documents, metadatas, [str(idx) for idx in columns["source_row"]]
+
+
+def document_batches(df, batch_size=BATCH_SIZE):
+    """Yield (documents, metadatas, ids) for consecutive slices of batch_size rows."""
+    for start in range(0, len(df), batch_size):
+        yield build_documents(df.iloc[start : start + batch_size])
+
+
+def build_documents_rows(df):
+    """
+    Reference row-by-row version of build_documents().
+    Kept for benchmarking and for checking the column-wise builder against.
+    """
     documents = []
     metadatas = []
     ids = []
     
     for idx, row in tqdm(df.iterrows(), total=len(df)):
         text_content = (
-            f"Property: {row['title']}. "
-            f"Location: {row['city']}, {row['location']}. "
-            f"Details: {row['bedrooms']} BHK, {row['area_sqft']} sqft. "
-            f"Price: ₹{row['price_lakhs']} Lakhs. "
-            f"Rent: ₹{row['estimated_monthly_rent']}/month. "
-            f"Buy vs Rent Decision: {row['decision']} (Wealth Diff: ₹{row['wealth_difference']})."
+            f"Property: {as_text(row['title'])}. "
+            f"Location: {as_text(row['city'])}, {as_text(row['location'])}. "
+            f"Details: {as_text(row['bedrooms'])} BHK, {as_text(row['area_sqft'])} sqft. "
+            f"Price: ₹{as_text(row['price_lakhs'])} Lakhs. "
+            f"Rent: ₹{as_whole_text(row['estimated_monthly_rent'])}/month. "
+            f"Buy vs Rent Decision: {as_text(row['decision'])} (Wealth Diff: ₹{as_text(row['wealth_difference'])})."
         )
         
         # Helper to safely convert to float
@@ -51,15 +181,16 @@ def ingest_data():
             except:
                 return default
         
-        documents.append(text_content)
-        metadatas.append({
-            "city": str(row["city"]),
-            "location": str(row["location"]),
-            "bedrooms": str(row["bedrooms"]),
+        metadata = {
+            "title": as_text(row["title"]),
+            "city": as_text(row["city"]),
+            "location": as_text(row["location"]),
+            "bedrooms": as_text(row["bedrooms"]),
             "price_lakhs": safe_float(row["price_lakhs"]),
-            "decision": str(row["decision"]),
+            "decision": as_text(row["decision"]),
             "source_row": idx,
-            # Additional fields for "Why?" explanation
+            # Additional fields for "Why?" explanation and /analyze
+            "price_inr": safe_float(row.get("price_inr", 0)),
             "area_sqft": safe_float(row["area_sqft"]),
             "monthly_rent": safe_float(row["estimated_monthly_rent"]),
             "monthly_emi": safe_float(row["monthly_emi"]),
@@ -75,56 +206,222 @@ def ingest_data():
             "interest_rate_flip": safe_float(row.get("interest_rate_flip", 0)),
             "rent_flip": safe_float(row.get("rent_flip", 0)),
             "holding_period_flip": safe_float(row.get("holding_period_flip", 0))
-        })
+        }
+        documents.append(text_content)
+        metadatas.append(metadata)
         ids.append(str(idx))
 
-    # Fit Vectorizer first (TF-IDF needs to know the vocabulary)
-    print("🧠 Training TF-IDF vectorizer...")
-    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH), max_features=384)
-    ef.fit(documents)
-    print("✅ Vectorizer trained and saved.")
+    numbers = {
+        key: [metadata[key] for metadata in metadatas]
+        for key in ["price_lakhs", "source_row", *METADATA_FLOAT_COLUMNS]
+    }
+    for metadata, digest in zip(metadatas, content_hashes(documents, numbers)):
+        metadata["content_hash"] = digest
+    return documents, metadatas, ids
 
-    # Initialize ChromaDB Client
-    client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
+
+def stored_hashes(collection):
+    """id -> content_hash of every document in the collection, read page by page."""
+    hashes = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=GET_PAGE_SIZE, offset=offset)
+        for doc_id, meta in zip(page["ids"], page["metadatas"]):
+            hashes[doc_id] = (meta or {}).get("content_hash")
+        if len(page["ids"]) < GET_PAGE_SIZE:
+            return hashes
+        offset += GET_PAGE_SIZE
+
+
+def stage(metrics, name, rows=None):
+    """metrics.stage(name, rows), or a no-op when the run isn't being measured."""
+    return metrics.stage(name, rows) if metrics else nullcontext({"rows": rows})
+
+
+def write_market_cube(documents, metadatas, ids, version):
+    """Rebuild the /market_snapshot aggregate cube for the ingested rows."""
+    cube = MarketCube.build(PropertyStore(ids, documents, metadatas), MARKET_CITIES, version=version)
+    cube.save(CUBE_PATH)
+
+
+def load_documents(metrics=None):
+    """Load the analysis table and build its documents, or None if it is missing."""
+    if not DATA_PATH.exists():
+        print(f"❌ Error: Data file not found at {DATA_PATH}")
+        return None
+
+    # Load Data (typed; Parquet when available, only the columns we use)
+    # Older outputs may not have the flip threshold columns yet
+    with stage(metrics, "load_table") as measured:
+        stored = set(available_columns(DATA_PATH))
+        df = read_analysis_table(DATA_PATH, columns=[c for c in INGEST_COLUMNS if c in stored])
+        measured["rows"] = len(df)
     
-    # Get or Create Collection
+    # Prepare Documents
+    print(f"📄 Processing {len(df)} records...")
+    with stage(metrics, "build_documents", rows=len(df)):
+        return build_documents(df)
+
+
+def ingest_incremental():
+    """
+    Diff the analysis output against the stored collection and only write
+    what changed: new and changed rows are upserted, rows no longer in the
+    output are deleted, both in batches. The collection stays searchable
+    throughout. The existing vectorizer is reused so unchanged embeddings
+    stay valid; run a full ingest to refit it on a very different corpus.
+    Returns the added / updated / deleted / unchanged counts.
+    """
+    print(f"🚀 Starting incremental ingestion from {DATA_PATH}...")
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
     try:
-        # Note: Chroma might complain if we change embedding function on existing collection
-        print(f"ℹ️  Recreating collection '{COLLECTION_NAME}'...")
-        client.delete_collection(name=COLLECTION_NAME)
-    except Exception:
-        pass
-        
-    collection = client.create_collection(name=COLLECTION_NAME, embedding_function=ef)
+        if not (VECTORIZER_PATH.exists() or VECTORIZER_PATH.with_suffix(".pkl").exists()):
+            raise ValueError("no trained vectorizer")
+        ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+        collection = client.get_collection(name=COLLECTION_NAME, embedding_function=ef)
+    except Exception as e:
+        print(f"ℹ️  Nothing to update incrementally ({e}), running a full ingestion...")
+        return ingest_data()
 
-    # Batch Ingestion
-    BATCH_SIZE = 100
-    total_batches = (len(documents) + BATCH_SIZE - 1) // BATCH_SIZE
-    
-    print(f"💾 Ingesting into ChromaDB in {total_batches} batches...")
+    loaded = load_documents()
+    if loaded is None:
+        return None
+    documents, metadatas, ids = loaded
+
+    existing = stored_hashes(collection)
+    changed = [i for i, doc_id in enumerate(ids) if existing.get(doc_id) != metadatas[i]["content_hash"]]
+    counts = {
+        "added": sum(1 for i in changed if ids[i] not in existing),
+        "updated": sum(1 for i in changed if ids[i] in existing),
+        "deleted": len(set(existing) - set(ids)),
+        "unchanged": len(ids) - len(changed),
+    }
+    removed = sorted(set(existing) - set(ids), key=int)
+
+    print(f"💾 Upserting {len(changed)} documents, deleting {len(removed)}...")
+    # No checkpoint needed: a re-run skips every row whose content hash already matches
+    matrix = ef.transform([documents[j] for j in changed])
+    report = write_batches(
+        collection,
+        [documents[j] for j in changed], [metadatas[j] for j in changed], [ids[j] for j in changed],
+        embed=lambda start, end: matrix[start:end].toarray(), batch_size=BATCH_SIZE,
+    )
+    for start, end, error in report["failed"]:
+        print(f"❌ {end - start} changed documents failed: {error}")
+    for i in range(0, len(removed), BATCH_SIZE):
+        collection.delete(ids=removed[i : i + BATCH_SIZE])
+
+    # The in-process index holds the whole corpus, so it is rewritten rather than patched
+    write_sparse_index(SPARSE_INDEX_PATH, ef.transform(documents), ids, documents, metadatas)
+    version = ingest_version(run_fingerprint(ids, metadatas)[:16], report["failed"])
+    write_market_cube(documents, metadatas, ids, version)
+    write_index_version(version, len(ids))
+
+    print(f"✅ Incremental ingestion complete: {counts['added']} added, {counts['updated']} updated, "
+          f"{counts['deleted']} deleted, {counts['unchanged']} unchanged. "
+          f"Collection '{COLLECTION_NAME}' has {collection.count()} documents.")
+    return counts
+
+
+def ingest_data(report_path=REPORT_PATH):
+    """
+    Ingests the real-estate CSV data into a local ChromaDB using TF-IDF embeddings.
+    Refits the vectorizer and rebuilds the collection from scratch, unless a
+    checkpoint shows an earlier run over the same rows stopped part way: then
+    only the rows it did not write are written.
+    Wall / CPU time, rows/sec and peak memory of every stage, plus the size
+    of the outputs on disk, are written as JSON to report_path.
+    """
+    print(f"🚀 Starting ingestion from {DATA_PATH} using TF-IDF...")
+    metrics = IngestMetrics("full")
     
-    for i in tqdm(range(0, len(documents), BATCH_SIZE)):
-        batch_ids = ids[i : i + BATCH_SIZE]
-        batch_docs = documents[i : i + BATCH_SIZE]
-        batch_metas = metadatas[i : i + BATCH_SIZE]
-        
+    loaded = load_documents(metrics)
+    if loaded is None:
+        return None
+    documents, metadatas, ids = loaded
+
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
+    fingerprint = run_fingerprint(ids, metadatas)
+    checkpoint = Checkpoint(CHECKPOINT_PATH, fingerprint)
+
+    if checkpoint.ranges and VECTORIZER_PATH.exists():
+        # Same rows as an interrupted run: keep its vectorizer and collection, write only what is missing
+        print(f"↩️  Resuming: {checkpoint.rows_done} of {len(ids)} documents were already written...")
+        ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+        collection = client.get_or_create_collection(name=COLLECTION_NAME, embedding_function=ef)
+    else:
+        checkpoint.clear()
+
+        # Fit Vectorizer first (TF-IDF needs to know the vocabulary)
+        print("🧠 Training TF-IDF vectorizer...")
+        with metrics.stage("fit_vectorizer", rows=len(documents)):
+            ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH), max_features=384)
+            ef.fit(documents)
+        print("✅ Vectorizer trained and saved.")
+
+        # Get or Create Collection
         try:
-            # Generate embeddings explicitly to debug/control types
-            batch_embeddings = ef(batch_docs)
-            
-            collection.add(
-                documents=batch_docs,
-                embeddings=batch_embeddings,
-                metadatas=batch_metas,
-                ids=batch_ids
-            )
-        except Exception as e:
-            print(f"\n❌ Error adding batch {i}: {e}")
-            import traceback
-            traceback.print_exc()
-            break
+            # Note: Chroma might complain if we change embedding function on existing collection
+            print(f"ℹ️  Recreating collection '{COLLECTION_NAME}'...")
+            client.delete_collection(name=COLLECTION_NAME)
+        except Exception:
+            pass
+
+        collection = client.create_collection(name=COLLECTION_NAME, embedding_function=ef)
+
+    # Embed the whole corpus once as a sparse matrix; batches are densified by the embedding pool
+    with metrics.stage("embed", rows=len(documents)):
+        matrix = ef.transform(documents)
+
+    print(f"💾 Ingesting into ChromaDB with {WRITERS} writers...")
+    with metrics.stage("write_store") as measured:
+        report = write_batches(
+            collection, documents, metadatas, ids,
+            embed=lambda start, end: matrix[start:end].toarray(),
+            checkpoint=checkpoint, batch_size=BATCH_SIZE,
+        )
+        measured["rows"] = report["written"]
+    print(f"✅ Wrote {report['written']} documents at {report['docs_per_sec']:,.0f} docs/s "
+          f"(batch size settled at {report['final_batch_size']})")
+    if report["failed"]:
+        for start, end, error in report["failed"]:
+            print(f"❌ Rows {start}-{end} failed: {error}")
+        print(f"⚠️  {sum(end - start for start, end, _ in report['failed'])} documents were not written; "
+              f"run ingest.py again to resume from {CHECKPOINT_PATH.name}.")
+    else:
+        checkpoint.clear()
+
+    print(f"💾 Writing sparse retrieval index to {SPARSE_INDEX_PATH}...")
+    with metrics.stage("write_sparse_index", rows=len(ids)):
+        write_sparse_index(SPARSE_INDEX_PATH, matrix, ids, documents, metadatas)
+    version = ingest_version(fingerprint[:16], report["failed"])
+    with metrics.stage("build_market_cube", rows=len(ids)):
+        write_market_cube(documents, metadatas, ids, version)
+    # Tells running API workers to drop results cached against the previous data
+    write_index_version(version, len(ids))
         
     print(f"✅ Ingestion Complete! Collection '{COLLECTION_NAME}' has {collection.count()} documents.")
+    print(metrics.summary())
+    metrics.report(
+        report_path, rows=len(ids),
+        outputs={"collection": CHROMA_DB_DIR, "sparse_index": SPARSE_INDEX_PATH, "vectorizer": VECTORIZER_PATH,
+                 "market_cube": CUBE_PATH},
+        collection_count=collection.count(),
+        failed_rows=sum(end - start for start, end, _ in report["failed"]),
+        final_batch_size=report["final_batch_size"],
+    )
+    print(f"📈 Run report written to {report_path}")
+    return {"added": report["written"], "updated": 0, "deleted": 0, "unchanged": 0}
 
 if __name__ == "__main__":
-    ingest_data()
+    parser = argparse.ArgumentParser(description="Ingest the buy-vs-rent analysis into ChromaDB.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only upsert changed rows and delete removed ones instead of rebuilding")
+    parser.add_argument("--report", type=Path, default=REPORT_PATH,
+                        help="Where to write the JSON run report of a full ingestion")
+    args = parser.parse_args()
+    if args.incremental:
+        ingest_incremental()
+    else:
+        ingest_data(args.report)
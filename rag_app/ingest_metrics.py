@@ -0,0 +1,130 @@
+"""
+Per-stage metrics for ingestion runs.
+
+IngestMetrics times each stage of a run (wall and CPU time, rows/sec) and
+samples the process RSS in a background thread to get each stage's peak
+memory. report() adds the on-disk size of what the run produced and writes
+everything as JSON, so re-ingest cost can be tracked as the corpus grows.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+SAMPLE_SECONDS = 0.01
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (peak so far where the current value isn't available)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def disk_size_bytes(path):
+    """Size of a file, or of every file under a directory; 0 if it doesn't exist."""
+    path = Path(path)
+    if path.is_file():
+        return path.stat().st_size
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+class _PeakSampler:
+    """Polls the RSS every SAMPLE_SECONDS until stopped and keeps the maximum."""
+
+    def __init__(self):
+        self.peak = current_rss_mb()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_SECONDS):
+            rss = current_rss_mb()
+            if rss is not None and (self.peak is None or rss > self.peak):
+                self.peak = rss
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        rss = current_rss_mb()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+        return self.peak
+
+
+class IngestMetrics:
+    def __init__(self, run="ingest"):
+        self.run = run
+        self.stages = []
+        self.started_at = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Time the enclosed block as one stage. rows can be given up front or
+        set on the yielded dict ({"rows": n}) once known.
+        """
+        info = {"rows": rows}
+        sampler = _PeakSampler()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            wall = time.perf_counter() - wall
+            cpu = time.process_time() - cpu
+            peak = sampler.stop()
+            rows = info["rows"]
+            self.stages.append({
+                "stage": name,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(cpu, 4),
+                "rows": rows,
+                "rows_per_sec": round(rows / wall, 1) if rows and wall > 0 else None,
+                "peak_rss_mb": round(peak, 1) if peak is not None else None,
+            })
+
+    def summary(self):
+        return "\n".join(
+            f"  {s['stage']:20s} {s['wall_seconds']:8.3f}s wall {s['cpu_seconds']:8.3f}s cpu "
+            f"{(s['rows_per_sec'] or 0):>12,.0f} rows/s  peak {(s['peak_rss_mb'] or 0):7.1f} MB"
+            for s in self.stages
+        )
+
+    def report(self, path, rows, outputs, **extra):
+        """Write the run report as JSON. outputs maps a name to a file or directory whose size is recorded."""
+        wall = time.perf_counter() - self._start
+        peaks = [s["peak_rss_mb"] for s in self.stages if s["peak_rss_mb"] is not None]
+        report = {
+            "run": self.run,
+            "started_at": self.started_at.isoformat(),
+            "rows": rows,
+            "wall_seconds": round(wall, 4),
+            "cpu_seconds": round(time.process_time() - self._cpu_start, 4),
+            "rows_per_sec": round(rows / wall, 1) if rows and wall > 0 else None,
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "stages": self.stages,
+            "disk_bytes": {name: disk_size_bytes(p) for name, p in outputs.items()},
+            **extra,
+        }
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        tmp_path.replace(path)
+        return report
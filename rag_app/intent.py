@@ -119,6 +119,32 @@ LOCATIONS = [
 ]
 
 
+# Budget / area qualifiers: "under 80 lakhs", "above 1.5 crore", "over 1200 sqft"
+MAX_WORDS = ["under", "below", "less than", "max", "upto", "up to", "within"]
+MIN_WORDS = ["above", "over", "more than", "min", "atleast", "at least"]
+_QUALIFIER = r'((?:' + "|".join(MAX_WORDS + MIN_WORDS) + r')\s*(?:of\s*)?(?:rs\.?|₹)?\s*)?'
+_BUDGET_UNIT = r'(lakhs?|lacs?|l|crores?|cr)'
+_AREA_UNIT = r'(sq\.?\s*ft|sqft|square\s*feet)'
+BUDGET_PATTERN = re.compile(_QUALIFIER + r'(\d+(?:\.\d+)?)\s*' + _BUDGET_UNIT + r'\b')
+AREA_PATTERN = re.compile(_QUALIFIER + r'(\d+(?:\.\d+)?)\s*' + _AREA_UNIT + r'\b')
+
+
+def _range_pattern(unit: str) -> re.Pattern:
+    """
+    "between 50 lakhs and 1 crore", "50 to 80 lakhs", "1-1.5 cr": two amounts,
+    the first taking the second's unit when it has none of its own. "and"
+    only separates a range after "between".
+    """
+    amount = r'(?:rs\.?|₹)?\s*(\d+(?:\.\d+)?)\s*'
+    return re.compile(
+        r'(between\s*)?' + amount + r'(?:' + unit + r'\b)?\s*(-|–|to|and)\s*' + amount + unit + r'\b'
+    )
+
+
+BUDGET_RANGE_PATTERN = _range_pattern(_BUDGET_UNIT)
+AREA_RANGE_PATTERN = _range_pattern(_AREA_UNIT)
+
+
 # ==================== CLASSIFICATION FUNCTIONS ====================
 
 def extract_entities(query: str) -> dict:
@@ -129,6 +155,8 @@ def extract_entities(query: str) -> dict:
         "bhk": None,
         "budget_min": None,
         "budget_max": None,
+        "area_min": None,
+        "area_max": None,
         "intent_keywords": [],
     }
     
@@ -142,25 +170,69 @@ def extract_entities(query: str) -> dict:
     if bhk_match:
         entities["bhk"] = int(bhk_match.group(1))
     
-    # Extract budget mentions
-    budget_match = re.search(r'(\d+)\s*(lakh|lac|l|crore|cr)', q)
-    if budget_match:
-        amount = int(budget_match.group(1))
-        unit = budget_match.group(2).lower()
-        if unit in ["crore", "cr"]:
-            amount *= 100  # Convert to lakhs
-        
-        if any(w in q for w in ["under", "below", "less than", "max", "upto"]):
-            entities["budget_max"] = amount
-        elif any(w in q for w in ["above", "over", "more than", "min", "atleast"]):
-            entities["budget_min"] = amount
-        else:
-            # Default to max budget
-            entities["budget_max"] = amount
-    
+    # Extract budget mentions (in lakhs): a range sets both bounds
+    budget_range = _find_range(BUDGET_RANGE_PATTERN, q)
+    if budget_range:
+        low, high = sorted([
+            _lakhs(budget_range.group(2), budget_range.group(3) or budget_range.group(6)),
+            _lakhs(budget_range.group(5), budget_range.group(6)),
+        ])
+        entities["budget_min"], entities["budget_max"] = low, high
+    else:
+        budget_match = BUDGET_PATTERN.search(q)
+        if budget_match:
+            amount = _lakhs(budget_match.group(2), budget_match.group(3))
+            bound = _bound(budget_match.group(1), q, default="max")
+            entities["budget_min" if bound == "min" else "budget_max"] = amount
+
+    # Extract carpet area mentions (in sqft); a bare number is a minimum size
+    area_range = _find_range(AREA_RANGE_PATTERN, q)
+    if area_range:
+        entities["area_min"], entities["area_max"] = sorted([float(area_range.group(2)), float(area_range.group(5))])
+    else:
+        area_match = AREA_PATTERN.search(q)
+        if area_match:
+            area = float(area_match.group(2))
+            bound = _bound(area_match.group(1), "", default="min")
+            entities["area_min" if bound == "min" else "area_max"] = area
+
     return entities
 
 
+def _find_range(pattern: re.Pattern, q: str):
+    """The first range match in q ("and" needs a "between" before it), or None."""
+    for match in pattern.finditer(q):
+        if match.group(1) or match.group(4) != "and":
+            return match
+    return None
+
+
+def _strip_ranges(q: str) -> str:
+    """q without its budget / area ranges, so "between X and Y" does not read as a comparison."""
+    for pattern in (BUDGET_RANGE_PATTERN, AREA_RANGE_PATTERN):
+        match = _find_range(pattern, q)
+        while match:
+            q = q[:match.start()] + " " + q[match.end():]
+            match = _find_range(pattern, q)
+    return q
+
+
+def _lakhs(amount: str, unit: str) -> float:
+    """An amount in lakhs or crores, in lakhs."""
+    value = float(amount)
+    return value * 100 if unit.lower().startswith("cr") else value
+
+
+def _bound(qualifier: str, q: str, default: str) -> str:
+    """"min" or "max" from the words before an amount (or anywhere in q when there are none)."""
+    text = qualifier or q
+    if any(w in text for w in MAX_WORDS):
+        return "max"
+    if any(w in text for w in MIN_WORDS):
+        return "min"
+    return default
+
+
 def classify_intent(query: str) -> IntentResult:
     """
     Classify user query into one of the defined intents.
@@ -214,8 +286,10 @@ def classify_intent(query: str) -> IntentResult:
             )
     
     # ========== COMPARE CHECK ==========
+    # A budget or area range ("between 50 and 80 lakhs") is not a comparison
+    compare_text = _strip_ranges(q)
     for keyword in COMPARE_KEYWORDS:
-        if re.search(keyword, q, re.IGNORECASE):
+        if re.search(keyword, compare_text, re.IGNORECASE):
             return IntentResult(
                 intent="COMPARE",
                 confidence=0.85,
@@ -0,0 +1,125 @@
+"""
+Live buy-vs-rent analysis with custom assumptions.
+
+Rebuilds the listing inputs from the metadata of the ingested properties
+and re-runs the columnar engine from calaculate_financial_terms/modules on a
+selected subset, so a single property or a whole city can be re-evaluated
+per request. Reading them from the property store rather than the analysis
+CSV keeps them in step with whatever was ingested, including by
+stream_ingest.py, which only writes the CSV when asked to.
+"""
+
+import sys
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+FINANCE_DIR = BASE_DIR / "calaculate_financial_terms"
+BANKS_PATH = FINANCE_DIR / "banks.csv"
+
+# The financial modules are imported as the top-level package "modules"
+if str(FINANCE_DIR) not in sys.path:
+    sys.path.append(str(FINANCE_DIR))
+
+from modules.analysis_table import INDEX_NAME, apply_schema  # noqa: E402
+from modules.engine import analyze_frame  # noqa: E402
+from modules.loan import average_interest_rate  # noqa: E402
+
+def listings_from_store(store) -> pd.DataFrame:
+    """
+    The listing inputs of every stored property, indexed by source_row and
+    typed like the analysis table. Missing numbers are stored as 0, which the
+    engine treats as a gap just like NaN. Properties ingested before the
+    exact price was kept fall back to price_lakhs.
+    """
+    metadatas = store.metadatas
+
+    def column(key, default=""):
+        return [meta.get(key, default) for meta in metadatas]
+
+    df = pd.DataFrame(
+        {
+            "title": column("title"),
+            "city": column("city"),
+            "location": column("location"),
+            "bedrooms": column("bedrooms", None),
+            "price_inr": [meta.get("price_inr", float(meta.get("price_lakhs") or 0) * 100000) for meta in metadatas],
+            "area_sqft": column("area_sqft", 0.0),
+            "estimated_monthly_rent": column("monthly_rent", 0.0),
+        },
+        index=pd.Index([int(row) for row in column("source_row", -1)], name=INDEX_NAME),
+    )
+    return apply_schema(df).sort_index()
+
+
+def default_interest_rate() -> float:
+    return float(average_interest_rate(BANKS_PATH))
+
+
+def select_listings(
+    listings: pd.DataFrame,
+    source_row: Optional[int] = None,
+    city: Optional[str] = None,
+    bedrooms: Optional[int] = None,
+    locality: Optional[str] = None,
+) -> pd.DataFrame:
+    """Pick one row by source_row, or every row matching the city / bedrooms / locality filter."""
+    if source_row is not None:
+        if source_row not in listings.index:
+            return listings.iloc[0:0]
+        return listings.loc[[source_row]]
+
+    mask = np.ones(len(listings), dtype=bool)
+    if city:
+        mask &= (listings["city"].str.lower() == city.lower()).to_numpy()
+    if bedrooms is not None:
+        mask &= (listings["bedrooms"] == bedrooms).to_numpy()
+    if locality:
+        mask &= (listings["location"].str.lower() == locality.lower()).to_numpy()
+    return listings[mask]
+
+
+def analyze(selected: pd.DataFrame, interest_rate: float, down_payment_rate: float, loan_years: int,
+            tax_slab: float, appreciation: float, invest_return: float) -> pd.DataFrame:
+    """Run the columnar engine on the selection, keeping source_row as a column."""
+    result = analyze_frame(
+        selected, interest_rate,
+        down_payment_rate=down_payment_rate,
+        loan_years=loan_years,
+        tax_slab=tax_slab,
+        appreciation=appreciation,
+        invest_return=invest_return,
+    )
+    result.insert(0, "source_row", selected.index.to_numpy())
+    return result
+
+
+def summarize(result: pd.DataFrame) -> dict:
+    """Decision split and typical wealth difference across an analysed selection."""
+    decided = result["decision"].notna()
+    buy = result["decision"].astype(str).str.startswith("BUY") & decided
+    total = int(decided.sum())
+    wealth = pd.to_numeric(result.loc[decided, "wealth_difference"])
+
+    return {
+        "total": total,
+        "buy_count": int(buy.sum()),
+        "rent_count": total - int(buy.sum()),
+        "buy_pct": round(100 * int(buy.sum()) / total, 1) if total else 0,
+        "median_wealth_difference": round(float(wealth.median()), 0) if total else 0,
+    }
+
+
+def to_records(result: pd.DataFrame, limit: Optional[int] = None) -> list:
+    """JSON-safe list of row dicts with native Python values (NaN becomes None)."""
+    if limit is not None:
+        result = result.head(limit)
+    columns = list(result.columns)
+    values = [result[col].tolist() for col in columns]
+    return [
+        {col: (None if isinstance(v, float) and v != v else v) for col, v in zip(columns, row)}
+        for row in zip(*values)
+    ]
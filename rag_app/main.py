@@ -1,17 +1,31 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, Field
+from starlette.datastructures import MutableHeaders
 from pathlib import Path
 from typing import Optional, List
+import hashlib
+import json
 import re
+import threading
+import time
 import chromadb
 
-from statistics import median
 import numpy as np
+import pandas as pd
 
+from rag_app.cache import SqliteCache, TieredCache, TTLCache
+from rag_app.config import QUERY_CACHE_PATH, RETRIEVAL_BACKEND
+from rag_app.corpus_stats import MARKET_CITIES, CorpusStats
+from rag_app.index_version import IndexVersion
 from rag_app.intent import classify_intent, is_query_broad
+from rag_app.market_cube import CUBE_PATH, MarketCube
+from rag_app.property_store import PropertyStore
+from rag_app.sparse_index import SparseIndex
 from rag_app.tfidf_embedding import TfidfEmbeddingFunction
 from rag_app.rag import generate_answer, generate_explanation, generate_flip_explanation
+from rag_app import live_analysis
 
 app = FastAPI()
 
@@ -24,94 +38,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress larger responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=500)
+
+
+class UniqueVaryMiddleware:
+    """
+    Drop repeated Vary entries. Market responses always declare Vary:
+    Accept-Encoding (see conditional_response) and GZipMiddleware appends it
+    again to the bodies it handles.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_unique_vary(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                if "vary" in headers:
+                    headers["vary"] = ", ".join(dict.fromkeys(v.strip() for v in headers["vary"].split(",")))
+            await send(message)
+
+        await self.app(scope, receive, send_unique_vary)
+
+
+# Outermost, so it sees the Vary entries every other middleware added
+app.add_middleware(UniqueVaryMiddleware)
+
 
 # Constants
 BASE_DIR = Path(__file__).resolve().parent.parent
 CHROMA_DB_DIR = BASE_DIR / "rag_app" / "chroma_db"
-VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer.pkl"
+VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer"
+SPARSE_INDEX_PATH = BASE_DIR / "rag_app" / "sparse_index.npz"
 COLLECTION_NAME = "real_estate"
 
-# Initialize ChromaDB client and collection at startup
-client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
-ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
-collection = client.get_collection(name=COLLECTION_NAME, embedding_function=ef)
+
+def load_backend():
+    """The embedding function and the collection (or in-process index) /ask retrieves from."""
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    if RETRIEVAL_BACKEND == "sparse":
+        # In-process TF-IDF index written by ingest.py; same query / get / count as the collection
+        return ef, SparseIndex.load(SPARSE_INDEX_PATH, embedding_function=ef)
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
+    return ef, client.get_collection(name=COLLECTION_NAME, embedding_function=ef)
 
 
+# Initialize the retrieval backend and the columnar property store at startup;
+# both are rebuilt and swapped in after a re-ingest (see on_index_change)
+ef, collection = load_backend()
+properties = PropertyStore.load(collection)
+
+# Count, per-city / per-BHK counts and ranges, recomputed only after a re-ingest
+corpus_stats = CorpusStats(lambda: properties.metadatas)
+corpus_stats.get()
+
+# Listing inputs for live re-analysis with custom assumptions; swapped in with the rest after a re-ingest
+listings = live_analysis.listings_from_store(properties)
+DEFAULT_INTEREST_RATE = live_analysis.default_interest_rate()
 
-# ...existing code...
 
-# Helper function to get all property metadata
-def get_all_metadatas():
-    all_docs = collection.get(include=["metadatas"])
-    metadatas = all_docs.get("metadatas", [])
-    if not metadatas:
-        return []
-    if isinstance(metadatas[0], list):
-        metadatas = [item for sublist in metadatas for item in sublist]
-    return metadatas
 
 # Get available filter options
 @app.get("/market_filters")
-def get_market_filters():
+def get_market_filters(request: Request, response: Response):
     """Returns available filter options for the market snapshot"""
-    metadatas = get_all_metadatas()
-    cities = ["Bangalore", "Mumbai"]
-    
-    # Get localities per city
-    localities = {city: set() for city in cities}
-    bhk_options = set()
-    prices = []
-    areas = []
-    
-    for meta in metadatas:
-        city = meta.get("city", "").capitalize()
-        if city in cities:
-            loc = meta.get("location", "")
-            if loc:
-                localities[city].add(loc)
-            
-            # Extract BHK
-            bedrooms = meta.get("bedrooms")
-            if bedrooms:
-                try:
-                    bhk = int(float(bedrooms))
-                    if 1 <= bhk <= 5:
-                        bhk_options.add(bhk)
-                except:
-                    pass
-            
-            # Price range
-            price = meta.get("price_lakhs")
-            if price:
-                try:
-                    prices.append(float(price))
-                except:
-                    pass
-            
-            # Area range
-            area = meta.get("area_sqft")
-            if area:
-                try:
-                    areas.append(float(area))
-                except:
-                    pass
-    
+    not_modified = conditional_response(request, response)
+    if not_modified:
+        return not_modified
+    stats = corpus_stats.get()
+    bhk_options = {
+        bhk for city in MARKET_CITIES for bhk in stats["bhk_by_city"].get(city, {}) if 1 <= bhk <= 5
+    }
+    prices = stats["price_range"]
+    areas = stats["area_range"]
+
     return {
-        "localities": {city: sorted(list(locs)) for city, locs in localities.items()},
-        "bhk_options": sorted(list(bhk_options)),
+        "localities": stats["localities"],
+        "bhk_options": sorted(bhk_options),
         "price_range": {
-            "min": round(min(prices), 0) if prices else 0,
-            "max": round(max(prices), 0) if prices else 500
+            "min": round(prices["min"], 0) if prices else 0,
+            "max": round(prices["max"], 0) if prices else 500
         },
         "area_range": {
-            "min": round(min(areas), 0) if areas else 0,
-            "max": round(max(areas), 0) if areas else 3000
+            "min": round(areas["min"], 0) if areas else 0,
+            "max": round(areas["max"], 0) if areas else 3000
         }
     }
 
+
+@app.get("/corpus_stats")
+def get_corpus_stats(request: Request, response: Response):
+    """Document count, per-city and per-BHK counts and price / area ranges of the ingested data"""
+    not_modified = conditional_response(request, response)
+    if not_modified:
+        return not_modified
+    return {"index_version": data_version, **corpus_stats.get()}
+
 # Place this after app, collection, etc. are defined
 @app.get("/market_snapshot")
 def market_snapshot(
+    request: Request,
+    response: Response,
     bhk: Optional[str] = Query(None, description="Comma-separated BHK values like '2,3'"),
     min_price: Optional[float] = Query(None, description="Min price in lakhs"),
     max_price: Optional[float] = Query(None, description="Max price in lakhs"),
@@ -120,64 +153,25 @@ def market_snapshot(
     localities: Optional[str] = Query(None, description="Comma-separated localities")
 ):
     """Returns market snapshot with optional filters"""
-    cities = ["Bangalore", "Mumbai"]
-    metadatas = get_all_metadatas()
-    
-    if not metadatas:
+    not_modified = conditional_response(request, response)
+    if not_modified:
+        return not_modified
+    if not len(properties):
         return {"error": "No data found"}
 
     # Parse filter values
     bhk_filter = [int(b.strip()) for b in bhk.split(",")] if bhk else None
     locality_filter = [l.strip() for l in localities.split(",")] if localities else None
 
-    # Filter and organize by city
-    city_data = {city: [] for city in cities}
-    for meta in metadatas:
-        city = meta.get("city", "").capitalize()
-        if city not in city_data:
-            continue
-        
-        # Apply BHK filter
-        if bhk_filter:
-            try:
-                prop_bhk = int(float(meta.get("bedrooms", 0)))
-                if prop_bhk not in bhk_filter:
-                    continue
-            except:
-                continue
-        
-        # Apply price filter
-        if min_price is not None or max_price is not None:
-            try:
-                price = float(meta.get("price_lakhs", 0))
-                if min_price is not None and price < min_price:
-                    continue
-                if max_price is not None and price > max_price:
-                    continue
-            except:
-                continue
-        
-        # Apply area filter
-        if min_area is not None or max_area is not None:
-            try:
-                area = float(meta.get("area_sqft", 0))
-                if min_area is not None and area < min_area:
-                    continue
-                if max_area is not None and area > max_area:
-                    continue
-            except:
-                continue
-        
-        # Apply locality filter
-        if locality_filter:
-            prop_loc = meta.get("location", "")
-            if prop_loc not in locality_filter:
-                continue
-        
-        city_data[city].append(meta)
+    # Merge the precomputed cube cells the filters select instead of scanning listings
+    total_filtered, buy_rent_dist, median_price_sqft, avg_break_even = market_cube.snapshot(
+        bhk=bhk_filter,
+        min_price=min_price, max_price=max_price,
+        min_area=min_area, max_area=max_area,
+        localities=locality_filter,
+    )
 
     # Check if we have enough data
-    total_filtered = sum(len(props) for props in city_data.values())
     if total_filtered < 5:
         return {
             "error": "insufficient_data",
@@ -185,47 +179,6 @@ def market_snapshot(
             "total_filtered": total_filtered
         }
 
-    # 1. BUY vs RENT Distribution
-    buy_rent_dist = {}
-    for city in cities:
-        buy_count = sum(1 for m in city_data[city] if str(m.get("decision", "")).lower().startswith("buy"))
-        rent_count = sum(1 for m in city_data[city] if str(m.get("decision", "")).lower().startswith("rent"))
-        total = buy_count + rent_count
-        buy_pct = round(100 * buy_count / total, 1) if total else 0
-        rent_pct = round(100 * rent_count / total, 1) if total else 0
-        buy_rent_dist[city] = {"buy": buy_pct, "rent": rent_pct, "buy_count": buy_count, "rent_count": rent_count, "total": total}
-
-    # 2. Median Price per Sq Ft
-    median_price_sqft = {}
-    for city in cities:
-        prices = []
-        for m in city_data[city]:
-            price = m.get("price_lakhs")
-            area = m.get("area_sqft")
-            if price and area and float(area) > 0:
-                prices.append((float(price) * 100000) / float(area))
-        median_price_sqft[city] = round(float(median(prices)), 0) if prices else 0
-
-    # 3. Average Break-Even Year
-    avg_break_even = {}
-    for city in cities:
-        years = []
-        for m in city_data[city]:
-            price = m.get("price_lakhs")
-            rent = m.get("monthly_rent") or m.get("estimated_monthly_rent")
-            if price and rent:
-                try:
-                    price_val = float(price) * 100000
-                    rent_val = float(rent)
-                    if rent_val > 0:
-                        annual_rent = rent_val * 12
-                        break_even_years = price_val / annual_rent
-                        if 1 < break_even_years < 50:
-                            years.append(break_even_years)
-                except (ValueError, TypeError):
-                    pass
-        avg_break_even[city] = round(float(np.mean(years)), 1) if years else 0
-
     return {
         "buy_rent_distribution": buy_rent_dist,
         "median_price_per_sqft": median_price_sqft,
@@ -243,12 +196,30 @@ def market_snapshot(
 class QueryRequest(BaseModel):
     query: str
     page: Optional[int] = 1  # For pagination
+    cursor: Optional[str] = None  # Returned by the first page; lets later pages reuse its ranking
 
 
 class ExplainRequest(BaseModel):
     source_row: int  # The source_row ID of the property to explain
 
 
+class AnalyzeRequest(BaseModel):
+    # Either a single property...
+    source_row: Optional[int] = None
+    # ...or a filter over all properties
+    city: Optional[str] = None
+    bedrooms: Optional[int] = None
+    locality: Optional[str] = None
+    # Assumptions (same units as generate_final_buy_rent_csv.py)
+    down_payment_rate: float = Field(0.25, ge=0, lt=1)
+    interest_rate: Optional[float] = Field(None, gt=0, le=30, description="Annual loan rate in %, defaults to the average bank rate")
+    loan_years: int = Field(20, ge=1, le=40)
+    tax_slab: float = Field(0.30, ge=0, le=1)
+    appreciation: float = Field(0.06, gt=-1, le=1)
+    invest_return: float = Field(0.10, gt=-1, le=1)
+    limit: Optional[int] = Field(50, ge=0, description="Max properties returned for a filter")
+
+
 # Direct responses for non-RAG intents
 GREETING_RESPONSES = {
     "default": "Hello! I'm your Genesis Real Estate Assistant. I can help you understand property investment decisions, compare buy vs rent scenarios, and explain the financial logic behind property analyses. What would you like to know?"
@@ -295,6 +266,157 @@ def get_chitchat_response(query: str) -> str:
 # Number of properties to show initially
 INITIAL_RESULTS = 5
 
+# /ask ranks CURSOR_DEPTH ids once and serves pages by slicing them;
+# a page past the ranked ids re-ranks with twice the depth
+CURSOR_DEPTH = 100
+
+# Ranked ids per cursor: an LRU per worker, in front of an optional sqlite
+# file shared by all workers. Cursors include the index version, so a
+# re-ingest invalidates every entry; the in-memory tier is also emptied then.
+QUERY_CACHE_SIZE = 512
+QUERY_CACHE_DISK_SIZE = 20000
+QUERY_CACHE_TTL_SECONDS = 15 * 60
+query_cache = TieredCache(
+    TTLCache(maxsize=QUERY_CACHE_SIZE, ttl=QUERY_CACHE_TTL_SECONDS),
+    SqliteCache(QUERY_CACHE_PATH, maxsize=QUERY_CACHE_DISK_SIZE, ttl=QUERY_CACHE_TTL_SECONDS) if QUERY_CACHE_PATH else None,
+)
+
+
+reload_lock = threading.Lock()
+
+
+def reload_data():
+    """Load the re-ingested data next to the current one, then swap it in."""
+    global ef, collection, properties, market_cube, listings, data_version
+    with reload_lock:
+        version = index_version.current()
+        try:
+            new_ef, new_collection = load_backend()
+            new_properties = PropertyStore.load(new_collection)
+            new_listings = live_analysis.listings_from_store(new_properties)
+        except Exception as e:
+            print(f"Reload after re-ingest failed: {e}, keeping the previous data")
+            return
+        new_cube = load_market_cube(new_properties, version)
+        ef, collection, properties, market_cube, listings = (
+            new_ef, new_collection, new_properties, new_cube, new_listings
+        )
+        data_version = version
+        # Rankings cached while the old data was still being served are stale too
+        query_cache.memory.clear()
+        corpus_stats.invalidate()
+
+
+def on_index_change(version):
+    query_cache.memory.clear()
+    threading.Thread(target=reload_data, daemon=True).start()
+
+
+index_version = IndexVersion(on_change=on_index_change)
+
+
+def current_properties() -> PropertyStore:
+    """The property store for this request, after checking for a re-ingest."""
+    index_version.current()
+    return properties
+
+
+def current_listings() -> pd.DataFrame:
+    """The listings table for this request, after checking for a re-ingest."""
+    index_version.current()
+    return listings
+
+
+def load_market_cube(store: PropertyStore, version: str) -> MarketCube:
+    """The aggregate cube ingest wrote for this version of the data, else one built from the store."""
+    try:
+        cube = MarketCube.load(CUBE_PATH)
+        if cube.version == version:
+            return cube
+    except (OSError, ValueError, KeyError):
+        pass
+    return MarketCube.build(store, MARKET_CITIES, version=version)
+
+
+# Version of the data this worker is serving; trails the index version while a reload runs
+data_version = index_version.current()
+market_cube = load_market_cube(properties, data_version)
+
+# Market responses only change on re-ingest: browsers and proxies may reuse them
+# for MARKET_MAX_AGE_SECONDS, then revalidate them with the ETag
+MARKET_MAX_AGE_SECONDS = 60
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in [tag.removeprefix("W/") for tag in tags]
+
+
+def conditional_response(request: Request, response: Response) -> Optional[Response]:
+    """
+    Tag a market response with the version of the data being served and
+    make it cacheable. Returns a 304 to send instead when the client already
+    has this version.
+    """
+    current_properties()  # Starts a reload if the data was re-ingested
+    headers = {
+        "ETag": f'W/"{data_version}"',
+        "Cache-Control": f"public, max-age={MARKET_MAX_AGE_SECONDS}",
+        # GZipMiddleware only adds this to bodies over its minimum size, never to a 304;
+        # a shared cache needs the same Vary on the 304 as on the response it revalidates
+        "Vary": "Accept-Encoding",
+    }
+    if etag_matches(request.headers.get("if-none-match", ""), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+
+def cursor_token(query: str, where_clause: Optional[dict], version: str) -> str:
+    """Same normalized query, filters and index version -> same cursor."""
+    normalized = " ".join(query.lower().split())
+    key = json.dumps([normalized, where_clause, version], sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:24]
+
+
+def rank_ids(query: str, where_clause: Optional[dict], depth: int) -> list:
+    """Ids of the depth closest documents, closest first, without fetching the documents."""
+    try:
+        if where_clause:
+            results = collection.query(query_texts=[query], n_results=depth, where=where_clause, include=[])
+        else:
+            results = collection.query(query_texts=[query], n_results=depth, include=[])
+    except Exception as e:
+        # Fallback to unfiltered query if filter fails
+        print(f"Filter query failed: {e}, falling back to unfiltered")
+        results = collection.query(query_texts=[query], n_results=depth, include=[])
+    return results["ids"][0] if results["ids"] else []
+
+
+def ranked_ids(query: str, where_clause: Optional[dict], page: int, cursor: Optional[str] = None):
+    """
+    The cursor and ranked ids for a query, ranked deep enough to cover page.
+    A cursor from an earlier page is reused while it is for the same query
+    and filters and the index version it was ranked against is current.
+    """
+    version = index_version.current()
+    key = [" ".join(query.lower().split()), where_clause]
+    ranked = query_cache.get(cursor) if cursor else None
+    if ranked is None or ranked["version"] != version or ranked["key"] != key:
+        cursor = cursor_token(query, where_clause, version)
+        ranked = query_cache.get(cursor)
+
+    needed = INITIAL_RESULTS * page
+    if ranked is None or (needed > len(ranked["ids"]) and not ranked["exhausted"]):
+        depth = ranked["depth"] * 2 if ranked else CURSOR_DEPTH
+        while depth < needed:
+            depth *= 2
+        ids = rank_ids(query, where_clause, depth)
+        ranked = {"ids": ids, "depth": depth, "exhausted": len(ids) < depth, "version": version, "key": key}
+        query_cache.set(cursor, ranked)
+    return cursor, ranked
+
 
 def parse_filters_from_query(query: str) -> dict:
     """Extract city, bedrooms, and intent filters from query text."""
@@ -361,6 +483,54 @@ def parse_filters_from_query(query: str) -> dict:
     return filters
 
 
+# Entity locations that are cities, not localities
+CITY_LOCATIONS = {"mumbai", "bangalore", "bengaluru"}
+
+# Numeric constraints pushed into the query, dropped again when nothing matches them
+NUMERIC_CONSTRAINTS = ("budget_min", "budget_max", "area_min", "area_max")
+
+
+def constraint_filters(entities: dict, filters: dict) -> dict:
+    """
+    Budget, area and locality constraints from the extracted entities.
+    A locality matches every stored location containing it ("andheri" ->
+    "andheri east", "andheri west"); localities with no stored listings are
+    dropped rather than filtering everything out. In a rent query the
+    budget is a monthly rent, not a price, so it is not turned into one.
+    """
+    constraints = {
+        key: entities[key] for key in NUMERIC_CONSTRAINTS
+        if entities.get(key) is not None and not (key.startswith("budget") and filters.get("prefer_rent"))
+    }
+    names = [loc for loc in entities.get("locations", []) if loc not in CITY_LOCATIONS]
+    if names:
+        stored = corpus_stats.get()["localities"]
+        cities = [filters["city"]] if "city" in filters else filters.get("cities", list(stored))
+        matches = sorted({
+            location for city in cities for location in stored.get(city, [])
+            if any(name in location.lower() for name in names)
+        })
+        if matches:
+            constraints["localities"] = matches
+    return constraints
+
+
+def relaxed_note(filters: dict, relaxed: list) -> str:
+    """The line put before an answer whose budget / area bounds were dropped because nothing met them."""
+    limits = []
+    for name, unit in (("budget", "lakhs"), ("area", "sqft")):
+        low = filters[f"{name}_min"] if f"{name}_min" in relaxed else None
+        high = filters[f"{name}_max"] if f"{name}_max" in relaxed else None
+        if low is not None and high is not None:
+            limits.append(f"{name} of {low:g}-{high:g} {unit}")
+        elif high is not None:
+            limits.append(f"{name} of under {high:g} {unit}")
+        elif low is not None:
+            limits.append(f"{name} of over {low:g} {unit}")
+    dropped = "those limits" if len(limits) > 1 else "that limit"
+    return f"⚠️ *No properties match your {' and '.join(limits)}, so these results are shown without {dropped}.*\n\n"
+
+
 def build_chroma_where_clause(filters: dict) -> dict:
     """Build ChromaDB where clause from parsed filters."""
     conditions = []
@@ -374,6 +544,16 @@ def build_chroma_where_clause(filters: dict) -> dict:
     
     if "bedrooms" in filters:
         conditions.append({"bedrooms": {"$eq": filters["bedrooms"]}})
+
+    # Budget / area / locality constraints narrow the candidates before scoring
+    if "localities" in filters:
+        conditions.append({"location": {"$in": filters["localities"]}})
+    for key, field, op in (
+        ("budget_min", "price_lakhs", "$gte"), ("budget_max", "price_lakhs", "$lte"),
+        ("area_min", "area_sqft", "$gte"), ("area_max", "area_sqft", "$lte"),
+    ):
+        if key in filters:
+            conditions.append({field: {op: float(filters[key])}})
     
     if len(conditions) == 0:
         return None
@@ -447,37 +627,20 @@ def ask(request: QueryRequest):
             "available_cities": ["Mumbai", "Bangalore"]
         }
     
+    parsed_filters.update(constraint_filters(entities, parsed_filters))
     where_clause = build_chroma_where_clause(parsed_filters)
     
-    # Query is specific enough - run retrieval with filters
-    n_results = INITIAL_RESULTS if page == 1 else INITIAL_RESULTS * page
-    
-    # Use metadata filtering if we have specific filters
-    try:
-        if where_clause:
-            results = collection.query(
-                query_texts=[query],
-                n_results=n_results,
-                where=where_clause
-            )
-        else:
-            results = collection.query(
-                query_texts=[query],
-                n_results=n_results
-            )
-    except Exception as e:
-        # Fallback to unfiltered query if filter fails
-        print(f"Filter query failed: {e}, falling back to unfiltered")
-        results = collection.query(
-            query_texts=[query],
-            n_results=n_results
-        )
-
-    # Extract contexts and metadatas
-    all_contexts = results['documents'][0] if results['documents'] and results['documents'][0] else []
-    all_metadatas = results['metadatas'][0] if results.get('metadatas') and results['metadatas'][0] else []
-
-    if not all_contexts:
+    # Query is specific enough - rank once, then serve every page from the cursor
+    cursor, ranked = ranked_ids(query, where_clause, page, request.cursor)
+    relaxed = []
+    if not ranked["ids"] and any(key in parsed_filters for key in NUMERIC_CONSTRAINTS):
+        # Budget / area bounds nothing meets are dropped, and the answer says so
+        relaxed = [key for key in NUMERIC_CONSTRAINTS if key in parsed_filters]
+        unbounded = {key: value for key, value in parsed_filters.items() if key not in NUMERIC_CONSTRAINTS}
+        where_clause = build_chroma_where_clause(unbounded)
+        cursor, ranked = ranked_ids(query, where_clause, page, request.cursor)
+
+    if not ranked["ids"]:
         return {
             "intent": intent,
             "answer": "I couldn't find any properties matching your query. Try specifying a city like Mumbai or Bangalore with a property type (1-5 BHK).",
@@ -485,19 +648,19 @@ def ask(request: QueryRequest):
             "properties": []
         }
 
-    total_in_db = collection.count()
-    results_shown = len(all_contexts)
-    
-    # For pagination, get the contexts for current "page"
-    if page > 1:
-        start_idx = INITIAL_RESULTS * (page - 1)
-        page_contexts = all_contexts[start_idx:start_idx + INITIAL_RESULTS]
-        page_metadatas = all_metadatas[start_idx:start_idx + INITIAL_RESULTS]
-    else:
-        page_contexts = all_contexts[:INITIAL_RESULTS]
-        page_metadatas = all_metadatas[:INITIAL_RESULTS]
-    
-    has_more = results_shown < total_in_db
+    total_in_db = corpus_stats.get()["count"]
+    results_shown = min(INITIAL_RESULTS * page, len(ranked["ids"]))
+
+    # Look up only the current page, in rank order, in the property store
+    store = current_properties()
+    page_contexts, page_metadatas = [], []
+    for doc_id in ranked["ids"][INITIAL_RESULTS * (page - 1):results_shown]:
+        found = store.get(doc_id)
+        if found is not None:
+            page_contexts.append(found[0])
+            page_metadatas.append(found[1])
+
+    has_more = results_shown < total_in_db and not (ranked["exhausted"] and results_shown >= len(ranked["ids"]))
 
     # Build structured property cards from metadata
     properties = []
@@ -527,6 +690,8 @@ def ask(request: QueryRequest):
 
     # Generate a brief summary instead of detailed text
     answer = generate_answer(query, page_contexts, intent, page, has_more, total_in_db)
+    if relaxed:
+        answer = relaxed_note(parsed_filters, relaxed) + answer
     
     return {
         "intent": intent,
@@ -535,10 +700,18 @@ def ask(request: QueryRequest):
         "total_results": total_in_db,
         "page": page,
         "results_shown": results_shown,
-        "has_more": has_more
+        "has_more": has_more,
+        "cursor": cursor,
+        "relaxed": relaxed
     }
 
 
+@app.get("/cache_stats")
+def cache_stats():
+    """Hit rate and size of the /ask result cache, for this worker (and the shared sqlite tier)."""
+    return {"index_version": index_version.current(), "query_cache": query_cache.stats()}
+
+
 @app.post("/explain")
 def explain_property(request: ExplainRequest):
     """
@@ -548,21 +721,17 @@ def explain_property(request: ExplainRequest):
     source_row = request.source_row
     
     try:
-        # Retrieve the property by source_row from ChromaDB
-        result = collection.get(
-            ids=[str(source_row)],
-            include=["documents", "metadatas"]
-        )
+        # Look up the property by source_row in the property store
+        found = current_properties().get(source_row)
         
-        if not result["ids"]:
+        if found is None:
             return {
                 "success": False,
                 "error": "Property not found"
             }
         
         # Extract property data
-        document = result["documents"][0]
-        metadata = result["metadatas"][0]
+        document, metadata = found
         
         # Build property info dict for explanation
         property_info = {
@@ -608,20 +777,17 @@ def flip_property(request: ExplainRequest):
     source_row = request.source_row
     
     try:
-        # Retrieve the property by source_row from ChromaDB
-        result = collection.get(
-            ids=[str(source_row)],
-            include=["documents", "metadatas"]
-        )
+        # Look up the property by source_row in the property store
+        found = current_properties().get(source_row)
         
-        if not result["ids"]:
+        if found is None:
             return {
                 "success": False,
                 "error": "Property not found"
             }
         
         # Extract property data
-        metadata = result["metadatas"][0]
+        _, metadata = found
         
         # Build property info dict for flip explanation
         property_info = {
@@ -653,3 +819,64 @@ def flip_property(request: ExplainRequest):
             "success": False,
             "error": str(e)
         }
+
+
+@app.post("/analyze")
+def analyze_properties(request: AnalyzeRequest):
+    """
+    Recompute buy vs rent and the flip thresholds on the fly with custom
+    assumptions, for one property (source_row) or every property matching a
+    city / bedrooms / locality filter. The whole selection is evaluated in one
+    vectorized pass.
+    """
+    start = time.perf_counter()
+
+    if request.source_row is None and not (request.city or request.bedrooms is not None or request.locality):
+        return {
+            "success": False,
+            "error": "Provide a source_row or at least one of city, bedrooms, locality"
+        }
+
+    selected = live_analysis.select_listings(
+        current_listings(),
+        source_row=request.source_row,
+        city=request.city,
+        bedrooms=request.bedrooms,
+        locality=request.locality,
+    )
+    if selected.empty:
+        return {
+            "success": False,
+            "error": "Property not found" if request.source_row is not None else "No properties match the filter"
+        }
+
+    interest_rate = request.interest_rate or DEFAULT_INTEREST_RATE
+    result = live_analysis.analyze(
+        selected,
+        interest_rate=interest_rate,
+        down_payment_rate=request.down_payment_rate,
+        loan_years=request.loan_years,
+        tax_slab=request.tax_slab,
+        appreciation=request.appreciation,
+        invest_return=request.invest_return,
+    )
+
+    response = {
+        "success": True,
+        "assumptions": {
+            "down_payment_rate": request.down_payment_rate,
+            "interest_rate": round(interest_rate, 2),
+            "loan_years": request.loan_years,
+            "tax_slab": request.tax_slab,
+            "appreciation": request.appreciation,
+            "invest_return": request.invest_return,
+        },
+    }
+    if request.source_row is not None:
+        response["property"] = live_analysis.to_records(result)[0]
+    else:
+        response["summary"] = live_analysis.summarize(result)
+        response["properties"] = live_analysis.to_records(result, limit=request.limit)
+
+    response["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 2)
+    return response
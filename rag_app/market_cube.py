@@ -0,0 +1,340 @@
+"""
+Precomputed aggregate cube for /market_snapshot.
+
+Every snapshot output is decomposable over city x BHK x locality x price
+bucket x area bucket, so ingest builds one cell per occupied combination
+holding:
+
+- the row count and the buy / rent decision counts,
+- the sum and count of plausible break-even years (for the mean),
+- a mergeable quantile sketch of price per sqft (for the median): counts
+  over logarithmic bins, so any value is within SKETCH_ACCURACY of its
+  bin's representative and merging cells is adding their counts.
+
+A snapshot request selects cells on the categorical dimensions and on the
+price / area buckets. Cells whose bucket lies wholly inside the requested
+ranges are merged as they are. Only the rows of the few cells a range
+boundary cuts through are checked individually, from row-level arrays
+stored sorted by cell. Counts and break-even means come out exact; the
+median is the sketch's, within SKETCH_ACCURACY of the exact one.
+
+The cube is written next to the sparse index as an uncompressed .npz:
+
+    python market_cube.py            # rebuild from the collection
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+
+CUBE_PATH = Path(__file__).resolve().parent / "market_cube.npz"
+
+PRICE_BUCKET_LAKHS = 25.0
+AREA_BUCKET_SQFT = 100.0
+SKETCH_ACCURACY = 0.005  # relative error of the price-per-sqft median
+
+# Bucket of a missing / non-numeric value; never selected once that dimension is filtered
+NAN_BUCKET = np.iinfo(np.int64).min
+
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+
+
+def _buckets(values, width):
+    buckets = np.full(len(values), NAN_BUCKET, dtype=np.int64)
+    present = ~np.isnan(values)
+    buckets[present] = np.floor(values[present] / width)
+    return buckets
+
+
+def _sketch_bins(values):
+    """Logarithmic sketch bin of each positive value (-1 for NaN)."""
+    bins = np.full(len(values), -1, dtype=np.int64)
+    present = ~np.isnan(values)
+    bins[present] = np.ceil(np.log(np.maximum(values[present], 1e-9)) / np.log(_GAMMA))
+    return bins
+
+
+def _bin_value(index):
+    """Representative value of a sketch bin: within SKETCH_ACCURACY of everything in it."""
+    return 2 * _GAMMA ** index / (_GAMMA + 1)
+
+
+def _ranges_inside(buckets, width, low, high):
+    """(overlapping, wholly inside) masks of buckets against the inclusive range [low, high]."""
+    low = -np.inf if low is None else low
+    high = np.inf if high is None else high
+    present = buckets != NAN_BUCKET
+    start = buckets * width
+    end = (buckets + 1) * width
+    # A value just below start can round into the bucket, so only strictly-inside starts count as whole
+    overlapping = present & (end > low) & (start <= high)
+    inside = overlapping & (start > low) & (end <= high)
+    return overlapping, inside
+
+
+class MarketCube:
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.meta = json.loads(str(arrays["meta"]))
+        self.cities = self.meta["cities"]
+        self._locality_codes = {name: code for code, name in enumerate(arrays["localities"].tolist())}
+        self._city_codes = {name: code for code, name in enumerate(self.cities)}
+
+    @property
+    def version(self):
+        return self.meta.get("version")
+
+    @classmethod
+    def build(cls, store, cities, version=None):
+        """The cube of a PropertyStore's rows in the given cities."""
+        rows = np.flatnonzero(np.isin(store.city, cities))
+        city_codes = {name: code for code, name in enumerate(cities)}
+        localities, locality = np.unique(store.location[rows], return_inverse=True)
+        return cls.from_columns(
+            cities, localities, version,
+            city=np.array([city_codes[c] for c in store.city[rows].tolist()], dtype=np.int64),
+            locality=locality.ravel().astype(np.int64),
+            bhk=store.bhk[rows],
+            price=store.price_lakhs[rows],
+            area=store.area_sqft[rows],
+            rent=store.rent[rows],
+            buy=np.char.startswith(store.decision[rows], "buy"),
+            rents=np.char.startswith(store.decision[rows], "rent"),
+        )
+
+    @classmethod
+    def from_columns(cls, cities, localities, version, city, locality, bhk, price, area, rent, buy, rents):
+        """
+        The cube of rows given column by column: city and locality as codes
+        into cities and (sorted) localities, buy / rents as the decision flags.
+        """
+        dims = np.stack([
+            city,
+            np.where(np.isnan(bhk), NAN_BUCKET, np.nan_to_num(bhk)).astype(np.int64),
+            locality,
+            _buckets(price, PRICE_BUCKET_LAKHS),
+            _buckets(area, AREA_BUCKET_SQFT),
+        ], axis=1)
+        cells, cell = np.unique(dims, axis=0, return_inverse=True)
+        cell = cell.ravel()
+
+        # Row measures, with the same conditions PropertyStore.snapshot() applies
+        with np.errstate(divide="ignore", invalid="ignore"):
+            priced = (price != 0) & ~np.isnan(price) & (area > 0)
+            price_per_sqft = np.where(priced, price * 100000 / area, np.nan)
+            break_even = price * 100000 / (rent * 12)
+            plausible = (price != 0) & (rent > 0) & (break_even > 1) & (break_even < 50)
+        break_even = np.where(plausible, break_even, np.nan)
+        sketch_bin = _sketch_bins(price_per_sqft)
+
+        # Row-level arrays sorted by cell, for the cells a range boundary cuts through
+        order = np.argsort(cell, kind="stable")
+        n_cells = len(cells)
+        counts = np.bincount(cell, minlength=n_cells)
+
+        sketched = sketch_bin >= 0
+        pairs, pair_counts = np.unique(np.stack([cell[sketched], sketch_bin[sketched]], axis=1), axis=0, return_counts=True)
+
+        arrays = {
+            "meta": np.array(json.dumps({
+                "cities": list(cities), "version": version,
+                "price_bucket": PRICE_BUCKET_LAKHS, "area_bucket": AREA_BUCKET_SQFT,
+                "sketch_accuracy": SKETCH_ACCURACY,
+            })),
+            "localities": localities.astype(str),
+            "cell_city": cells[:, 0], "cell_bhk": cells[:, 1], "cell_locality": cells[:, 2],
+            "cell_price": cells[:, 3], "cell_area": cells[:, 4],
+            "cell_count": counts,
+            "cell_start": np.concatenate([[0], np.cumsum(counts)]),
+            "cell_buy": np.bincount(cell, weights=buy, minlength=n_cells).astype(np.int64),
+            "cell_rent": np.bincount(cell, weights=rents, minlength=n_cells).astype(np.int64),
+            "cell_break_even_sum": np.bincount(cell, weights=np.nan_to_num(break_even), minlength=n_cells),
+            "cell_break_even_count": np.bincount(cell, weights=plausible, minlength=n_cells).astype(np.int64),
+            "sketch_cell": pairs[:, 0] if len(pairs) else np.empty(0, dtype=np.int64),
+            "sketch_bin": pairs[:, 1] if len(pairs) else np.empty(0, dtype=np.int64),
+            "sketch_count": pair_counts,
+            "row_price": price[order], "row_area": area[order],
+            "row_buy": buy[order], "row_rent": rents[order],
+            "row_break_even": break_even[order], "row_sketch_bin": sketch_bin[order],
+        }
+        return cls(arrays)
+
+    def save(self, path=CUBE_PATH):
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **self.arrays)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, path=CUBE_PATH):
+        with np.load(path) as data:
+            return cls({key: data[key] for key in data.files})
+
+    def snapshot(self, bhk=None, min_price=None, max_price=None, min_area=None, max_area=None, localities=None):
+        """
+        (total rows, buy / rent distribution, median price per sqft, mean
+        break-even year) for the filters, in the shape /market_snapshot returns.
+        """
+        a = self.arrays
+        n_cities = len(self.cities)
+        selected = np.ones(len(a["cell_count"]), dtype=bool)
+        if bhk:
+            selected &= np.isin(a["cell_bhk"], bhk)
+        if localities:
+            selected &= np.isin(a["cell_locality"], [self._locality_codes[l] for l in localities if l in self._locality_codes])
+        whole = selected.copy()
+        for buckets, width, low, high in (
+            (a["cell_price"], self.meta["price_bucket"], min_price, max_price),
+            (a["cell_area"], self.meta["area_bucket"], min_area, max_area),
+        ):
+            if low is None and high is None:
+                continue
+            overlapping, inside = _ranges_inside(buckets, width, low, high)
+            selected &= overlapping
+            whole &= inside
+        cut = selected & ~whole
+
+        # Whole cells: merge their aggregates per city
+        city = a["cell_city"][whole]
+        total, buys, rents, be_sum, be_count = (
+            np.bincount(city, weights=a[key][whole], minlength=n_cities)
+            for key in ("cell_count", "cell_buy", "cell_rent", "cell_break_even_sum", "cell_break_even_count")
+        )
+        in_sketch = whole[a["sketch_cell"]]
+        sketch_city = a["cell_city"][a["sketch_cell"][in_sketch]]
+        sketch_bins = [a["sketch_bin"][in_sketch]]
+        sketch_cities = [sketch_city]
+        sketch_counts = [a["sketch_count"][in_sketch]]
+
+        # Cells a range boundary cuts through: check their rows against the exact bounds
+        cut_cells = np.flatnonzero(cut)
+        if len(cut_cells):
+            starts, ends = a["cell_start"][cut_cells], a["cell_start"][cut_cells + 1]
+            rows = np.concatenate([np.arange(s, e) for s, e in zip(starts.tolist(), ends.tolist())])
+            row_city = np.repeat(a["cell_city"][cut_cells], ends - starts)
+            keep = np.ones(len(rows), dtype=bool)
+            for column, low, high in ((a["row_price"], min_price, max_price), (a["row_area"], min_area, max_area)):
+                if low is not None:
+                    keep &= column[rows] >= low
+                if high is not None:
+                    keep &= column[rows] <= high
+            rows, row_city = rows[keep], row_city[keep]
+            total += np.bincount(row_city, minlength=n_cities)
+            buys += np.bincount(row_city, weights=a["row_buy"][rows], minlength=n_cities)
+            rents += np.bincount(row_city, weights=a["row_rent"][rows], minlength=n_cities)
+            break_even = a["row_break_even"][rows]
+            plausible = ~np.isnan(break_even)
+            be_sum += np.bincount(row_city[plausible], weights=break_even[plausible], minlength=n_cities)
+            be_count += np.bincount(row_city[plausible], minlength=n_cities)
+            sketched = a["row_sketch_bin"][rows] >= 0
+            sketch_bins.append(a["row_sketch_bin"][rows][sketched])
+            sketch_cities.append(row_city[sketched])
+            sketch_counts.append(np.ones(np.count_nonzero(sketched), dtype=np.int64))
+
+        sketch_bins = np.concatenate(sketch_bins)
+        sketch_cities = np.concatenate(sketch_cities)
+        sketch_counts = np.concatenate(sketch_counts)
+
+        buy_rent_dist, median_price_sqft, avg_break_even = {}, {}, {}
+        for code, name in enumerate(self.cities):
+            buy_count, rent_count = int(buys[code]), int(rents[code])
+            decided = buy_count + rent_count
+            buy_pct = round(100 * buy_count / decided, 1) if decided else 0
+            rent_pct = round(100 * rent_count / decided, 1) if decided else 0
+            buy_rent_dist[name] = {"buy": buy_pct, "rent": rent_pct, "buy_count": buy_count,
+                                   "rent_count": rent_count, "total": decided}
+
+            mine = sketch_cities == code
+            median_price_sqft[name] = round(_sketch_median(sketch_bins[mine], sketch_counts[mine]), 0)
+            avg_break_even[name] = round(float(be_sum[code] / be_count[code]), 1) if be_count[code] else 0
+
+        return int(total.sum()), buy_rent_dist, median_price_sqft, avg_break_even
+
+
+class MarketCubeBuilder:
+    """
+    Collects what MarketCube.build() reads from a PropertyStore one chunk
+    of rows at a time, keeping only codes and numbers per row, for ingests
+    that never hold the documents and metadata of the whole corpus.
+    build() gives the same cube as MarketCube.build() over all the rows.
+    """
+
+    COLUMNS = {"city": np.int64, "locality": np.int64, "bhk": np.float64, "price": np.float64,
+               "area": np.float64, "rent": np.float64, "buy": bool, "rents": bool}
+
+    def __init__(self, cities):
+        self.cities = list(cities)
+        self._city_codes = {name: code for code, name in enumerate(self.cities)}
+        self._locality_codes = {}
+        self._columns = {key: [np.empty(0, dtype=dtype)] for key, dtype in self.COLUMNS.items()}
+
+    def add(self, store):
+        rows = np.flatnonzero(np.isin(store.city, self.cities))
+        names, locality = np.unique(store.location[rows], return_inverse=True)
+        codes = np.array(
+            [self._locality_codes.setdefault(name, len(self._locality_codes)) for name in names.tolist()],
+            dtype=np.int64,
+        )
+        decision = store.decision[rows]
+        chunk = {
+            "city": np.array([self._city_codes[c] for c in store.city[rows].tolist()], dtype=np.int64),
+            "locality": codes[locality.ravel()],
+            "bhk": store.bhk[rows],
+            "price": store.price_lakhs[rows],
+            "area": store.area_sqft[rows],
+            "rent": store.rent[rows],
+            "buy": np.char.startswith(decision, "buy"),
+            "rents": np.char.startswith(decision, "rent"),
+        }
+        for key, values in chunk.items():
+            self._columns[key].append(values)
+
+    def build(self, version=None):
+        columns = {key: np.concatenate(parts) for key, parts in self._columns.items()}
+        # Renumber localities in sorted order, as np.unique does in MarketCube.build()
+        names = np.array(list(self._locality_codes), dtype=str)
+        order = np.argsort(names, kind="stable")
+        renumber = np.empty(len(order), dtype=np.int64)
+        renumber[order] = np.arange(len(order))
+        columns["locality"] = renumber[columns["locality"]]
+        return MarketCube.from_columns(self.cities, names[order], version, **columns)
+
+
+def _sketch_median(bins, counts):
+    """Median of a merged sketch, averaging the two middle values like statistics.median (0 when empty)."""
+    n = int(counts.sum())
+    if not n:
+        return 0
+    order = np.argsort(bins, kind="stable")
+    bins, cumulative = bins[order], np.cumsum(counts[order])
+    lower, upper = (bins[np.searchsorted(cumulative, rank, side="right")] for rank in ((n - 1) // 2, n // 2))
+    return float((_bin_value(lower) + _bin_value(upper)) / 2)
+
+
+def main():
+    import chromadb
+
+    from corpus_stats import MARKET_CITIES
+    from index_version import IndexVersion
+    from ingest import CHROMA_DB_DIR, COLLECTION_NAME, VECTORIZER_PATH
+    from property_store import PropertyStore
+    from tfidf_embedding import TfidfEmbeddingFunction
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=CUBE_PATH, help="Where to write the cube")
+    args = parser.parse_args()
+
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    collection = chromadb.PersistentClient(path=str(CHROMA_DB_DIR)).get_collection(
+        name=COLLECTION_NAME, embedding_function=ef
+    )
+    cube = MarketCube.build(PropertyStore.load(collection), MARKET_CITIES, version=IndexVersion().current())
+    cube.save(args.output)
+    print(f"🧊 Market cube with {len(cube.arrays['cell_count'])} cells written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
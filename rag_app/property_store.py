@@ -0,0 +1,124 @@
+"""
+In-memory columnar copy of the ingested properties for the API.
+
+The market endpoints used to pull every metadata dict out of the store on
+each request and filter / aggregate them in Python loops; /explain, /flip
+and the /ask page fetch made a store round trip per id. PropertyStore reads
+the collection once into typed NumPy columns, so filters are vectorized
+masks, the snapshot aggregates are array reductions, and a lookup by id is
+a dict hit. main.py builds a new store after a re-ingest and swaps it in
+by replacing one reference; requests keep using the store they started with.
+
+Numeric columns follow the old per-record conversions: a missing field
+reads as 0 and a value that is not a number as NaN, which no filter matches.
+"""
+
+import numpy as np
+
+# The snapshot only counts break-even years in this open range as plausible
+BREAK_EVEN_YEARS = (1, 50)
+
+
+def _float_column(metadatas, key, default=0):
+    values = np.empty(len(metadatas), dtype=np.float64)
+    for i, meta in enumerate(metadatas):
+        try:
+            values[i] = float(meta.get(key, default))
+        except (TypeError, ValueError):
+            values[i] = np.nan
+    return values
+
+
+def _rent_column(metadatas):
+    """Actual rent where the listing has one, else the estimate; NaN when neither is usable."""
+    values = np.full(len(metadatas), np.nan)
+    for i, meta in enumerate(metadatas):
+        rent = meta.get("monthly_rent") or meta.get("estimated_monthly_rent")
+        if rent:
+            try:
+                values[i] = float(rent)
+            except (TypeError, ValueError):
+                pass
+    return values
+
+
+class PropertyStore:
+    def __init__(self, ids, documents, metadatas):
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self._positions = {doc_id: row for row, doc_id in enumerate(ids)}
+
+        self.city = np.array([str(meta.get("city", "")).capitalize() for meta in metadatas])
+        self.location = np.array([meta.get("location", "") for meta in metadatas])
+        self.decision = np.array([str(meta.get("decision", "")).lower() for meta in metadatas])
+        # Whole BHK count, as int(float(bedrooms)) would give
+        self.bhk = np.trunc(_float_column(metadatas, "bedrooms"))
+        self.price_lakhs = _float_column(metadatas, "price_lakhs")
+        self.area_sqft = _float_column(metadatas, "area_sqft")
+        self.rent = _rent_column(metadatas)
+
+    @classmethod
+    def load(cls, collection):
+        """Read every document and its metadata out of a collection (or SparseIndex)."""
+        result = collection.get(include=["documents", "metadatas"])
+        return cls(result["ids"], result.get("documents") or [], result.get("metadatas") or [])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get(self, doc_id):
+        """(document, metadata) for an id, or None."""
+        row = self._positions.get(str(doc_id))
+        if row is None:
+            return None
+        return self.documents[row], self.metadatas[row]
+
+    def mask(self, cities=None, bhk=None, min_price=None, max_price=None, min_area=None, max_area=None,
+             localities=None):
+        """Rows matching every given filter; ranges are inclusive and NaN never matches."""
+        mask = np.ones(len(self), dtype=bool)
+        if cities is not None:
+            mask &= np.isin(self.city, cities)
+        if bhk:
+            mask &= np.isin(self.bhk, bhk)
+        for column, low, high in ((self.price_lakhs, min_price, max_price), (self.area_sqft, min_area, max_area)):
+            if low is None and high is None:
+                continue
+            mask &= ~np.isnan(column)
+            if low is not None:
+                mask &= column >= low
+            if high is not None:
+                mask &= column <= high
+        if localities:
+            mask &= np.isin(self.location, localities)
+        return mask
+
+    def snapshot(self, mask, cities):
+        """Buy / rent split, median price per sqft and mean break-even year per city over the masked rows."""
+        buy = np.char.startswith(self.decision, "buy")
+        rent = np.char.startswith(self.decision, "rent")
+        priced = (self.price_lakhs != 0) & ~np.isnan(self.price_lakhs) & (self.area_sqft > 0)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            price_per_sqft = self.price_lakhs * 100000 / self.area_sqft
+            break_even = self.price_lakhs * 100000 / (self.rent * 12)
+        low, high = BREAK_EVEN_YEARS
+        plausible = (self.price_lakhs != 0) & (self.rent > 0) & (break_even > low) & (break_even < high)
+
+        buy_rent_dist, median_price_sqft, avg_break_even = {}, {}, {}
+        for city in cities:
+            rows = mask & (self.city == city)
+            buy_count = int(np.count_nonzero(rows & buy))
+            rent_count = int(np.count_nonzero(rows & rent))
+            total = buy_count + rent_count
+            buy_pct = round(100 * buy_count / total, 1) if total else 0
+            rent_pct = round(100 * rent_count / total, 1) if total else 0
+            buy_rent_dist[city] = {"buy": buy_pct, "rent": rent_pct, "buy_count": buy_count,
+                                   "rent_count": rent_count, "total": total}
+
+            prices = price_per_sqft[rows & priced]
+            median_price_sqft[city] = round(float(np.median(prices)), 0) if len(prices) else 0
+            years = break_even[rows & plausible]
+            avg_break_even[city] = round(float(np.mean(years)), 1) if len(years) else 0
+
+        return buy_rent_dist, median_price_sqft, avg_break_even
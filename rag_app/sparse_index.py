@@ -0,0 +1,327 @@
+"""
+In-process sparse TF-IDF retrieval, an alternative to the Chroma collection.
+
+ingest.py writes the document-term matrix of the whole corpus as CSR arrays
+to an uncompressed .npz, together with the squared norm of every row, the
+ids, documents and one array per metadata field. A query is a single sparse
+matrix-vector product and Chroma `where` filters run as boolean masks over
+the metadata arrays. query(), get() and count() return the same shapes as
+the collection methods main.py calls, so either backend can serve the API.
+
+Distances are squared L2, like Chroma's default space: with the row norms
+precomputed, |d - q|^2 = |d|^2 + |q|^2 - 2 d.q needs only the dot products.
+"""
+
+import itertools
+import shutil
+import struct
+import tempfile
+import zipfile
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+META_PREFIX = "meta:"
+
+# Size of the fixed part of a zip local file header
+_LOCAL_HEADER_SIZE = 30
+
+_RANGE_OPERATORS = {
+    "$gt": np.greater,
+    "$gte": np.greater_equal,
+    "$lt": np.less,
+    "$lte": np.less_equal,
+}
+
+
+def _metadata_column(values):
+    """Strings as a fixed-width unicode array, everything else as numbers (int64 stays int64)."""
+    if all(isinstance(v, str) for v in values):
+        return np.array(values, dtype=str)
+    column = np.asarray(values)
+    return column if column.dtype.kind in "iuf" else column.astype(np.float64)
+
+
+def write_sparse_index(path, matrix, ids, documents, metadatas):
+    """
+    Store a transform() matrix with its documents and metadata as an index
+    load() can memory-map. Written to a temp file first, then moved into place.
+    """
+    path = Path(path)
+    matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+    matrix.sum_duplicates()
+
+    arrays = {
+        "data": matrix.data,
+        "indices": matrix.indices,
+        "indptr": matrix.indptr,
+        "shape": np.array(matrix.shape, dtype=np.int64),
+        "sq_norms": np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32).ravel(),
+        "ids": np.array(ids, dtype=str),
+        "documents": np.array(documents, dtype=str),
+    }
+    for key in (metadatas[0] if metadatas else {}):
+        arrays[META_PREFIX + key] = _metadata_column([meta.get(key) for meta in metadatas])
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+    tmp_path.replace(path)
+
+
+def _column_dtype(dtypes):
+    """One dtype for a column written in chunks: the widest string, else the common numeric type."""
+    if all(dtype.kind == "U" for dtype in dtypes):
+        return max(dtypes, key=lambda dtype: dtype.itemsize)
+    return np.result_type(*dtypes)
+
+
+def _write_npy_member(archive, name, dtype, length, parts):
+    """Stream 1-D array parts into archive as one uncompressed name.npy member, as np.savez lays it out."""
+    header = {"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": (length,)}
+    with archive.open(name + ".npy", "w", force_zip64=True) as member:
+        np.lib.format.write_array_header_1_0(member, header)
+        for part in parts:
+            member.write(np.ascontiguousarray(part, dtype=dtype).tobytes())
+
+
+class SparseIndexWriter:
+    """
+    write_sparse_index() for a corpus that arrives in chunks. add() spills
+    each chunk's arrays to a temporary file next to path; close() streams
+    them into the index member by member, so no more than one chunk is in
+    memory at a time. The result loads exactly like write_sparse_index()'s.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._spill_dir = Path(tempfile.mkdtemp(prefix=self.path.name + ".", dir=self.path.parent))
+        self._chunks = []
+        self._dtypes = {}
+        self._keys = None
+        self.rows = 0
+        self._nnz = 0
+        self._n_features = 0
+
+    def add(self, matrix, ids, documents, metadatas):
+        matrix = sparse.csr_matrix(matrix, dtype=np.float32)
+        matrix.sum_duplicates()
+        if self._keys is None:
+            self._keys = list(metadatas[0]) if metadatas else []
+
+        arrays = {
+            "data": matrix.data,
+            "indices": matrix.indices,
+            "indptr": matrix.indptr[1:],  # Row ends; shifted by the rows before this chunk on close()
+            "sq_norms": np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=np.float32).ravel(),
+            "ids": np.array(ids, dtype=str),
+            "documents": np.array(documents, dtype=str),
+        }
+        for key in self._keys:
+            arrays[META_PREFIX + key] = _metadata_column([meta.get(key) for meta in metadatas])
+
+        spill_path = self._spill_dir / f"{len(self._chunks):06d}.npz"
+        with open(spill_path, "wb") as f:
+            np.savez(f, **arrays)
+        self._chunks.append((spill_path, self._nnz))
+        for name, values in arrays.items():
+            self._dtypes.setdefault(name, []).append(values.dtype)
+        self.rows += matrix.shape[0]
+        self._nnz += matrix.nnz
+        self._n_features = matrix.shape[1]
+
+    def _parts(self, name):
+        for spill_path, nnz_before in self._chunks:
+            with np.load(spill_path) as chunk:
+                values = chunk[name]
+            yield values.astype(np.int64) + nnz_before if name == "indptr" else values
+
+    def close(self):
+        """Write the index (to a temp file first, then moved into place) and remove the spilled chunks."""
+        index_dtype = np.result_type(*self._dtypes.get("indptr", []), *self._dtypes.get("indices", []), np.int32)
+        if self._nnz > np.iinfo(np.int32).max:
+            index_dtype = np.dtype(np.int64)
+        shape = np.array([self.rows, self._n_features], dtype=np.int64)
+
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        try:
+            with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED, allowZip64=True) as archive:
+                _write_npy_member(archive, "data", np.dtype(np.float32), self._nnz, self._parts("data"))
+                _write_npy_member(archive, "indices", index_dtype, self._nnz, self._parts("indices"))
+                _write_npy_member(archive, "indptr", index_dtype, self.rows + 1,
+                                  itertools.chain([np.zeros(1, dtype=index_dtype)], self._parts("indptr")))
+                _write_npy_member(archive, "shape", shape.dtype, len(shape), [shape])
+                for name in ["sq_norms", "ids", "documents", *(META_PREFIX + key for key in self._keys or [])]:
+                    _write_npy_member(archive, name, _column_dtype(self._dtypes[name]), self.rows, self._parts(name))
+            tmp_path.replace(self.path)
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Remove the spilled chunks without writing the index."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        if tmp_path.exists():
+            tmp_path.unlink()
+        shutil.rmtree(self._spill_dir, ignore_errors=True)
+
+
+def _mmap_npz(path):
+    """
+    Memory-map every array of an uncompressed .npz (np.savez output). Members
+    that are compressed, or that can't be mapped, are read into memory instead.
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as archive, open(path, "rb") as f:
+        for info in archive.infolist():
+            name = info.filename[:-len(".npy")]
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member)
+                continue
+
+            # The member's data follows its local header, whose name / extra lengths can differ from the central directory
+            f.seek(info.header_offset)
+            local_header = f.read(_LOCAL_HEADER_SIZE)
+            name_length, extra_length = struct.unpack("<HH", local_header[26:30])
+            f.seek(info.header_offset + _LOCAL_HEADER_SIZE + name_length + extra_length)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if dtype.hasobject or int(np.prod(shape)) == 0:
+                arrays[name] = np.load(path)[name]
+            else:
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=f.tell(), shape=shape,
+                                         order="F" if fortran_order else "C")
+    return arrays
+
+
+class SparseIndex:
+    """The whole corpus as a CSR matrix plus metadata columns, queried in process."""
+
+    def __init__(self, arrays, embedding_function):
+        self.embedding_function = embedding_function
+        self.matrix = sparse.csr_matrix(
+            (arrays["data"], arrays["indices"], arrays["indptr"]),
+            shape=tuple(int(n) for n in arrays["shape"]),
+            copy=False,
+        )
+        self.sq_norms = arrays["sq_norms"]
+        self.ids = arrays["ids"]
+        self.documents = arrays["documents"]
+        self.columns = {
+            name[len(META_PREFIX):]: values
+            for name, values in arrays.items() if name.startswith(META_PREFIX)
+        }
+        self._positions = {doc_id: row for row, doc_id in enumerate(self.ids.tolist())}
+        self._codes = {}  # text column -> ({value: code}, codes per row), built on first filter
+
+    @classmethod
+    def load(cls, path, embedding_function):
+        """Open an index written by write_sparse_index(), memory-mapping its arrays."""
+        return cls(_mmap_npz(path), embedding_function)
+
+    def count(self):
+        return len(self.ids)
+
+    def _encoded(self, key):
+        """A text column as small integer codes, so equality filters compare ints instead of strings."""
+        if key not in self._codes:
+            categories, codes = np.unique(self.columns[key], return_inverse=True)
+            self._codes[key] = ({value: code for code, value in enumerate(categories.tolist())},
+                                codes.astype(np.int32))
+        return self._codes[key]
+
+    def _compare(self, key, op, value):
+        column = self.columns[key]
+        values = list(value) if op in ("$in", "$nin") else [value]
+        is_text = column.dtype.kind == "U"
+        if any(isinstance(v, str) != is_text for v in values):
+            # Like Chroma, a string never matches a number (and vice versa)
+            return np.full(len(column), op in ("$ne", "$nin"))
+
+        if is_text and op in ("$eq", "$ne", "$in", "$nin"):
+            lookup, codes = self._encoded(key)
+            # -1 never matches a row: the value doesn't occur in the column
+            wanted = [lookup.get(v, -1) for v in values]
+            matches = codes == wanted[0] if len(wanted) == 1 else np.isin(codes, wanted)
+            return ~matches if op in ("$ne", "$nin") else matches
+        if op == "$eq":
+            return column == value
+        if op == "$ne":
+            return column != value
+        if op == "$in":
+            return np.isin(column, values)
+        if op == "$nin":
+            return ~np.isin(column, values)
+        if op in _RANGE_OPERATORS and not is_text:
+            return _RANGE_OPERATORS[op](column, value)
+        raise ValueError(f"Unsupported where operator {op!r} for {column.dtype} metadata")
+
+    def mask(self, where):
+        """Boolean row mask for a Chroma `where` filter ($and / $or, $eq, $ne, $in, $nin, $gt, $gte, $lt, $lte)."""
+        mask = np.ones(self.count(), dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    mask &= self.mask(clause)
+            elif key == "$or":
+                mask &= np.logical_or.reduce([self.mask(clause) for clause in condition])
+            elif key not in self.columns:
+                return np.zeros(self.count(), dtype=bool)
+            else:
+                if not isinstance(condition, dict):
+                    condition = {"$eq": condition}
+                for op, value in condition.items():
+                    mask &= self._compare(key, op, value)
+        return mask
+
+    def _rows(self, rows, include):
+        result = {"ids": self.ids[rows].tolist()}
+        if "documents" in include:
+            result["documents"] = self.documents[rows].tolist()
+        if "metadatas" in include:
+            keys = list(self.columns)
+            values = [self.columns[key][rows].tolist() for key in keys]
+            result["metadatas"] = [dict(zip(keys, row)) for row in zip(*values)]
+        return result
+
+    def query(self, query_texts, n_results=10, where=None, include=("documents", "metadatas", "distances")):
+        """
+        Nearest documents for each query text, as collection.query() returns
+        them: a dict of lists with one inner list per query, closest first.
+        """
+        queries = np.asarray(self.embedding_function(query_texts), dtype=np.float32)
+        candidates = np.flatnonzero(self.mask(where)) if where else np.arange(self.count())
+        matrix = self.matrix[candidates] if where else self.matrix
+
+        scores = np.asarray(matrix @ queries.T).T
+        distances = self.sq_norms[candidates] + (queries ** 2).sum(axis=1)[:, None] - 2 * scores
+
+        keys = ["ids", *(key for key in ("documents", "metadatas", "distances") if key in include)]
+        results = {key: [] for key in keys}
+        k = min(n_results, len(candidates))
+        for row_distances in distances:
+            top = np.argpartition(row_distances, k - 1)[:k] if 0 < k < len(candidates) else np.arange(k)
+            top = top[np.argsort(row_distances[top], kind="stable")]
+            found = self._rows(candidates[top], include)
+            found["distances"] = row_distances[top].tolist()
+            for key in keys:
+                results[key].append(found[key])
+        return results
+
+    def get(self, ids=None, where=None, limit=None, offset=None, include=("documents", "metadatas")):
+        """Documents by id and / or where filter, as collection.get() returns them (flat lists)."""
+        if ids is not None:
+            rows = np.array([self._positions[i] for i in ids if i in self._positions], dtype=np.int64)
+        else:
+            rows = np.arange(self.count())
+        if where:
+            rows = rows[self.mask(where)[rows]]
+        start = offset or 0
+        rows = rows[start : start + limit if limit is not None else None]
+        return self._rows(rows, include)
@@ -0,0 +1,287 @@
+"""
+Stream listings from the financial engine straight into the vector store.
+
+Replaces the generate_final_buy_rent_csv.py -> CSV -> ingest.py round trip
+with one generator pipeline:
+
+    read + analyze chunks -> build documents -> embed -> upsert into Chroma
+
+Chunks are analyzed on a process pool (as in the pipeline's chunked mode)
+and every stage runs in its own thread, connected to the next by a bounded
+queue. Stages overlap, so batch N is embedded and written while batch N+1
+is still being analyzed, and a slow stage holds the ones before it back
+instead of letting batches pile up in memory.
+
+Only a few chunks' documents, metadata and embeddings are in memory at a
+time: writes go through the chroma_writer pool (retries, adaptive batch
+size, checkpoint), and the sparse index, market cube, run fingerprint and
+manifest are assembled from per-chunk parts (the cube and the manifest
+keep a few numbers per row, nothing more). With --write-csv the analysis
+CSV, its Parquet copy and the incremental manifest are written as a side
+output; the API does not need them (/analyze reads the ingested metadata),
+but ingest.py reads the CSV, so write it if you mix the two.
+
+An interrupted run is resumed by running it again on the same input: the
+checkpoint, keyed by the input's content and the assumptions, skips the
+rows already written.
+
+The trained vectorizer is reused, as in ingest.py --incremental; without
+one it is fitted on the analyzed documents first, so the first run holds
+the analyzed batches until the fit and only starts embedding after it.
+
+    python stream_ingest.py
+    python stream_ingest.py --chunksize 500 --workers 4 --write-csv
+"""
+
+import argparse
+import hashlib
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import chromadb
+import numpy as np
+import pandas as pd
+
+from ingest import (
+    BATCH_SIZE, CHECKPOINT_PATH, CHROMA_DB_DIR, COLLECTION_NAME, DATA_PATH, SPARSE_INDEX_PATH, VECTORIZER_PATH,
+    build_documents, stored_hashes,
+)
+from chroma_writer import Checkpoint, update_run_fingerprint, write_batches
+from corpus_stats import MARKET_CITIES
+from index_version import ingest_version, write_index_version
+from market_cube import CUBE_PATH, MarketCubeBuilder
+from property_store import PropertyStore
+from sparse_index import SparseIndexWriter
+from tfidf_embedding import TfidfEmbeddingFunction
+
+# ingest puts calaculate_financial_terms on sys.path
+from generate_final_buy_rent_csv import (  # noqa: E402
+    BASE_DIR as FINANCE_DIR, INPUT_PATH, analyze_chunk, csv_dtypes, pipeline_fingerprint, rewrite_as_float,
+)
+from modules.analysis_table import INDEX_NAME, INTEGER_COLUMNS, ParquetTableWriter, apply_schema, parquet_available, parquet_path  # noqa: E402
+from modules.loan import average_interest_rate  # noqa: E402
+from modules.manifest import Manifest, manifest_path, save_manifest  # noqa: E402
+
+# Batches buffered between two stages
+QUEUE_SIZE = 4
+
+_DONE = object()
+
+
+class _Failed:
+    def __init__(self, error):
+        self.error = error
+
+
+def threaded(iterable, maxsize=QUEUE_SIZE):
+    """
+    Run a generator stage in a background thread and yield its items through
+    a bounded queue. Exceptions raised by the stage are re-raised here.
+    """
+    items = queue.Queue(maxsize=maxsize)
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+            items.put(_DONE)
+        except BaseException as e:
+            items.put(_Failed(e))
+
+    threading.Thread(target=produce, daemon=True).start()
+    while True:
+        item = items.get()
+        if item is _DONE:
+            return
+        if isinstance(item, _Failed):
+            raise item.error
+        yield item
+
+
+class CsvSideOutput:
+    """
+    Analysis CSV, its Parquet copy and manifest, written as chunks stream
+    past. Like the pipeline's chunked mode, integer result columns with gaps
+    are rewritten as floats at the end, so the CSV matches a full run.
+    """
+
+    def __init__(self, path, chunksize):
+        self.path = path
+        self.chunksize = chunksize
+        self.header = True
+        self.hashes = []
+        self.gaps = set()
+        self._out = open(path, "w", newline="", encoding="utf-8")
+        self._parquet = ParquetTableWriter(parquet_path(path)) if parquet_available() else None
+
+    def write(self, result, chunk_hashes):
+        result.to_csv(self._out, header=self.header, index=False)
+        if self._parquet:
+            self._parquet.write(result)
+        self.header = False
+        self.hashes.append(chunk_hashes)
+        self.gaps.update(col for col in INTEGER_COLUMNS if result[col].isna().any())
+
+    def _close_files(self):
+        self._out.close()
+        if self._parquet:
+            self._parquet.close()
+
+    def abort(self):
+        """Close the files and drop the manifest, so the next incremental run recomputes everything."""
+        self._close_files()
+        manifest_path(self.path).unlink(missing_ok=True)
+
+    def close(self, fingerprint):
+        self._close_files()
+        if self.gaps:
+            rewrite_as_float(self.path, [col for col in INTEGER_COLUMNS if col in self.gaps], self.chunksize)
+        hashes = np.concatenate(self.hashes) if self.hashes else np.array([], dtype=np.uint64)
+        save_manifest(manifest_path(self.path), Manifest(assumptions=fingerprint, row_hashes=hashes))
+
+
+def analyzed_batches(input_path, avg_rate, chunksize, workers, side_output=None):
+    """
+    Analyzed chunks in input order, indexed by source_row. At most
+    2 * workers chunks are being analyzed at once.
+    """
+    rows = 0
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def ready(max_pending):
+            nonlocal rows
+            while len(pending) > max_pending:
+                result, chunk_hashes = pending.popleft().result()
+                if side_output:
+                    side_output.write(result, chunk_hashes)
+                result.index = pd.RangeIndex(rows, rows + len(result), name=INDEX_NAME)
+                rows += len(result)
+                yield result
+
+        for chunk in pd.read_csv(input_path, chunksize=chunksize, dtype=csv_dtypes(input_path, chunksize)):
+            pending.append(pool.submit(analyze_chunk, chunk, avg_rate))
+            yield from ready(2 * workers - 1)
+        yield from ready(0)
+
+
+def document_batches(frames):
+    """(documents, metadatas, ids) per analyzed chunk, typed exactly as ingest.py reads them back."""
+    for frame in frames:
+        yield build_documents(apply_schema(frame.copy()))
+
+
+def embedded_batches(batches, ef):
+    """Batches with their TF-IDF matrix appended; fits the vectorizer first if it isn't trained."""
+    if not hasattr(ef.vectorizer, "vocabulary_"):
+        batches = list(batches)
+        print("🧠 Training TF-IDF vectorizer on the analyzed documents...")
+        ef.fit([doc for documents, _, _ in batches for doc in documents])
+    for documents, metadatas, ids in batches:
+        yield documents, metadatas, ids, ef.transform(documents)
+
+
+def input_fingerprint(input_path, avg_rate):
+    """Identifies what a run will write before it has seen any rows: the input file's content and the assumptions."""
+    digest = hashlib.sha256(pipeline_fingerprint(avg_rate).encode("utf-8"))
+    with open(input_path, "rb") as f:
+        while block := f.read(1 << 20):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stream_ingest(input_path=INPUT_PATH, chunksize=BATCH_SIZE * 10, workers=None, write_csv=False):
+    """
+    Analyze input_path and upsert every listing into the collection in one
+    streaming pass, then delete documents for rows that no longer exist and
+    rewrite the sparse index and market cube. With write_csv the analysis
+    CSV is written to DATA_PATH on the way. Returns the number of documents
+    written.
+    """
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    avg_rate = average_interest_rate(FINANCE_DIR / "banks.csv")
+    print(f"🚀 Streaming {input_path} into '{COLLECTION_NAME}' (chunks of {chunksize}, {workers} workers)...")
+
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH), max_features=384)
+    client = chromadb.PersistentClient(path=str(CHROMA_DB_DIR))
+    collection = client.get_or_create_collection(name=COLLECTION_NAME, embedding_function=ef)
+    removed = set(stored_hashes(collection))
+
+    checkpoint = Checkpoint(CHECKPOINT_PATH, input_fingerprint(input_path, avg_rate))
+    if checkpoint.ranges:
+        print(f"↩️  Resuming: {checkpoint.rows_done} documents were already written by an interrupted run...")
+
+    side_output = None
+    if write_csv:
+        DATA_PATH.parent.mkdir(exist_ok=True)
+        side_output = CsvSideOutput(DATA_PATH, chunksize)
+    index_writer = SparseIndexWriter(SPARSE_INDEX_PATH)
+    cube = MarketCubeBuilder(MARKET_CITIES)
+    run_digest = hashlib.sha256()
+    rows = 0
+    failed = []
+
+    try:
+        frames = threaded(analyzed_batches(input_path, avg_rate, chunksize, workers, side_output))
+        embedded = threaded(embedded_batches(threaded(document_batches(frames)), ef))
+        for documents, metadatas, ids, matrix in embedded:
+            report = write_batches(
+                collection, documents, metadatas, ids,
+                embed=lambda start, end: matrix[start:end].toarray(),
+                checkpoint=checkpoint, batch_size=BATCH_SIZE, offset=rows, progress=False,
+            )
+            failed += report["failed"]
+            removed.difference_update(ids)
+            index_writer.add(matrix, ids, documents, metadatas)
+            cube.add(PropertyStore(ids, documents, metadatas))
+            update_run_fingerprint(run_digest, ids, metadatas)
+            rows += len(ids)
+            print(f"  {rows} documents streamed ({rows / (time.perf_counter() - start):,.0f} docs/s)")
+    except BaseException:
+        if side_output:
+            side_output.abort()
+        index_writer.discard()
+        raise
+    if side_output:
+        side_output.close(pipeline_fingerprint(avg_rate))
+
+    if failed:
+        for first, last, error in failed:
+            print(f"❌ Rows {first}-{last} failed: {error}")
+        print(f"⚠️  {sum(last - first for first, last, _ in failed)} documents were not written; "
+              f"run stream_ingest.py again to resume from {CHECKPOINT_PATH.name}.")
+    else:
+        checkpoint.clear()
+
+    removed = sorted(removed, key=int)
+    for i in range(0, len(removed), BATCH_SIZE):
+        collection.delete(ids=removed[i : i + BATCH_SIZE])
+
+    if rows:
+        index_writer.close()
+    else:
+        index_writer.discard()
+    version = ingest_version(run_digest.hexdigest()[:16], failed)
+    cube.build(version).save(CUBE_PATH)
+    write_index_version(version, rows)
+
+    elapsed = time.perf_counter() - start
+    print(f"✅ Streamed {rows} documents in {elapsed:.2f}s ({rows / elapsed:,.0f} docs/s), "
+          f"deleted {len(removed)}. Collection '{COLLECTION_NAME}' has {collection.count()} documents.")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--input", default=INPUT_PATH, help="Listings CSV")
+    parser.add_argument("--chunksize", type=int, default=BATCH_SIZE * 10, help="Rows analyzed per chunk")
+    parser.add_argument("--workers", type=int, default=None, help="Analysis worker processes (default: all cores)")
+    parser.add_argument("--write-csv", action="store_true",
+                        help=f"Also write {DATA_PATH.name} (its Parquet copy and manifest) as a side output")
+    args = parser.parse_args()
+    stream_ingest(args.input, chunksize=args.chunksize, workers=args.workers, write_csv=args.write_csv)
@@ -0,0 +1,71 @@
+"""
+Tests for how /ask turns a query's bounds into filters. Needs
+GEMINI_API_KEY set (any value) and the ingested data, like the API
+itself; the answer text is stubbed so nothing calls Gemini.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+os.environ.setdefault("GEMINI_API_KEY", "test")
+
+from rag_app import main  # noqa: E402
+from rag_app.intent import extract_entities  # noqa: E402
+
+main.generate_answer = lambda query, contexts, *args: f"{len(contexts)} properties"
+client = TestClient(main.app)
+
+
+def filters_for(query):
+    filters = main.parse_filters_from_query(query)
+    filters.update(main.constraint_filters(extract_entities(query), filters))
+    return filters
+
+
+def test_constraint_filters():
+    print("🧱 Turning query bounds into filters...")
+    filters = filters_for("2 bhk flats in mumbai between 50 lakhs to 1 crore")
+    assert filters["budget_min"] == 50 and filters["budget_max"] == 100
+    where = main.build_chroma_where_clause(filters)
+    assert {"price_lakhs": {"$gte": 50.0}} in where["$and"]
+    assert {"price_lakhs": {"$lte": 100.0}} in where["$and"]
+
+    filters = filters_for("flats in andheri 1000-1500 sqft")
+    assert filters["area_min"] == 1000 and filters["area_max"] == 1500
+    assert filters["localities"] and all("andheri" in loc.lower() for loc in filters["localities"])
+
+    # A rent query's budget is a monthly rent, not a price
+    filters = filters_for("flats to rent in mumbai between 50 and 80 lakhs")
+    assert "budget_min" not in filters and "budget_max" not in filters
+    print("✅ Ranges give both bounds, localities expand, rent budgets are left out")
+
+
+def test_ask_range():
+    print("🧱 Asking for a budget range...")
+    response = client.post("/ask", json={"query": "2 bhk flats in mumbai between 50 lakhs to 1 crore"}).json()
+    assert response["relaxed"] == []
+    assert response["properties"]
+    assert all(50 <= p["price_lakhs"] <= 100 for p in response["properties"]), response["properties"]
+    print(f"✅ {len(response['properties'])} properties, all priced 50-100 lakhs")
+
+
+def test_ask_relaxed():
+    print("🧱 Asking for a budget nothing meets...")
+    response = client.post("/ask", json={"query": "2 bhk flats in mumbai between 0.1 and 0.2 lakhs"}).json()
+    # The results drop the bounds, and both the response and the answer say so
+    assert response["relaxed"] == ["budget_min", "budget_max"]
+    assert response["properties"]
+    assert response["answer"].startswith("⚠️ *No properties match your budget of 0.1-0.2 lakhs")
+    print(f"✅ {len(response['properties'])} properties without the budget, flagged as relaxed")
+
+
+if __name__ == "__main__":
+    test_constraint_filters()
+    test_ask_range()
+    test_ask_relaxed()
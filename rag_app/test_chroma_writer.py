@@ -0,0 +1,141 @@
+import tempfile
+import threading
+from pathlib import Path
+
+import chroma_writer
+from chroma_writer import Checkpoint, write_batches
+
+ROWS = 1000
+DOCUMENTS = [f"document {i}" for i in range(ROWS)]
+METADATAS = [{"row": i} for i in range(ROWS)]
+IDS = [str(i) for i in range(ROWS)]
+
+# No waiting between retries in tests
+chroma_writer.RETRY_BACKOFF = 0
+
+
+class StubCollection:
+    """Records upserted ids; fail(ids) says whether a call with those ids should raise."""
+
+    def __init__(self, fail=lambda ids: False):
+        self.fail = fail
+        self.failures = 0
+        self.rows = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, documents, embeddings, metadatas, ids):
+        with self._lock:
+            if self.fail(ids):
+                self.failures += 1
+                raise ConnectionError(f"write of {ids[0]}..{ids[-1]} failed")
+            for doc_id, document in zip(ids, documents):
+                self.rows[doc_id] = document
+
+
+def embed(start, end):
+    return [[float(i)] for i in range(start, end)]
+
+
+def run(collection, checkpoint=None, rows=slice(0, ROWS), offset=0):
+    """write_batches in a thread, failing the test instead of hanging if it never returns."""
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(write_batches(
+        collection, DOCUMENTS[rows], METADATAS[rows], IDS[rows], embed,
+        checkpoint=checkpoint, batch_size=50, offset=offset, progress=False,
+    )))
+    thread.start()
+    thread.join(timeout=60)
+    assert not thread.is_alive(), "write_batches hung"
+    return result
+
+
+def test_retry():
+    print("🔁 Writing through a collection that fails its first calls...")
+    failures = iter(range(3))
+    collection = StubCollection(fail=lambda ids: next(failures, None) is not None)
+    report = run(collection)
+    assert report["failed"] == [] and report["written"] == ROWS
+    assert sorted(collection.rows, key=int) == IDS
+    assert collection.failures == 3
+    print(f"✅ {report['written']} rows written after 3 failed calls were retried")
+
+
+def test_checkpoint_and_resume():
+    print("💾 Failing one batch for good, then resuming from the checkpoint...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "checkpoint.json"
+        broken = StubCollection(fail=lambda ids: "437" in ids)
+        report = run(broken, Checkpoint(path, "run-1"))
+        assert broken.failures == chroma_writer.MAX_RETRIES + 1
+        assert len(report["failed"]) == 1
+        first, last, error = report["failed"][0]
+        assert first <= 437 < last and "failed" in error
+        assert report["written"] == ROWS - (last - first)
+
+        # The checkpoint file has every row but the failed batch
+        checkpoint = Checkpoint(path, "run-1")
+        assert checkpoint.pending(ROWS) == [(first, last)]
+        # A checkpoint of another run is ignored
+        assert Checkpoint(path, "run-2").ranges == []
+
+        healthy = StubCollection()
+        report = run(healthy, checkpoint)
+        assert report["failed"] == [] and report["written"] == last - first
+        assert sorted(healthy.rows, key=int) == IDS[first:last], "resume rewrote rows it already had"
+        assert checkpoint.pending(ROWS) == []
+    print(f"✅ Rows {first}-{last} failed, were kept out of the checkpoint and were the only rows resumed")
+
+
+def test_offset():
+    print("📐 Writing a run in two calls with an offset...")
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = Checkpoint(Path(tmp) / "checkpoint.json", "run")
+        collection = StubCollection(fail=lambda ids: "730" in ids)
+        run(collection, checkpoint, rows=slice(0, 600))
+        report = run(collection, checkpoint, rows=slice(600, ROWS), offset=600)
+        # Failed ranges and the checkpoint count from the start of the run, not of the call
+        (first, last, _), = report["failed"]
+        assert first <= 730 < last
+        assert checkpoint.pending(ROWS) == [(first, last)]
+    print("✅ The failed range and the checkpoint use run positions")
+
+
+def test_checkpoint_failure_does_not_hang():
+    print("🧯 Failing the checkpoint write itself...")
+
+    class FailingCheckpoint(Checkpoint):
+        def mark(self, start, end):
+            raise OSError("disk full")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        collection = StubCollection()
+        report = run(collection, FailingCheckpoint(Path(tmp) / "checkpoint.json", "run"))
+    # Every writer thread hit the error; the run still drained the queue and reported every batch
+    assert report["written"] == 0
+    assert sum(last - first for first, last, _ in report["failed"]) == ROWS
+    assert all(error == "disk full" for _, _, error in report["failed"])
+    print(f"✅ {len(report['failed'])} batches reported as failed, no hang")
+
+
+def test_embedding_failure():
+    print("🧮 Failing the embedding of one batch...")
+
+    def broken_embed(start, end):
+        if start <= 120 < end:
+            raise ValueError("bad row")
+        return embed(start, end)
+
+    collection = StubCollection()
+    report = write_batches(collection, DOCUMENTS, METADATAS, IDS, broken_embed, batch_size=50, progress=False)
+    (first, last, error), = report["failed"]
+    assert first <= 120 < last and error == "bad row"
+    assert len(collection.rows) == ROWS - (last - first)
+    print("✅ The batch is reported as failed and the rest is written")
+
+
+if __name__ == "__main__":
+    test_retry()
+    test_checkpoint_and_resume()
+    test_offset()
+    test_checkpoint_failure_does_not_hang()
+    test_embedding_failure()
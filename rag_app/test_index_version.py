@@ -0,0 +1,80 @@
+import tempfile
+from pathlib import Path
+from index_version import UNVERSIONED, IndexVersion, ingest_version, write_index_version
+
+
+def test_first_ingest_is_a_change():
+    print("🏷️  Starting without an index version file, then ingesting...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index_version.json"
+        changes = []
+        version = IndexVersion(path, on_change=changes.append)
+
+        # An existing deployment: nothing ingested with versioning yet
+        assert version.current() == UNVERSIONED
+        assert changes == []
+
+        write_index_version("abc123", 10, path)
+        assert version.current() == "abc123"
+        assert changes == ["abc123"], changes
+
+        # Later reads of the same file are not changes
+        assert version.current() == "abc123"
+        assert changes == ["abc123"], changes
+
+    print("✅ The first ingest is reported as a change")
+
+
+def test_startup_read_is_not_a_change():
+    print("🏷️  Starting with an index version file, then re-ingesting...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index_version.json"
+        write_index_version("abc123", 10, path)
+        changes = []
+        version = IndexVersion(path, on_change=changes.append)
+
+        assert version.current() == "abc123"
+        assert changes == []
+
+        write_index_version("def456", 12, path)
+        assert version.current() == "def456"
+        assert changes == ["def456"], changes
+
+    print("✅ Only the re-ingest is reported as a change")
+
+
+def test_resumed_ingest_is_a_change():
+    print("🏷️  Ingesting with failed rows, then resuming the same rows...")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "index_version.json"
+        write_index_version("abc123", 10, path)
+        changes = []
+        version = IndexVersion(path, on_change=changes.append)
+        assert version.current() == "abc123"
+
+        # Same rows as the data being served, but some of them failed to write
+        failed = [(0, 4, "timed out")]
+        partial = ingest_version("abc123", failed)
+        assert partial != "abc123"
+        write_index_version(partial, 10, path)
+        assert version.current() == partial
+
+        # A resume that fails again is another change
+        partial_again = ingest_version("abc123", failed)
+        assert partial_again != partial
+        write_index_version(partial_again, 10, path)
+        assert version.current() == partial_again
+
+        # The resume that completes the rows publishes their plain fingerprint, and that is a change too
+        assert ingest_version("abc123", []) == "abc123"
+        write_index_version(ingest_version("abc123", []), 10, path)
+        assert version.current() == "abc123"
+        assert changes == [partial, partial_again, "abc123"], changes
+
+    print("✅ Partial ingests and the resume that completes them are all reported as changes")
+
+
+if __name__ == "__main__":
+    test_first_ingest_is_a_change()
+    test_startup_read_is_not_a_change()
+    test_resumed_ingest_is_a_change()
@@ -0,0 +1,45 @@
+from intent import classify_intent, extract_entities
+
+# query -> (budget_min, budget_max, area_min, area_max)
+BOUNDS = {
+    "2 bhk flats in mumbai under 80 lakhs": (None, 80, None, None),
+    "3 bhk in bandra above 1.5 crore": (150, None, None, None),
+    "flats in powai within 2 cr": (None, 200, None, None),
+    "2 bhk flats in mumbai between 50 lakhs to 1 crore": (50, 100, None, None),
+    "flats in whitefield between 50 and 80 lakhs": (50, 80, None, None),
+    "flats in andheri 50 to 80 lakhs": (50, 80, None, None),
+    "3 bhk in worli 1-1.5 cr": (100, 150, None, None),
+    "homes in hebbal rs. 60 lakhs - rs. 1 cr": (60, 100, None, None),
+    "flats in thane 2 crore to 80 lakhs": (80, 200, None, None),
+    "flats in powai over 1200 sqft": (None, None, 1200, None),
+    "flats in powai under 900 sq ft": (None, None, None, 900),
+    "flats in powai 1000-1500 sqft under 2 cr": (None, 200, 1000, 1500),
+    "flats in powai 800 sqft between 1 and 2 crore": (100, 200, 800, None),
+}
+
+
+def test_extract_entities():
+    print("🔎 Extracting budget and area bounds...")
+    for query, expected in BOUNDS.items():
+        entities = extract_entities(query)
+        got = tuple(entities[key] for key in ("budget_min", "budget_max", "area_min", "area_max"))
+        assert got == expected, (query, got, expected)
+
+    entities = extract_entities("2 BHK flats in Mumbai between 50 lakhs to 1 crore")
+    assert entities["bhk"] == 2 and entities["locations"] == ["mumbai"]
+    # "and" is only a range after "between"
+    assert extract_entities("compare 50 lakhs and 80 lakhs flats")["budget_min"] is None
+    print(f"✅ {len(BOUNDS)} queries give the expected bounds")
+
+
+def test_range_is_not_a_comparison():
+    print("🔎 Classifying budget ranges...")
+    assert classify_intent("2 bhk flats in mumbai between 50 and 80 lakhs").intent == "FILTER"
+    assert classify_intent("flats in powai between 1000 and 1500 sqft").intent == "FILTER"
+    assert classify_intent("compare flats between andheri and bandra").intent == "COMPARE"
+    print("✅ A budget or area range is a FILTER, not a COMPARE")
+
+
+if __name__ == "__main__":
+    test_extract_entities()
+    test_range_is_not_a_comparison()
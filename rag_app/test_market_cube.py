@@ -0,0 +1,78 @@
+import itertools
+import chromadb
+import numpy as np
+from pathlib import Path
+from corpus_stats import MARKET_CITIES, compute_corpus_stats
+from market_cube import SKETCH_ACCURACY, MarketCube, MarketCubeBuilder
+from property_store import PropertyStore
+from tfidf_embedding import TfidfEmbeddingFunction
+
+# Constants
+BASE_DIR = Path(__file__).resolve().parent.parent
+CHROMA_DB_DIR = BASE_DIR / "rag_app" / "chroma_db"
+VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer"
+COLLECTION_NAME = "real_estate"
+
+
+def brute_force(store, **filters):
+    """What /market_snapshot computed by scanning every listing."""
+    mask = store.mask(cities=MARKET_CITIES, **filters)
+    return (int(mask.sum()), *store.snapshot(mask, MARKET_CITIES))
+
+
+def ui_filters(stats):
+    """Filter combinations MarketSnapshot.jsx can send: BHK chips, budget / area inputs, locality chips."""
+    prices, areas = stats["price_range"], stats["area_range"]
+    some_localities = stats["localities"]["Mumbai"][:2] + stats["localities"]["Bangalore"][:3]
+    return [
+        dict(bhk=bhk, min_price=price[0], max_price=price[1], min_area=area[0], max_area=area[1], localities=locs)
+        for bhk, price, area, locs in itertools.product(
+            [None, [2], [2, 3], [1, 4, 5]],
+            [(None, None), (50, None), (None, 150), (80.5, 300), (prices["min"], prices["max"])],
+            [(None, None), (900, 1500), (areas["min"], None)],
+            [None, some_localities[:2], some_localities + ["not a locality"]],
+        )
+    ]
+
+
+def test_market_cube():
+    print(f"🧊 Checking the market cube against a full scan of {CHROMA_DB_DIR}...")
+
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    collection = chromadb.PersistentClient(path=str(CHROMA_DB_DIR)).get_collection(
+        name=COLLECTION_NAME, embedding_function=ef
+    )
+    store = PropertyStore.load(collection)
+    cube = MarketCube.build(store, MARKET_CITIES)
+
+    filters = ui_filters(compute_corpus_stats(store.metadatas))
+    for f in filters:
+        total, buy_rent, median_sqft, break_even = cube.snapshot(**f)
+        expected_total, expected_buy_rent, expected_median, expected_break_even = brute_force(store, **f)
+
+        # Counts and means merge exactly
+        assert total == expected_total, f
+        assert buy_rent == expected_buy_rent, f
+        assert break_even == expected_break_even, f
+        # The median comes from the quantile sketch (plus rounding to whole rupees)
+        for city in MARKET_CITIES:
+            tolerance = SKETCH_ACCURACY * expected_median[city] + 1
+            assert abs(median_sqft[city] - expected_median[city]) <= tolerance, (f, city)
+
+    print(f"✅ {len(filters)} filter combinations match the full scan")
+
+    # A cube built chunk by chunk, as stream_ingest.py does, is the same cube
+    builder = MarketCubeBuilder(MARKET_CITIES)
+    for start in range(0, len(store), 397):
+        rows = slice(start, start + 397)
+        builder.add(PropertyStore(store.ids[rows], store.documents[rows], store.metadatas[rows]))
+    chunked = builder.build()
+    assert chunked.arrays.keys() == cube.arrays.keys()
+    for key, values in cube.arrays.items():
+        assert chunked.arrays[key].dtype == values.dtype, key
+        assert np.array_equal(chunked.arrays[key], values, equal_nan=values.dtype.kind == "f"), key
+    print("✅ The chunked build matches the one-pass build")
+
+
+if __name__ == "__main__":
+    test_market_cube()
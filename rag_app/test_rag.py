@@ -6,7 +6,7 @@ from rag import generate_answer
 # Constants
 BASE_DIR = Path(__file__).resolve().parent.parent
 CHROMA_DB_DIR = BASE_DIR / "rag_app" / "chroma_db"
-VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer.pkl"
+VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer"
 COLLECTION_NAME = "real_estate"
 
 def test_full_rag():
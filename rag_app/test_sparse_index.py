@@ -0,0 +1,47 @@
+import tempfile
+import numpy as np
+from pathlib import Path
+from ingest import load_documents
+from sparse_index import SparseIndex, SparseIndexWriter, write_sparse_index
+from tfidf_embedding import TfidfEmbeddingFunction
+
+# Constants
+BASE_DIR = Path(__file__).resolve().parent.parent
+VECTORIZER_PATH = BASE_DIR / "rag_app" / "vectorizer"
+CHUNK_SIZE = 397
+
+
+def test_chunked_writer():
+    print("🧱 Writing the sparse index in one go and chunk by chunk...")
+
+    ef = TfidfEmbeddingFunction(vectorizer_path=str(VECTORIZER_PATH))
+    documents, metadatas, ids = load_documents()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        whole_path, chunked_path = Path(tmp) / "whole.npz", Path(tmp) / "chunked.npz"
+        write_sparse_index(whole_path, ef.transform(documents), ids, documents, metadatas)
+
+        writer = SparseIndexWriter(chunked_path)
+        for start in range(0, len(ids), CHUNK_SIZE):
+            rows = slice(start, start + CHUNK_SIZE)
+            writer.add(ef.transform(documents[rows]), ids[rows], documents[rows], metadatas[rows])
+        writer.close()
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["chunked.npz", "whole.npz"], "spill files left behind"
+
+        with np.load(whole_path) as whole, np.load(chunked_path) as chunked:
+            assert whole.files == chunked.files
+            for name in whole.files:
+                assert chunked[name].dtype == whole[name].dtype, name
+                assert np.array_equal(chunked[name], whole[name]), name
+
+        # The chunked file memory-maps and answers queries like the other one
+        query = ["2 BHK in Mumbai under 2 crores"]
+        expected = SparseIndex.load(whole_path, ef).query(query, n_results=5)
+        result = SparseIndex.load(chunked_path, ef).query(query, n_results=5)
+        assert result["ids"] == expected["ids"]
+
+    print(f"✅ {len(ids)} documents in chunks of {CHUNK_SIZE} give the same index")
+
+
+if __name__ == "__main__":
+    test_chunked_writer()
@@ -1,32 +1,124 @@
+from array import array
+import math
 import pickle
 from chromadb import EmbeddingFunction, Documents, Embeddings
-from sklearn.feature_extraction.text import TfidfVectorizer
+from scipy import sparse
+import numpy as np
 import os
 
+try:
+    from rag_app.vectorizer_artifact import TfidfArtifact, export_vectorizer, is_artifact
+except ImportError:  # imported by a script run from rag_app/
+    from vectorizer_artifact import TfidfArtifact, export_vectorizer, is_artifact
+
+
 class TfidfEmbeddingFunction(EmbeddingFunction):
     def __init__(self, vectorizer_path: str = None, max_features: int = 384):
+        """
+        vectorizer_path is an artifact directory (see vectorizer_artifact.py),
+        which loads without scikit-learn, or a legacy .pkl file. A directory
+        path with only a sibling .pkl falls back to the pickle.
+        """
         self.vectorizer_path = vectorizer_path
         self.max_features = max_features
         self.vectorizer = None
-        
-        if vectorizer_path and os.path.exists(vectorizer_path):
-            with open(vectorizer_path, "rb") as f:
+        self._analyzer = None
+
+        legacy_path = os.path.splitext(vectorizer_path)[0] + ".pkl" if vectorizer_path else None
+        if vectorizer_path and is_artifact(vectorizer_path):
+            self.vectorizer = TfidfArtifact(vectorizer_path)
+        elif legacy_path and os.path.isfile(legacy_path):
+            with open(legacy_path, "rb") as f:
                 self.vectorizer = pickle.load(f)
         else:
+            # scikit-learn is only needed to fit a new vectorizer
+            from sklearn.feature_extraction.text import TfidfVectorizer
             self.vectorizer = TfidfVectorizer(max_features=self.max_features)
-            
+
     def fit(self, documents: Documents):
+        if isinstance(self.vectorizer, TfidfArtifact):
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            self.vectorizer = TfidfVectorizer(max_features=self.max_features)
         self.vectorizer.fit(documents)
-        if self.vectorizer_path:
+        self._analyzer = None
+        if self.vectorizer_path and self.vectorizer_path.endswith(".pkl"):
             with open(self.vectorizer_path, "wb") as f:
                 pickle.dump(self.vectorizer, f)
+        elif self.vectorizer_path:
+            export_vectorizer(self.vectorizer, self.vectorizer_path)
 
-    def __call__(self, input: Documents) -> Embeddings:
+    def _direct(self):
+        """
+        True when vectors can be computed straight from the fitted vocabulary
+        and idf weights (raw counts x idf, L2-normalised), skipping the
+        per-call validation and sparse conversions in vectorizer.transform().
+        Other vectorizer settings fall back to transform().
+        """
+        v = self.vectorizer
+        if not hasattr(v, "vocabulary_") or not (v.use_idf and v.norm == "l2" and not v.sublinear_tf and not v.binary):
+            return False
+        if self._analyzer is None:
+            self._analyzer = v.build_analyzer()
+            self._idf = v.idf_
+            self._idf_weights = v.idf_.tolist()
+        return True
+
+    def _term_indices(self, document):
+        vocabulary = self.vectorizer.vocabulary_
+        return [vocabulary[term] for term in self._analyzer(document) if term in vocabulary]
+
+    def transform(self, documents: Documents):
+        """TF-IDF vectors of the documents as a float32 CSR matrix (one row per document)."""
         if not self.vectorizer:
              # Should be fit first or loaded
              raise ValueError("Vectorizer not fit or loaded.")
-        # Transform and convert to list of lists (dense)
-        # Force float32 for compatibility
-        import numpy as np
-        vectors = self.vectorizer.transform(input).astype(np.float32).toarray().tolist()
-        return vectors
+        if not self._direct():
+            return self.vectorizer.transform(documents).astype(np.float32)
+
+        # Build the CSR arrays directly as packed int32 / float32 buffers, one
+        # document at a time, so no corpus-sized temporaries are allocated
+        idf = self._idf_weights
+        indices = array("i")
+        data = array("f")
+        indptr = array("q", [0])
+        for document in documents:
+            counts = {}
+            for index in self._term_indices(document):
+                counts[index] = counts.get(index, 0) + 1
+            weights = [count * idf[index] for index, count in counts.items()]
+            norm = math.sqrt(sum(w * w for w in weights)) or 1.0
+            indices.extend(counts)
+            data.extend([w / norm for w in weights])
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.frombuffer(data, dtype=np.float32), np.frombuffer(indices, dtype=np.int32),
+             np.frombuffer(indptr, dtype=np.int64)),
+            shape=(len(documents), len(self._idf)),
+        )
+        matrix.sort_indices()
+        return matrix
+
+    @staticmethod
+    def batches(matrix, batch_size: int):
+        """
+        Yield consecutive row slices of a transform() matrix as dense float32
+        arrays, ready to pass to Chroma as embeddings. Only one batch is
+        densified at a time.
+        """
+        for start in range(0, matrix.shape[0], batch_size):
+            yield matrix[start : start + batch_size].toarray()
+
+    def __call__(self, input: Documents) -> Embeddings:
+        # A (documents x features) float32 array; Chroma takes NumPy rows directly,
+        # so there is no need to go through Python lists of floats
+        if not self.vectorizer or not self._direct():
+            return self.transform(input).toarray()
+
+        out = np.zeros((len(input), len(self._idf)), dtype=np.float32)
+        for row, document in enumerate(input):
+            indices = self._term_indices(document)
+            if indices:
+                weights = np.bincount(indices, minlength=len(self._idf)) * self._idf
+                out[row] = weights / np.sqrt(weights @ weights)
+        return out
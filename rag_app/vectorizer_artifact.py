@@ -0,0 +1,214 @@
+"""
+Compact, versioned storage for the fitted TF-IDF vectorizer.
+
+A pickled TfidfVectorizer drags scikit-learn into every process that loads
+it. The artifact is a directory holding only what transform() needs:
+
+    meta.json        format version, tokenizer and weighting settings
+    vocabulary.txt   the vocabulary, one term per line in column order
+                     (scikit-learn numbers the terms in sorted order)
+    idf.npy          idf weight of every column, memory-mapped on load
+
+idf is kept as float64, the dtype scikit-learn computes in, so TfidfArtifact
+reproduces TfidfVectorizer.transform() bit for bit without importing
+scikit-learn.
+
+    python vectorizer_artifact.py vectorizer.pkl vectorizer
+"""
+
+import argparse
+import json
+import pickle
+import re
+import unicodedata
+from pathlib import Path
+
+import numpy as np
+from scipy import sparse
+
+FORMAT_VERSION = 1
+
+META_FILE = "meta.json"
+VOCABULARY_FILE = "vocabulary.txt"
+IDF_FILE = "idf.npy"
+
+
+def strip_accents_ascii(s):
+    return unicodedata.normalize("NFKD", s).encode("ASCII", "ignore").decode("ASCII")
+
+
+def strip_accents_unicode(s):
+    try:
+        s.encode("ASCII", errors="strict")
+        return s
+    except UnicodeEncodeError:
+        normalized = unicodedata.normalize("NFKD", s)
+        return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+_ACCENT_STRIPPERS = {None: None, "ascii": strip_accents_ascii, "unicode": strip_accents_unicode}
+
+
+def is_artifact(path):
+    return (Path(path) / META_FILE).exists()
+
+
+def export_vectorizer(vectorizer, path):
+    """Write a fitted TfidfVectorizer as an artifact directory. meta.json is written last."""
+    if vectorizer.analyzer != "word" or vectorizer.preprocessor or vectorizer.tokenizer:
+        raise ValueError("Only the built-in word analyzer can be exported")
+    if (vectorizer.strip_accents not in _ACCENT_STRIPPERS or vectorizer.input != "content"
+            or vectorizer.norm not in (None, "l1", "l2")):
+        raise ValueError(f"Unsupported vectorizer settings: strip_accents={vectorizer.strip_accents!r}, "
+                         f"input={vectorizer.input!r}, norm={vectorizer.norm!r}")
+
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    if any("\n" in term for term in terms):
+        raise ValueError("Vocabulary terms can't contain newlines")
+
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    stop_words = vectorizer.get_stop_words()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "n_features": len(terms),
+        "lowercase": vectorizer.lowercase,
+        "strip_accents": vectorizer.strip_accents,
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "norm": vectorizer.norm,
+        "use_idf": vectorizer.use_idf,
+        "sublinear_tf": vectorizer.sublinear_tf,
+        "binary": vectorizer.binary,
+    }
+
+    _write_atomic(path / VOCABULARY_FILE, lambda f: f.write("\n".join(terms).encode("utf-8")))
+    idf = vectorizer.idf_ if vectorizer.use_idf else np.ones(len(terms))
+    _write_atomic(path / IDF_FILE, lambda f: np.save(f, np.asarray(idf, dtype=np.float64)))
+    _write_atomic(path / META_FILE, lambda f: f.write(json.dumps(meta, indent=2).encode("utf-8")))
+
+
+def _write_atomic(path, write):
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        write(f)
+    tmp_path.replace(path)
+
+
+class TfidfArtifact:
+    """
+    Read-only stand-in for a fitted TfidfVectorizer, loaded from an artifact.
+    Has the attributes and methods TfidfEmbeddingFunction uses: vocabulary_,
+    idf_, the weighting flags, build_analyzer() and transform().
+    """
+
+    def __init__(self, path):
+        path = Path(path)
+        meta = json.loads((path / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported vectorizer artifact version {meta.get('format_version')!r} in {path}")
+
+        terms = (path / VOCABULARY_FILE).read_text(encoding="utf-8").split("\n")
+        self.vocabulary_ = {term: i for i, term in enumerate(terms)}
+        self.idf_ = np.load(path / IDF_FILE, mmap_mode="r")
+        if len(self.vocabulary_) != meta["n_features"] or len(self.idf_) != meta["n_features"]:
+            raise ValueError(f"Vectorizer artifact in {path} is incomplete")
+
+        self.lowercase = meta["lowercase"]
+        self.strip_accents = meta["strip_accents"]
+        self.token_pattern = meta["token_pattern"]
+        self.ngram_range = tuple(meta["ngram_range"])
+        self.stop_words = frozenset(meta["stop_words"]) if meta["stop_words"] else None
+        self.norm = meta["norm"]
+        self.use_idf = meta["use_idf"]
+        self.sublinear_tf = meta["sublinear_tf"]
+        self.binary = meta["binary"]
+
+    def _ngrams(self, tokens):
+        if self.stop_words:
+            tokens = [t for t in tokens if t not in self.stop_words]
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+
+        original = tokens
+        tokens = list(original) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n + 1, len(original) + 1)):
+            tokens.extend(" ".join(original[i : i + n]) for i in range(len(original) - n + 1))
+        return tokens
+
+    def build_analyzer(self):
+        """Callable turning a document into its list of terms, as TfidfVectorizer.build_analyzer()."""
+        strip = _ACCENT_STRIPPERS[self.strip_accents]
+        tokenize = re.compile(self.token_pattern).findall
+
+        def analyze(doc):
+            if self.lowercase:
+                doc = doc.lower()
+            if strip is not None:
+                doc = strip(doc)
+            return self._ngrams(tokenize(doc))
+
+        return analyze
+
+    def _row_norms(self, matrix):
+        """
+        L1 / L2 norm of every row (1 for empty rows), summed left to right
+        within each row like scikit-learn's normalize(), so results match it
+        exactly. Vectorized over rows, one pass per position in the row.
+        """
+        values = matrix.data ** 2 if self.norm == "l2" else np.abs(matrix.data)
+        lengths = np.diff(matrix.indptr)
+        norms = np.zeros(matrix.shape[0])
+        for k in range(lengths.max(initial=0)):
+            rows = np.flatnonzero(lengths > k)
+            norms[rows] += values[matrix.indptr[rows] + k]
+        if self.norm == "l2":
+            norms = np.sqrt(norms)
+        norms[norms == 0] = 1.0
+        return norms
+
+    def transform(self, documents):
+        """TF-IDF matrix of the documents (float64 CSR), as TfidfVectorizer.transform()."""
+        analyze = self.build_analyzer()
+        indices, indptr = [], [0]
+        for doc in documents:
+            indices.extend(self.vocabulary_[t] for t in analyze(doc) if t in self.vocabulary_)
+            indptr.append(len(indices))
+
+        matrix = sparse.csr_matrix(
+            (np.ones(len(indices)), np.array(indices, dtype=np.int64), np.array(indptr, dtype=np.int64)),
+            shape=(len(documents), len(self.vocabulary_)),
+        )
+        matrix.sum_duplicates()
+        if self.binary:
+            matrix.data[:] = 1.0
+        if self.sublinear_tf:
+            np.log(matrix.data, out=matrix.data)
+            matrix.data += 1.0
+        if self.use_idf:
+            matrix.data *= self.idf_[matrix.indices]
+        if self.norm:
+            matrix.data /= np.repeat(self._row_norms(matrix), np.diff(matrix.indptr))
+        return matrix
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert a pickled TfidfVectorizer into an artifact directory.")
+    parser.add_argument("pickle", type=Path, help="vectorizer.pkl to convert")
+    parser.add_argument("artifact", type=Path, help="Artifact directory to write")
+    args = parser.parse_args()
+
+    with open(args.pickle, "rb") as f:
+        vectorizer = pickle.load(f)
+    export_vectorizer(vectorizer, args.artifact)
+
+    sample = ["2 BHK apartment in andheri west Mumbai", "Property: 3 BHK villa. Price: ₹120 Lakhs."]
+    same = (vectorizer.transform(sample) != TfidfArtifact(args.artifact).transform(sample)).nnz == 0
+    print(f"✅ Wrote {args.artifact} ({len(vectorizer.vocabulary_)} terms), "
+          f"identical output: {'yes' if same else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()